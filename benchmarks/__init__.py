@@ -0,0 +1,10 @@
+"""
+Query-count and latency benchmarks of the tutor and security views.
+
+Run with:
+
+    python -m benchmarks --users 1000 --output bench.json
+
+The views are driven through the Django test client against a synthetic
+dataset in a throwaway test database.
+"""
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import django
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    for name, result in results.items():
+        before = previous.get('views', {}).get(name)
+        if before is None:
+            continue
+
+        print('%-24s queries %3d -> %3d   p50 %8.3f -> %8.3f ms' % (
+            name, before['queries'], result['queries'],
+            before['p50_ms'], result['p50_ms']
+        ), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--kanji', type=int, default=None,
+                        help="Number of kanji, the Joyo list by default.")
+    parser.add_argument('--learnt', type=int, default=50,
+                        help="Learnt cards per user.")
+    parser.add_argument('--enrolled', type=int, default=50,
+                        help="Cards still to learn per user.")
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--output', help="JSON file to write.")
+    parser.add_argument('--compare', help="JSON file of an earlier run.")
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kenkyou.settings')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    from . import datasets, runner
+    from .scenarios import SCENARIOS
+
+    if args.users < len(SCENARIOS):
+        parser.error("--users must be at least %d" % len(SCENARIOS))
+    if args.enrolled <= args.iterations:
+        parser.error("--enrolled must be more than --iterations")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        dataset = datasets.create_dataset(
+            args.users,
+            kanji=args.kanji or datasets.JOYO_KANJI_COUNT,
+            learnt=args.learnt,
+            enrolled=args.enrolled
+        )
+        results = runner.run(SCENARIOS, iterations=args.iterations)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    report = {'commit': get_commit(), 'dataset': dataset, 'views': results}
+    output = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    over_budget = [name for name, result in results.items()
+                   if result['over_budget']]
+    if over_budget:
+        print('Over query budget: ' + ', '.join(over_budget),
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
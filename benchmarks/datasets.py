@@ -0,0 +1,117 @@
+"""
+Synthetic datasets for the benchmarks.
+"""
+from datetime import date
+import random
+
+from django.contrib.auth.hashers import make_password
+
+from security.models import User
+from tutor import progress
+from tutor.models import (KanjiEntry, KanjiLearningCursor, KanjiLearningRecord,
+                          KanjiTestingQueueItem, KanjiTestingRecord)
+
+
+JOYO_KANJI_COUNT = 2136
+FIRST_KANJI = 0x4E00
+PASSWORD = 'benchmark-password'
+BATCH_SIZE = 500
+
+
+def user_email(i):
+    return 'user%d@kenkyou.com' % i
+
+
+def create_entries(count=JOYO_KANJI_COUNT):
+    KanjiEntry.objects.bulk_create(
+        (KanjiEntry(writing=chr(FIRST_KANJI + i),
+                    on_reading='on%d' % i,
+                    kun_reading='kun%d' % i,
+                    meaning='meaning %d' % i,
+                    order=i + 1)
+         for i in range(count)),
+        batch_size=BATCH_SIZE
+    )
+    return list(KanjiEntry.objects.order_by('order').values_list(
+        'id', flat=True
+    ))
+
+
+def create_users(count):
+    password = make_password(PASSWORD)
+    users = (
+        User(username='user%d' % i, email=user_email(i), password=password)
+        for i in range(count)
+    )
+
+    batch = []
+    for user in users:
+        batch.append(user)
+        if len(batch) == BATCH_SIZE:
+            User.objects.bulk_create(batch)
+            batch = []
+    User.objects.bulk_create(batch)
+
+    return list(User.objects.order_by('id').values_list('id', flat=True))
+
+
+def create_cards(user_ids, entry_ids, learnt_count, enrolled_count,
+                 seed=0):
+    """
+    Give each user `learnt_count` learnt and tested cards, all due today
+    so that the review views always have work, and `enrolled_count`
+    further cards still to learn. Bulk
+    inserts send no signals, so the queue items are created here too.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    learning_records = []
+    testing_records = []
+    queue_items = []
+
+    def flush():
+        for model, objs in [(KanjiLearningRecord, learning_records),
+                            (KanjiTestingRecord, testing_records),
+                            (KanjiTestingQueueItem, queue_items)]:
+            model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+            del objs[:]
+
+    for user_id in user_ids:
+        for i, entry_id in enumerate(
+                entry_ids[:learnt_count + enrolled_count]):
+            is_learnt = i < learnt_count
+            learning_records.append(KanjiLearningRecord(
+                kanji_entry_id=entry_id, user_id=user_id, is_learnt=is_learnt
+            ))
+
+            if is_learnt:
+                streak = rng.randrange(6)
+                testing_records.append(KanjiTestingRecord(
+                    kanji_entry_id=entry_id, user_id=user_id,
+                    correct_streak=streak, interval=2.0 ** streak
+                ))
+                queue_items.append(KanjiTestingQueueItem(
+                    kanji_entry_id=entry_id, user_id=user_id,
+                    test_date=today, order=i + 1
+                ))
+
+        if len(learning_records) >= BATCH_SIZE * 10:
+            flush()
+
+    flush()
+
+    KanjiLearningCursor.objects.bulk_create(
+        (KanjiLearningCursor(user_id=user_id, order=learnt_count)
+         for user_id in user_ids),
+        batch_size=BATCH_SIZE
+    )
+
+
+def create_dataset(users, kanji=JOYO_KANJI_COUNT, learnt=50, enrolled=50):
+    entry_ids = create_entries(kanji)
+    user_ids = create_users(users)
+    create_cards(user_ids, entry_ids, learnt, enrolled)
+    progress.rebuild(user_ids)
+
+    return {'users': users, 'kanji': kanji, 'learnt': learnt,
+            'enrolled': enrolled}
@@ -0,0 +1,195 @@
+"""
+Load comparison of the WSGI and ASGI entry points.
+
+Both applications are driven in-process by the same number of concurrent
+clients, each of which takes `delay` seconds to read a response, like a
+client on a slow network. Served over WSGI by a threaded server, a request
+holds one of `threads` worker threads until its client has read the
+response. Served over ASGI, the client is waited on by the event loop and
+the same number of threads only run Django.
+
+    python -m benchmarks.load --clients 200 --delay 0.1 --path /login/
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import time
+
+import django
+
+
+def make_environ(path, cookie):
+    from io import BytesIO
+    import sys
+
+    path, _, query_string = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'REMOTE_ADDR': '127.0.0.1',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def make_scope(path, cookie):
+    path, _, query_string = path.partition('?')
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def summarize(latencies, seconds):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / seconds, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p99_ms': round(
+            latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+            * 1000, 1
+        ),
+    }
+
+
+def run_clients(request, clients, requests):
+    """
+    Run `requests` coroutine calls of `request` from `clients` concurrent
+    clients, each waiting for its response before the next request.
+    Return the latencies and the seconds taken.
+    """
+    async def client(count):
+        return [await request() for _ in range(count)]
+
+    async def main():
+        counts = [requests // clients + (i < requests % clients)
+                  for i in range(clients)]
+        results = await asyncio.gather(*(client(count) for count in counts))
+        return [latency for result in results for latency in result]
+
+    started = time.perf_counter()
+    latencies = asyncio.get_event_loop().run_until_complete(main())
+    return latencies, time.perf_counter() - started
+
+
+def run_wsgi(application, path, cookie, clients, requests, threads, delay):
+    def serve():
+        status = []
+        result = application(make_environ(path, cookie),
+                             lambda s, h, e=None: status.append(s))
+        try:
+            for _ in result:
+                # The worker thread waits on the client.
+                time.sleep(delay)
+        finally:
+            result.close()
+        if int(status[0].split()[0]) >= 400:
+            raise AssertionError('%s returned %s' % (path, status[0]))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        async def request():
+            started = time.perf_counter()
+            await asyncio.get_event_loop().run_in_executor(executor, serve)
+            return time.perf_counter() - started
+
+        return summarize(*run_clients(request, clients, requests))
+
+
+def run_asgi(application, path, cookie, clients, requests, delay):
+    async def request():
+        started = time.perf_counter()
+        statuses = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif message.get('body'):
+                await asyncio.sleep(delay)
+
+        await application(make_scope(path, cookie), receive, send)
+        if statuses[0] >= 400:
+            raise AssertionError('%s returned %d' % (path, statuses[0]))
+        return time.perf_counter() - started
+
+    return summarize(*run_clients(request, clients, requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load')
+    parser.add_argument('--path', default='/login/')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=20,
+                        help="Worker threads of both servers.")
+    parser.add_argument('--delay', type=float, default=0.05,
+                        help="Seconds a client takes to read a response.")
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kenkyou.settings')
+    django.setup()
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    from kenkyou.handlers import ASGIHandler
+    from security.models import User
+
+    from . import datasets
+
+    setup_test_environment()
+    settings.ALLOWED_HOSTS = ['testserver']
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        datasets.create_dataset(1, kanji=100, learnt=50, enrolled=50)
+        client = Client()
+        client.force_login(User.objects.get())
+        cookie = '; '.join('%s=%s' % (key, morsel.value)
+                           for key, morsel in client.cookies.items())
+
+        application = get_wsgi_application()
+        results = {
+            'wsgi': run_wsgi(application, args.path, cookie, args.clients,
+                             args.requests, args.threads, args.delay),
+            'asgi': run_asgi(ASGIHandler(application, args.threads),
+                             args.path, cookie, args.clients, args.requests,
+                             args.delay),
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(json.dumps(results, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Measuring of the scenarios.
+"""
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from security.models import User
+
+from .datasets import user_email
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def measure(scenario, user, iterations, alloc_iterations):
+    """
+    Run a scenario and return its query count, latency and allocation
+    figures. The requests traced for allocations are not timed.
+    """
+    client = Client()
+    if scenario.login:
+        client.force_login(user)
+    scenario.prepare(client, user)
+
+    query_counts = []
+    latencies = []
+    allocations = []
+
+    for i in range(alloc_iterations + iterations):
+        scenario.setup(i)
+        traced = i < alloc_iterations
+
+        if traced:
+            tracemalloc.start()
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = scenario.run(i)
+            elapsed = time.perf_counter() - started
+
+        if traced:
+            allocations.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        else:
+            latencies.append(elapsed * 1000)
+
+        if response.status_code >= 400:
+            raise AssertionError('%s returned %d' % (scenario.name,
+                                                     response.status_code))
+
+        query_counts.append(len(queries))
+
+    queries = max(query_counts[1:] or query_counts)
+
+    return {
+        'queries': queries,
+        'budget': scenario.budget,
+        'over_budget': queries > scenario.budget,
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'peak_alloc_bytes': max(allocations) if allocations else None,
+    }
+
+
+@override_settings(SECURITY_RATE_LIMITS={})
+def run(scenarios, iterations=30, alloc_iterations=3):
+    """
+    Measure each scenario as a benchmark user of its own. All requests
+    come from one address, so rate limits are off.
+    """
+    results = {}
+
+    for i, scenario_class in enumerate(scenarios):
+        user = User.objects.get(email=user_email(i))
+        results[scenario_class.name] = measure(
+            scenario_class(), user, iterations, alloc_iterations
+        )
+
+    return results
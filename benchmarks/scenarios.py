@@ -0,0 +1,205 @@
+"""
+The requests each benchmark makes, with the maximum number of queries
+each view is allowed. Savepoints count as queries, so a view that runs
+in a transaction is given room for them.
+
+A scenario is prepared once with a client and a benchmark user of its
+own. Before each measured request `setup` may reset the state the
+previous request changed; only `run` is measured.
+"""
+from datetime import date
+
+from tutor import queue
+from tutor.models import KanjiTestingQueueItem, KanjiTestingRecord
+
+from .datasets import PASSWORD
+
+
+class Scenario:
+    name = None
+    budget = None
+    login = True
+
+    def prepare(self, client, user):
+        self.client = client
+        self.user = user
+
+    def setup(self, i):
+        pass
+
+    def run(self, i):
+        raise NotImplementedError
+
+
+class LearnKanjiGet(Scenario):
+    name = 'learn_kanji GET'
+    budget = 3
+
+    def run(self, i):
+        return self.client.get('/learn-kanji/')
+
+
+class LearnKanjiPost(Scenario):
+    name = 'learn_kanji POST'
+    budget = 23
+
+    def prepare(self, client, user):
+        super().prepare(client, user)
+        self.entry_ids = list(
+            user.kanjilearningrecord_set.filter(
+                is_learnt=False
+            ).order_by('kanji_entry__order').values_list(
+                'kanji_entry_id', flat=True
+            )
+        )
+
+    def run(self, i):
+        return self.client.post(
+            '/learn-kanji/', {'entry_id': self.entry_ids[i]}
+        )
+
+
+class TestingScenario(Scenario):
+    """
+    Make the first cards of the user due again before each request.
+    """
+    card_count = 1
+
+    def setup(self, i):
+        entry_ids = [
+            entry.id
+            for entry in queue.due(self.user.id, date.max, self.card_count)
+        ]
+        KanjiTestingRecord.objects.filter(
+            user=self.user,
+            kanji_entry_id__in=entry_ids
+        ).update(test_date=date.today(), correct_streak=1, interval=1)
+        KanjiTestingQueueItem.objects.filter(
+            user=self.user,
+            kanji_entry_id__in=entry_ids
+        ).update(test_date=date.today())
+        self.entry_ids = entry_ids
+
+
+class TestKanjiGet(TestingScenario):
+    name = 'test_kanji GET'
+    budget = 3
+
+    def run(self, i):
+        return self.client.get('/test-kanji/')
+
+
+class TestKanjiPost(TestingScenario):
+    name = 'test_kanji POST'
+    budget = 12
+
+    def run(self, i):
+        entry_id = self.entry_ids[0]
+        return self.client.post(
+            '/test-kanji/',
+            {'tested_entry_id': entry_id, 'chosen_entry_id': entry_id}
+        )
+
+
+class TestKanjiRevealGet(TestingScenario):
+    name = 'test_kanji_reveal GET'
+    budget = 3
+
+    def run(self, i):
+        return self.client.get(
+            '/test-kanji/reveal/%d/?answer_correct=True' % self.entry_ids[0]
+        )
+
+
+class TestKanjiBatchGet(TestingScenario):
+    name = 'test_kanji_batch GET'
+    budget = 3
+
+    def run(self, i):
+        return self.client.get('/test-kanji/batch/')
+
+
+class TestKanjiBatchPost(TestingScenario):
+    name = 'test_kanji_batch POST'
+    budget = 15
+    card_count = 10
+
+    def run(self, i):
+        data = {'tested_entry_id': self.entry_ids}
+        for j, entry_id in enumerate(self.entry_ids):
+            data['chosen_entry_id_%d' % entry_id] = entry_id if j % 2 else 0
+
+        return self.client.post('/test-kanji/batch/', data)
+
+
+class TestKanjiBatchResultGet(TestingScenario):
+    name = 'test_kanji_batch result GET'
+    budget = 3
+
+    def setup(self, i):
+        super().setup(i)
+        self.client.post('/test-kanji/batch/',
+                         {'tested_entry_id': self.entry_ids})
+
+    def run(self, i):
+        return self.client.get('/test-kanji/batch/result/')
+
+
+class LoginGet(Scenario):
+    name = 'login GET'
+    budget = 0
+    login = False
+
+    def run(self, i):
+        return self.client.get('/login/')
+
+
+class LoginPost(Scenario):
+    name = 'login POST'
+    budget = 6
+    login = False
+
+    def run(self, i):
+        return self.client.post(
+            '/login/', {'username': self.user.email, 'password': PASSWORD}
+        )
+
+
+class SignupGet(Scenario):
+    name = 'signup GET'
+    budget = 0
+    login = False
+
+    def run(self, i):
+        return self.client.get('/signup/')
+
+
+class SignupPost(Scenario):
+    name = 'signup POST'
+    budget = 4
+    login = False
+
+    def run(self, i):
+        username = 'signup%d' % i
+        return self.client.post('/signup/', {
+            'username': username,
+            'email': '%s@kenkyou.com' % username,
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        })
+
+
+SCENARIOS = [
+    LearnKanjiGet,
+    LearnKanjiPost,
+    TestKanjiGet,
+    TestKanjiPost,
+    TestKanjiRevealGet,
+    TestKanjiBatchGet,
+    TestKanjiBatchPost,
+    TestKanjiBatchResultGet,
+    LoginGet,
+    LoginPost,
+    SignupGet,
+    SignupPost,
+]
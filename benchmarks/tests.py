@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from . import datasets, runner
+from .scenarios import SCENARIOS
+
+
+class QueryBudgetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        datasets.create_dataset(len(SCENARIOS), kanji=30, learnt=12,
+                                enrolled=6)
+
+    def test_budgets(self):
+        results = runner.run(SCENARIOS, iterations=2, alloc_iterations=1)
+
+        for name, result in results.items():
+            self.assertLessEqual(
+                result['queries'], result['budget'],
+                msg="%s is over its query budget" % name
+            )
@@ -0,0 +1,16 @@
+"""
+ASGI config for kenkyou project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``, to be served by an ASGI server such as uvicorn:
+
+    uvicorn kenkyou.asgi:application
+"""
+
+import os
+
+from kenkyou.handlers import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kenkyou.settings')
+
+application = get_asgi_application()
@@ -0,0 +1,236 @@
+"""
+Cache backends.
+
+TieredCache keeps a small in-process LocMemCache in front of a shared
+cache, another entry of CACHES, so that hot keys are read without a round
+trip while every worker still sees the values the others write. Writes go
+through to the shared cache; a value changed by another process may be
+served from the local tier for up to LOCAL_TIMEOUT seconds, so data that
+must be coherent at once (sessions, counters) should use the shared cache
+directly.
+
+RedisCache is a minimal backend for a Redis server, for the shared tier
+when the file-based cache is not enough. It needs the redis package.
+"""
+import pickle
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+MISSING = object()
+
+
+class TieredCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'shared')
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._local = LocMemCache(location or 'tiered', {
+            'TIMEOUT': self._local_timeout,
+            'KEY_PREFIX': params.get('KEY_PREFIX', ''),
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+            },
+        })
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def get_local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._local_timeout
+        return min(timeout, self._local_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, self.get_timeout(timeout),
+                                version)
+        if added:
+            self._local.set(key, value, self.get_local_timeout(timeout),
+                            version)
+        else:
+            self._local.delete(key, version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        value = self._local.get(key, MISSING, version)
+        if value is MISSING:
+            value = self.shared.get(key, MISSING, version)
+            if value is MISSING:
+                return default
+            self._local.set(key, value, self._local_timeout, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, self.get_timeout(timeout), version)
+        self._local.set(key, value, self.get_local_timeout(timeout),
+                        version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local.delete(key, version)
+        return self.shared.touch(key, self.get_timeout(timeout), version)
+
+    def delete(self, key, version=None):
+        self._local.delete(key, version)
+        self.shared.delete(key, version)
+
+    def has_key(self, key, version=None):
+        return (self._local.has_key(key, version) or
+                self.shared.has_key(key, version))
+
+    def incr(self, key, delta=1, version=None):
+        self._local.delete(key, version)
+        return self.shared.incr(key, delta, version)
+
+    def get_many(self, keys, version=None):
+        values = self._local.get_many(keys, version)
+        missing = [key for key in keys if key not in values]
+        if missing:
+            shared_values = self.shared.get_many(missing, version)
+            self._local.set_many(shared_values, self._local_timeout,
+                                 version)
+            values.update(shared_values)
+        return values
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.shared.set_many(data, self.get_timeout(timeout),
+                                           version)
+        self._local.set_many(data, self.get_local_timeout(timeout), version)
+        return failed_keys
+
+    def delete_many(self, keys, version=None):
+        self._local.delete_many(keys, version)
+        self.shared.delete_many(keys, version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def get_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+
+class RedisCache(BaseCache):
+    """
+    Values are pickled, except integers, which are stored as they are so
+    that incr() is atomic on the server. clear() empties the whole Redis
+    database, so give the cache a database of its own.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured(
+                "RedisCache requires the redis package."
+            )
+        self._client = redis.Redis.from_url(server)
+
+    def get_ttl(self, timeout):
+        """
+        Return the expiry in seconds, None for none, or 0 to delete.
+        """
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout), 0)
+
+    def dumps(self, value):
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        ttl = self.get_ttl(timeout)
+        if ttl == 0:
+            return False
+        return bool(self._client.set(key, self.dumps(value), ex=ttl,
+                                     nx=True))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        data = self._client.get(key)
+        return default if data is None else self.loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        ttl = self.get_ttl(timeout)
+        if ttl == 0:
+            self._client.delete(key)
+        else:
+            self._client.set(key, self.dumps(value), ex=ttl)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        ttl = self.get_ttl(timeout)
+        if ttl is None:
+            return bool(self._client.persist(key)) or \
+                bool(self._client.exists(key))
+        return bool(self._client.expire(key, ttl))
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        self._client.delete(key)
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return bool(self._client.exists(key))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        if not self._client.exists(key):
+            raise ValueError("Key '%s' not found" % key)
+        return self._client.incrby(key, delta)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        made_keys = [self.make_key(key, version) for key in keys]
+        return {
+            key: self.loads(data)
+            for key, data in zip(keys, self._client.mget(made_keys))
+            if data is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        pipeline = self._client.pipeline()
+        ttl = self.get_ttl(timeout)
+        for key, value in data.items():
+            key = self.make_key(key, version)
+            self.validate_key(key)
+            if ttl == 0:
+                pipeline.delete(key)
+            else:
+                pipeline.set(key, self.dumps(value), ex=ttl)
+        pipeline.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self):
+        self._client.flushdb()
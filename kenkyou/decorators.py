@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_cookie
+
+
+def cache_per_session(view):
+    """
+    Cache the page of a view for PAGE_CACHE_TIMEOUT seconds, separately
+    for each session. Logging in or out starts a new session, so pages
+    cached for the old one are not served any more.
+    """
+    return cache_page(settings.PAGE_CACHE_TIMEOUT)(vary_on_cookie(view))
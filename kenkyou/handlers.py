@@ -0,0 +1,180 @@
+"""
+ASGI handler for the WSGI application.
+
+Django 2.1 has no ASGI support and no async views, so the handler runs
+the WSGI application in a pool of threads and does all the waiting on the
+client on the event loop: the request body is read before a thread is
+taken and the response is sent after, or while, it is produced. A thread
+is only held for as long as Django works on a request, and one process
+can keep many slow clients waiting.
+
+Response chunks go from the thread to the event loop through a bounded
+queue, so a streaming response holds its thread only while the client
+keeps up or the queue has room.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import sys
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+
+DEFAULT_QUEUE_SIZE = 8
+
+
+class ResponseChannel:
+    """
+    Pass ASGI messages from a worker thread to the event loop.
+    """
+
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+        self.closed = False
+
+    def put(self, message):
+        asyncio.run_coroutine_threadsafe(
+            self.queue.put(message), self.loop
+        ).result()
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class ASGIHandler:
+
+    def __init__(self, wsgi_application, max_workers=None,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.queue_size = queue_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported scope type %r' % scope['type'])
+
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_event_loop()
+        channel = ResponseChannel(loop, self.queue_size)
+        future = loop.run_in_executor(self.executor, self.run, scope, body,
+                                      channel)
+
+        try:
+            while True:
+                message = await channel.get()
+                if message is None:
+                    break
+                await send(message)
+        except BaseException:
+            # The client is gone: let the thread finish without waiting.
+            channel.closed = True
+            while await channel.get() is not None:
+                pass
+            raise
+        finally:
+            await future
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """
+        Return the request body, or None if the client disconnects.
+        """
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def get_environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('127.0.0.1', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_' + name
+            if name in environ:
+                # Cookie headers are joined like the pairs of one header.
+                separator = '; ' if name == 'HTTP_COOKIE' else ','
+                value = environ[name] + separator + value
+            environ[name] = value
+
+        return environ
+
+    def run(self, scope, body, channel):
+        """
+        Run the WSGI application in a worker thread.
+        """
+        try:
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response['status'] = int(status.split(' ', 1)[0])
+                response['headers'] = [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in headers
+                ]
+
+            result = self.wsgi_application(self.get_environ(scope, body),
+                                           start_response)
+            try:
+                channel.put({
+                    'type': 'http.response.start',
+                    'status': response['status'],
+                    'headers': response['headers'],
+                })
+                for chunk in result:
+                    if channel.closed:
+                        break
+                    if chunk:
+                        channel.put({'type': 'http.response.body',
+                                     'body': chunk, 'more_body': True})
+                channel.put({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            channel.put(None)
+
+
+def get_asgi_application():
+    return ASGIHandler(get_wsgi_application(),
+                       max_workers=getattr(settings, 'ASGI_THREADS', None))
@@ -0,0 +1,104 @@
+"""
+In-process metrics with a Prometheus text exposition.
+
+Metrics live in the process that records them, so each worker exports its
+own figures and the scraper adds them up.
+"""
+from bisect import bisect_left
+import threading
+
+
+class Histogram:
+
+    def __init__(self, name, documentation, buckets, label='view'):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, label_value, value):
+        with self._lock:
+            counts, total = self._values.get(
+                label_value, ([0] * (len(self.buckets) + 1), 0)
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[label_value] = counts, total + value
+
+    def snapshot(self):
+        with self._lock:
+            return {label_value: (list(counts), total)
+                    for label_value, (counts, total) in self._values.items()}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [
+            '# HELP %s %s' % (self.name, self.documentation),
+            '# TYPE %s histogram' % self.name,
+        ]
+
+        for label_value, (counts, total) in sorted(self.snapshot().items()):
+            label = '%s="%s"' % (self.label, label_value)
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append('%s_bucket{%s,le="%s"} %d' % (
+                    self.name, label, bound, cumulative
+                ))
+
+            lines.append('%s_sum{%s} %s' % (self.name, label, total))
+            lines.append('%s_count{%s} %d' % (self.name, label, cumulative))
+
+        return '\n'.join(lines)
+
+
+class Counter:
+
+    def __init__(self, name, documentation, label='view'):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self._values[label_value] = \
+                self._values.get(label_value, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [
+            '# HELP %s %s' % (self.name, self.documentation),
+            '# TYPE %s counter' % self.name,
+        ]
+
+        for label_value, value in sorted(self.snapshot().items()):
+            lines.append('%s{%s="%s"} %s' % (self.name, self.label,
+                                             label_value, value))
+
+        return '\n'.join(lines)
+
+
+registry = []
+
+
+def register(metric):
+    registry.append(metric)
+    return metric
+
+
+def render():
+    return '\n'.join(metric.render() for metric in registry) + '\n'
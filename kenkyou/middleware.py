@@ -0,0 +1,116 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+request_seconds = metrics.register(metrics.Histogram(
+    'kenkyou_request_seconds', "Time spent in the request.",
+    SECONDS_BUCKETS
+))
+view_seconds = metrics.register(metrics.Histogram(
+    'kenkyou_request_view_seconds',
+    "Time spent in the request outside of template rendering.",
+    SECONDS_BUCKETS
+))
+render_seconds = metrics.register(metrics.Histogram(
+    'kenkyou_request_render_seconds', "Time spent rendering templates.",
+    SECONDS_BUCKETS
+))
+db_seconds = metrics.register(metrics.Histogram(
+    'kenkyou_request_db_seconds', "Time spent in database queries.",
+    SECONDS_BUCKETS
+))
+queries = metrics.register(metrics.Histogram(
+    'kenkyou_request_queries', "Number of database queries.",
+    QUERY_BUCKETS
+))
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.render_time = 0
+        self.render_started = None
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def rendered(self, response):
+        self.render_time += time.perf_counter() - self.render_started
+
+
+class InstrumentationMiddleware:
+    """
+    Record the query count, database time, template render time and view
+    time of each request per URL name, and log the requests that go over
+    INSTRUMENTATION_QUERY_BUDGET or INSTRUMENTATION_TIME_BUDGET.
+
+    Enabled with the INSTRUMENTATION_ENABLED setting.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.query_budget = getattr(
+            settings, 'INSTRUMENTATION_QUERY_BUDGET', None
+        )
+        self.time_budget = getattr(
+            settings, 'INSTRUMENTATION_TIME_BUDGET', None
+        )
+
+    def __call__(self, request):
+        stats = request.instrumentation = RequestStats()
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats.execute):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        name = match.url_name if match and match.url_name else 'unnamed'
+
+        request_seconds.observe(name, elapsed)
+        view_seconds.observe(name, elapsed - stats.render_time)
+        render_seconds.observe(name, stats.render_time)
+        db_seconds.observe(name, stats.db_time)
+        queries.observe(name, stats.queries)
+
+        if (self.query_budget is not None and
+                stats.queries > self.query_budget) or \
+                (self.time_budget is not None and
+                 elapsed > self.time_budget):
+            logger.warning(
+                "%s %s (%s) over budget: %d queries, %.1f ms total, "
+                "%.1f ms in database, %.1f ms rendering",
+                request.method, request.path, name, stats.queries,
+                elapsed * 1000, stats.db_time * 1000,
+                stats.render_time * 1000
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        stats = request.instrumentation
+        stats.render_started = time.perf_counter()
+        response.add_post_render_callback(stats.rendered)
+        return response
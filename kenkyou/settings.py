@@ -39,25 +39,32 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'security.apps.SecurityConfig',
     'tutor.apps.TutorConfig',
+    'mailer.apps.MailerConfig',
 ]
 
 MIDDLEWARE = [
+    'kenkyou.middleware.InstrumentationMiddleware',
+    'security.middleware.PasswordRehashMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'security.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'kenkyou.urls'
 
+_template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'kenkyou/templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -65,11 +72,16 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates are compiled once per process unless debugging.
+            'loaders': _template_loaders if DEBUG else [
+                ('django.template.loaders.cached.Loader', _template_loaders),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'kenkyou.wsgi.application'
+ASGI_THREADS = 20
 
 
 # Database
@@ -101,6 +113,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Passwords are hashed with the first hasher; the others only check older
+# hashes, which are upgraded in the background after the next login. Run
+# `manage.py tune_hashers` for the costs that suit the machine. Argon2
+# needs the argon2-cffi package.
+
+PASSWORD_HASHERS = [
+    'security.hashers.PBKDF2PasswordHasher',
+    'security.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+SECURITY_PBKDF2_ITERATIONS = 120000
+SECURITY_SCRYPT_WORK_FACTOR = 2 ** 14
+SECURITY_REHASH_THREADS = 1
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
@@ -129,12 +158,97 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'index'
 LOGOUT_REDIRECT_URL = 'index'
 
+# The token of a verification link is kept in a signed cookie, or in the
+# shared cache with 'security.tokens.CacheTokenStorage', between the link
+# and the page it redirects to.
+SECURITY_TOKEN_STORAGE = 'security.tokens.CookieTokenStorage'
+SECURITY_TOKEN_AGE = 600
+
+# Posts to these views are limited per client address and per form field
+# with token buckets of (field, capacity, period in seconds).
+SECURITY_RATE_LIMITS = {
+    'login': [('ip', 30, 60), ('username', 10, 600)],
+    'signup': [('ip', 5, 3600)],
+    'reset_password': [('ip', 5, 3600), ('email', 3, 3600)],
+}
+# The number of reverse proxies in front of the server that append the
+# client address to X-Forwarded-For. 0 assumes clients connect directly;
+# with a proxy and 0, all clients share the proxy's address and buckets.
+SECURITY_TRUSTED_PROXIES = 0
+
 
 # Email
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+EMAIL_BACKEND = 'mailer.backends.OutboxBackend'
+MAILER_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+MAILER_MAX_ATTEMPTS = 5
+MAILER_RETRY_DELAY = 60
+MAILER_LEASE = 300
+
+
+# Caching
+# The default cache keeps recent values in each process in front of the
+# shared cache, which all processes see. Sessions use the shared cache
+# directly, backed by the database; clearsessions deletes expired ones
+# SESSION_CLEAR_BATCH_SIZE at a time. For Redis, set the shared BACKEND to
+# 'kenkyou.cache.RedisCache' and its LOCATION to a URL such as
+# 'redis://localhost:6379/1'.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'kenkyou.cache.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_TIMEOUT': 5,
+            'LOCAL_MAX_ENTRIES': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
+}
+
+SESSION_ENGINE = 'security.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_CLEAR_BATCH_SIZE = 1000
+
+PAGE_CACHE_TIMEOUT = 300
 
 
 # Testing
 
 FIXTURE_DIRS = ['kenkyou/fixtures']
+
+TEST_RUNNER = 'kenkyou.testing.TestRunner'
+TEST_CACHES = {
+    'default': dict(CACHES['default'], LOCATION='test-tiered'),
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-shared',
+    },
+}
+
+
+# Instrumentation
+
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_QUERY_BUDGET = 20
+INSTRUMENTATION_TIME_BUDGET = 0.5
+# /metrics/ is served to staff users, and to scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>" when the token is set.
+METRICS_TOKEN = None
+
+
+# Tutor
+
+TUTOR_DISTRACTOR_STRATEGY = 'uniform'
+TUTOR_DISTRACTOR_OPTIONS = {}
+# Users who signed up with lazy learning on are not enrolled; run
+# `manage.py enroll --all` when turning it off (see tutor.cursor).
+TUTOR_LAZY_LEARNING = False
+TUTOR_ENROLL_ON_SIGNUP = True
+TUTOR_ENROLL_BATCH_SIZE = 500
+TUTOR_TEST_BATCH_SIZE = 10
+TUTOR_SCHEDULER = 'exponential'
+TUTOR_SCHEDULER_OPTIONS = {}
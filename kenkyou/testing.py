@@ -0,0 +1,22 @@
+"""
+Test runner.
+
+The shared cache is a directory on disk, which would keep state such as
+rate limit buckets and sessions from one run to the next. Tests run with
+the caches of TEST_CACHES instead.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=settings.TEST_CACHES)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,274 @@
+import asyncio
+import time
+
+from django.core.cache import cache, caches
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from security.models import User
+
+from . import handlers, middleware
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        for histogram in [middleware.request_seconds, middleware.queries,
+                          middleware.render_seconds]:
+            histogram.clear()
+
+    @override_settings(INSTRUMENTATION_TIME_BUDGET=0)
+    def test_request(self):
+        with self.assertLogs('kenkyou.middleware', 'WARNING'):
+            self.client.get('/login/')
+
+        counts, total = middleware.queries.snapshot()['login']
+
+        self.assertEqual(
+            (sum(counts), total), (1, 0),
+            msg="Queries are not recorded per URL name"
+        )
+        self.assertGreater(
+            middleware.render_seconds.snapshot()['login'][1], 0,
+            msg="Render time is not recorded"
+        )
+
+    @override_settings(METRICS_TOKEN='metrics-token')
+    def test_export(self):
+        self.client.get('/login/')
+
+        response = self.client.get(
+            '/metrics/', HTTP_AUTHORIZATION='Bearer metrics-token'
+        )
+
+        self.assertContains(
+            response,
+            'kenkyou_request_queries_count{view="login"} 1',
+            msg_prefix="Histogram is not exported"
+        )
+
+    def test_export_staff(self):
+        User.objects.create_user('staff', 'staff@kenkyou.com',
+                                 'Staff-Password', is_staff=True)
+        self.client.login(username='staff@kenkyou.com',
+                          password='Staff-Password')
+
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Metrics are not exported to staff"
+        )
+
+    @override_settings(METRICS_TOKEN='metrics-token')
+    def test_export_forbidden(self):
+        for headers in [{'REMOTE_ADDR': '127.0.0.1'},
+                        {'HTTP_AUTHORIZATION': 'Bearer other-token'}]:
+            response = self.client.get('/metrics/', **headers)
+
+            self.assertEqual(
+                response.status_code, 403,
+                msg="Metrics are exported without the token"
+            )
+
+    def test_export_without_token(self):
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer ')
+
+        self.assertEqual(
+            response.status_code, 403,
+            msg="Metrics are exported when no token is set"
+        )
+
+
+class PageCacheTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        cache.clear()
+
+    def test_done_page(self):
+        self.client.login(username='tester1@kenkyou.com', password='user')
+        self.client.get('/learn-kanji/done/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/learn-kanji/done/')
+
+        self.assertContains(
+            response, 'tester1',
+            msg_prefix="Cached page not of the user"
+        )
+
+        self.client.logout()
+        self.client.login(username='tester2@kenkyou.com', password='user')
+
+        self.assertContains(
+            self.client.get('/learn-kanji/done/'), 'tester2',
+            msg_prefix="Page cached for another session served"
+        )
+
+    def test_header_fragment(self):
+        self.client.login(username='tester1@kenkyou.com', password='user')
+        self.client.get('/signup/verify/pending')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/signup/verify/pending')
+
+        self.assertContains(
+            response, 'tester1',
+            msg_prefix="Header not served from the fragment cache"
+        )
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'kenkyou.cache.TieredCache',
+        'LOCATION': 'test-tiered',
+        'OPTIONS': {'SHARED': 'shared', 'LOCAL_TIMEOUT': 60},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-shared',
+    },
+})
+class TieredCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_write_through(self):
+        self.cache.set('key', 'value')
+
+        self.assertEqual(
+            self.shared.get('key'), 'value',
+            msg="Value not written to the shared cache"
+        )
+
+    def test_local(self):
+        self.shared.set('key', 'value')
+
+        self.assertEqual(
+            self.cache.get('key'), 'value',
+            msg="Value not read from the shared cache"
+        )
+
+        self.shared.delete('key')
+
+        self.assertEqual(
+            self.cache.get('key'), 'value',
+            msg="Value not kept in the local cache"
+        )
+        self.assertIsNone(
+            self.cache.get('missing'),
+            msg="Missing value found"
+        )
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.shared.incr('counter', 5)
+
+        self.assertEqual(
+            (self.cache.incr('counter'), self.cache.get('counter')), (7, 7),
+            msg="Counter not incremented in the shared cache"
+        )
+
+    def test_many(self):
+        self.shared.set_many({'a': 1, 'b': 2})
+        self.cache.get('a')
+
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2},
+            msg="Values not read from both caches"
+        )
+
+        self.cache.delete_many(['a', 'b'])
+
+        self.assertEqual(
+            self.shared.get_many(['a', 'b']), {},
+            msg="Values not deleted from the shared cache"
+        )
+
+
+class ASGIHandlerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.handler = handlers.ASGIHandler(get_wsgi_application(), 2)
+        self.addCleanup(self.handler.executor.shutdown)
+
+    def request(self, path, query_string=b'', delay=0):
+        messages = []
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query_string,
+            'headers': [(b'host', b'testserver')],
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            await asyncio.sleep(delay)
+            messages.append(message)
+
+        return scope, receive, send, messages
+
+    def test_request(self):
+        scope, receive, send, messages = self.request('/login/')
+        asyncio.get_event_loop().run_until_complete(
+            self.handler(scope, receive, send)
+        )
+
+        self.assertEqual(
+            (messages[0]['type'], messages[0]['status']),
+            ('http.response.start', 200),
+            msg="Response not started"
+        )
+        self.assertIn(
+            b'<h1>Login</h1>',
+            b''.join(message.get('body', b'') for message in messages),
+            msg="Response body not sent"
+        )
+        self.assertFalse(
+            messages[-1].get('more_body'),
+            msg="Response not ended"
+        )
+
+    def test_repeated_headers(self):
+        environ = self.handler.get_environ({
+            'type': 'http',
+            'method': 'GET',
+            'path': '/',
+            'headers': [
+                (b'cookie', b'sessionid=abc'),
+                (b'cookie', b'csrftoken=def'),
+                (b'accept', b'text/html'),
+                (b'accept', b'text/plain'),
+            ],
+        }, b'')
+
+        self.assertEqual(
+            environ['HTTP_COOKIE'], 'sessionid=abc; csrftoken=def',
+            msg="Cookie headers not joined as cookies"
+        )
+        self.assertEqual(
+            environ['HTTP_ACCEPT'], 'text/html,text/plain',
+            msg="Repeated headers not joined"
+        )
+
+    def test_concurrent_slow_clients(self):
+        requests = [self.request('/login/', delay=0.2) for _ in range(6)]
+
+        started = time.perf_counter()
+        asyncio.get_event_loop().run_until_complete(asyncio.gather(*(
+            self.handler(scope, receive, send)
+            for scope, receive, send, _ in requests
+        )))
+
+        self.assertLess(
+            time.perf_counter() - started, 6 * 3 * 0.2 / 2,
+            msg="Threads held while waiting on clients"
+        )
@@ -6,6 +6,7 @@ from . import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', views.export_metrics, name='metrics'),
     path('', include('security.urls')),
     path('', include('tutor.urls')),
 
@@ -1,6 +1,45 @@
+from datetime import date
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
 from django.http import HttpResponse
+from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+
+from tutor import forecast
+
+from . import metrics
 
 
 def index(request):
-    return HttpResponse("Index")
+    context = {'title': _('Index')}
+
+    if request.user.is_authenticated:
+        user_forecast = forecast.forecast(request.user.id, date.today())
+        context.update({
+            'due_today': int(user_forecast.due[0]),
+            'due_total': int(user_forecast.due.sum()),
+            'load_total': int(user_forecast.load.sum()),
+            'weeks': forecast.weeks(user_forecast),
+        })
+
+    return render(request, 'kenkyou/index.html', context)
+
+
+def has_metrics_token(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, separator, value = header.partition(' ')
+
+    return bool(token) and scheme.lower() == 'bearer' and \
+        constant_time_compare(value.strip(), token)
+
+
+def export_metrics(request):
+    if not request.user.is_staff and not has_metrics_token(request):
+        raise PermissionDenied
+
+    return HttpResponse(metrics.render(),
+                        content_type='text/plain; version=0.0.4')
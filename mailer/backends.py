@@ -0,0 +1,14 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from . import outbox
+
+
+class OutboxBackend(BaseEmailBackend):
+    """
+    Store messages in the outbox instead of sending them.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        return outbox.enqueue(email_messages)
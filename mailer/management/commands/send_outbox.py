@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ... import outbox
+
+
+class Command(BaseCommand):
+    help = "Send the messages in the email outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep polling the outbox instead of exiting when empty."
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help="Seconds between polls with --loop."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.send_all(options['batch_size'])
+
+            if sent or failed or options['verbosity'] > 1:
+                self.stdout.write(
+                    "Sent %d messages, %d failed" % (sent, failed)
+                )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    from_email = models.CharField(max_length=254)
+    to = models.TextField()
+    cc = models.TextField(blank=True)
+    bcc = models.TextField(blank=True)
+    subject = models.TextField()
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField()
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    is_failed = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_failed', 'send_after'],
+                         name='mailer_outbox_failed_after'),
+        ]
@@ -0,0 +1,162 @@
+"""
+Database-backed outbox for outgoing email.
+
+The OutboxBackend (see mailer.backends) only stores messages. The
+send_outbox command takes due messages in batches, sends each batch over
+one connection of the MAILER_BACKEND and deletes the ones that are sent.
+A message that fails is retried after MAILER_RETRY_DELAY seconds, doubled
+on every attempt, and is marked failed after MAILER_MAX_ATTEMPTS.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+def join_addresses(addresses):
+    return '\n'.join(addresses or [])
+
+
+def split_addresses(value):
+    return value.split('\n') if value else []
+
+
+def to_outbox_message(message, send_after):
+    """
+    Return an unsaved OutboxMessage of a django.core.mail.EmailMessage.
+    Only the addresses, the subject, the body and an html alternative are
+    kept.
+    """
+    if message.attachments:
+        raise ValueError("Attachments are not supported by the outbox.")
+
+    html_body = ''
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html':
+            html_body = content
+
+    return OutboxMessage(
+        from_email=message.from_email,
+        to=join_addresses(message.to),
+        cc=join_addresses(message.cc),
+        bcc=join_addresses(message.bcc),
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        send_after=send_after
+    )
+
+
+def to_email_message(outbox_message, connection=None):
+    message = EmailMultiAlternatives(
+        outbox_message.subject,
+        outbox_message.body,
+        outbox_message.from_email,
+        split_addresses(outbox_message.to),
+        bcc=split_addresses(outbox_message.bcc),
+        cc=split_addresses(outbox_message.cc),
+        connection=connection
+    )
+    if outbox_message.html_body:
+        message.attach_alternative(outbox_message.html_body, 'text/html')
+    return message
+
+
+def enqueue(messages):
+    """
+    Store django.core.mail.EmailMessages to be sent. Return their number.
+    """
+    now = timezone.now()
+    OutboxMessage.objects.bulk_create(
+        [to_outbox_message(message, now) for message in messages]
+    )
+    return len(messages)
+
+
+def retry_delay(attempts):
+    delay = getattr(settings, 'MAILER_RETRY_DELAY', 60)
+    return timedelta(seconds=delay * 2 ** (attempts - 1))
+
+
+def claim(batch_size, now=None):
+    """
+    Return up to `batch_size` due messages and push their send time back
+    by MAILER_LEASE seconds, so that other workers skip them while they
+    are being sent.
+    """
+    if now is None:
+        now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'MAILER_LEASE', 300))
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                is_failed=False, send_after__lte=now
+            ).order_by('send_after', 'id')[:batch_size]
+        )
+        OutboxMessage.objects.filter(
+            id__in=[message.id for message in messages]
+        ).update(send_after=now + lease)
+
+    return messages
+
+
+def send_batch(connection, batch_size=100):
+    """
+    Send one batch of due messages over `connection`. Return the number
+    of messages sent and failed.
+    """
+    messages = claim(batch_size)
+    max_attempts = getattr(settings, 'MAILER_MAX_ATTEMPTS', 5)
+    sent_ids = []
+    failed = 0
+
+    for message in messages:
+        try:
+            connection.send_messages([to_email_message(message, connection)])
+        except Exception as e:
+            # The connection may be broken, open a new one for the next.
+            connection.close()
+            message.attempts += 1
+            message.last_error = repr(e)
+            message.is_failed = message.attempts >= max_attempts
+            message.send_after = timezone.now() + retry_delay(message.attempts)
+            message.save(update_fields=['attempts', 'last_error',
+                                        'is_failed', 'send_after'])
+            failed += 1
+        else:
+            sent_ids.append(message.id)
+
+    OutboxMessage.objects.filter(id__in=sent_ids).delete()
+
+    return len(sent_ids), failed
+
+
+def get_delivery_connection():
+    return get_connection(
+        getattr(settings, 'MAILER_BACKEND',
+                'django.core.mail.backends.smtp.EmailBackend'),
+        fail_silently=False
+    )
+
+
+def send_all(batch_size=100):
+    """
+    Send batches until no message is due. Return the number of messages
+    sent and failed.
+    """
+    sent = failed = 0
+
+    with get_delivery_connection() as connection:
+        while True:
+            batch_sent, batch_failed = send_batch(connection, batch_size)
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed < batch_size:
+                break
+
+    return sent, failed
@@ -0,0 +1,99 @@
+"""
+Rendering of templated email.
+
+Templates are compiled once per process and kept, whatever the template
+loaders are, and the site name and domain are looked up once per host,
+so rendering a batch of messages only costs the rendering itself.
+"""
+import threading
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import loader
+
+
+_lock = threading.Lock()
+_templates = {}
+_sites = {}
+
+
+def get_template(template_name):
+    template = _templates.get(template_name)
+    if template is None:
+        template = loader.get_template(template_name)
+        with _lock:
+            _templates[template_name] = template
+    return template
+
+
+def get_site(request):
+    """
+    Return the name and domain of the current site.
+    """
+    key = request.get_host() if request is not None else None
+    site = _sites.get(key)
+    if site is None:
+        current_site = get_current_site(request)
+        site = (current_site.name, current_site.domain)
+        with _lock:
+            _sites[key] = site
+    return site
+
+
+@receiver(setting_changed)
+def clear(**kwargs):
+    if kwargs.get('setting') in (None, 'TEMPLATES', 'SITE_ID'):
+        with _lock:
+            _templates.clear()
+            _sites.clear()
+
+
+class MailTemplate:
+    """
+    The subject, body and optional html templates of an email.
+    """
+
+    def __init__(self, subject_template_name, email_template_name,
+                 html_email_template_name=None, from_email=None):
+        self.subject_template = get_template(subject_template_name)
+        self.email_template = get_template(email_template_name)
+        self.html_email_template = (
+            get_template(html_email_template_name)
+            if html_email_template_name is not None else None
+        )
+        self.from_email = from_email
+
+    def render(self, context, to_email, connection=None):
+        """
+        Return a django.core.mail.EmailMultiAlternatives to `to_email`.
+        """
+        subject = self.subject_template.render(context)
+        subject = ''.join(subject.splitlines())
+        body = self.email_template.render(context)
+
+        message = EmailMultiAlternatives(subject, body, self.from_email,
+                                         [to_email], connection=connection)
+        if self.html_email_template is not None:
+            message.attach_alternative(
+                self.html_email_template.render(context), 'text/html'
+            )
+        return message
+
+    def render_many(self, recipients, connection=None):
+        """
+        Return a message for each (context, to_email) in `recipients`.
+        """
+        return [self.render(context, to_email, connection)
+                for context, to_email in recipients]
+
+    def send_many(self, recipients):
+        """
+        Render and send a message for each (context, to_email) in
+        `recipients` over one connection. Return the number sent.
+        """
+        connection = get_connection()
+        return connection.send_messages(
+            self.render_many(recipients, connection)
+        ) or 0
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import outbox, rendering
+from .models import OutboxMessage
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('Mail server unavailable')
+
+
+@override_settings(
+    EMAIL_BACKEND='mailer.backends.OutboxBackend',
+    MAILER_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+)
+class OutboxTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def test_signup(self):
+        self.client.post('/signup/', {
+            'username': 'tester3',
+            'email': 'tester3@kenkyou.com',
+            'password1': 'Kenkyou-Password',
+            'password2': 'Kenkyou-Password',
+        })
+
+        self.assertEqual(
+            (OutboxMessage.objects.count(), len(mail.outbox)), (1, 0),
+            msg="Signup email not only enqueued"
+        )
+
+        call_command('send_outbox', stdout=StringIO())
+
+        self.assertEqual(
+            mail.outbox[0].to, ['tester3@kenkyou.com'],
+            msg="Signup email not sent by the worker"
+        )
+        self.assertFalse(
+            OutboxMessage.objects.exists(),
+            msg="Sent message not removed from the outbox"
+        )
+
+    def test_reset_password(self):
+        self.client.post('/reset-password/',
+                         {'email': 'tester1@kenkyou.com'})
+
+        self.assertEqual(
+            (OutboxMessage.objects.count(), len(mail.outbox)), (1, 0),
+            msg="Reset password email not only enqueued"
+        )
+
+        outbox.send_all()
+
+        self.assertEqual(
+            mail.outbox[0].to, ['tester1@kenkyou.com'],
+            msg="Reset password email not sent by the worker"
+        )
+
+    def test_html_alternative(self):
+        message = mail.EmailMultiAlternatives(
+            'Subject', 'Body', 'from@kenkyou.com', ['to@kenkyou.com'],
+            bcc=['bcc@kenkyou.com']
+        )
+        message.attach_alternative('<p>Body</p>', 'text/html')
+        message.send()
+
+        outbox.send_all()
+
+        self.assertEqual(
+            (mail.outbox[0].alternatives, mail.outbox[0].bcc),
+            ([('<p>Body</p>', 'text/html')], ['bcc@kenkyou.com']),
+            msg="Message not kept in the outbox"
+        )
+
+    def test_batches(self):
+        mail.send_mass_mail([
+            ('Subject', 'Body', 'from@kenkyou.com', ['to@kenkyou.com'])
+        ] * 5)
+
+        self.assertEqual(
+            outbox.send_all(batch_size=2), (5, 0),
+            msg="Not all batches sent"
+        )
+
+    @override_settings(MAILER_BACKEND='mailer.tests.FailingBackend',
+                       MAILER_MAX_ATTEMPTS=2, MAILER_RETRY_DELAY=60)
+    def test_retry(self):
+        mail.send_mail('Subject', 'Body', 'from@kenkyou.com',
+                       ['to@kenkyou.com'])
+
+        before = timezone.now()
+        self.assertEqual(
+            outbox.send_all(), (0, 1),
+            msg="Failed message not counted"
+        )
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(
+            (message.attempts, message.is_failed), (1, False),
+            msg="Failed message not kept for retry"
+        )
+        self.assertGreaterEqual(
+            message.send_after, before + timedelta(seconds=60),
+            msg="Retry not delayed"
+        )
+        self.assertEqual(
+            outbox.send_all(), (0, 0),
+            msg="Message retried before its delay"
+        )
+
+        message.send_after = before
+        message.save()
+        outbox.send_all()
+
+        message.refresh_from_db()
+        self.assertEqual(
+            (message.attempts, message.is_failed), (2, True),
+            msg="Message not marked failed after the last attempt"
+        )
+        self.assertGreaterEqual(
+            message.send_after, before + timedelta(seconds=120),
+            msg="Retry delay not doubled"
+        )
+
+
+@override_settings(EMAIL_BACKEND='mailer.backends.OutboxBackend')
+class MailTemplateTestCase(TestCase):
+
+    def test_get_template(self):
+        self.assertIs(
+            rendering.get_template('security/signup_verify_email.html'),
+            rendering.get_template('security/signup_verify_email.html'),
+            msg="Template compiled again"
+        )
+
+    def test_send_many(self):
+        template = rendering.MailTemplate(
+            'security/signup_verify_subject.txt',
+            'security/signup_verify_email.html'
+        )
+        recipients = [
+            ({'site_name': 'kenkyou', 'domain': 'kenkyou.com',
+              'protocol': 'https', 'uid': 'MQ', 'token': 'token%d' % i},
+             'tester%d@kenkyou.com' % i)
+            for i in range(3)
+        ]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                template.send_many(recipients), 3,
+                msg="Not all messages sent"
+            )
+
+        self.assertEqual(
+            [('token%d' % i) in message.body
+             for i, message in enumerate(
+                 OutboxMessage.objects.order_by('id')
+             )],
+            [True] * 3,
+            msg="Message not rendered with its own context"
+        )
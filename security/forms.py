@@ -1,11 +1,10 @@
 from django.contrib.auth import forms
 from django.contrib.auth.tokens import default_token_generator
-from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMultiAlternatives
-from django.template import loader
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
+from mailer import rendering
+
 from . import models
 
 
@@ -22,18 +21,10 @@ class SignupForm(forms.UserCreationForm):
         """
         Send a django.core.mail.EmailMultiAlternatives to `to_email`.
         """
-        subject = loader.render_to_string(subject_template_name, context)
-        subject = ''.join(subject.splitlines())
-        body = loader.render_to_string(email_template_name, context)
-
-        email_message = EmailMultiAlternatives(subject, body,
-                                               from_email, [to_email])
-        if html_email_template_name is not None:
-            html_email = loader.render_to_string(html_email_template_name,
-                                                 context)
-            email_message.attach_alternative(html_email, 'text/html')
-
-        email_message.send()
+        rendering.MailTemplate(
+            subject_template_name, email_template_name,
+            html_email_template_name, from_email
+        ).render(context, to_email).send()
 
     def save(self, use_https, request, token_generator=default_token_generator,
              commit=True, domain_override=None, extra_email_context=None):
@@ -44,9 +35,7 @@ class SignupForm(forms.UserCreationForm):
             user.save()
 
             if not domain_override:
-                current_site = get_current_site(request)
-                site_name = current_site.name
-                domain = current_site.domain
+                site_name, domain = rendering.get_site(request)
             else:
                 site_name = domain = domain_override
             email = user.email
@@ -75,7 +64,14 @@ class ChangePasswordForm(forms.PasswordChangeForm):
 
 
 class ResetPasswordForm(forms.PasswordResetForm):
-    pass
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        rendering.MailTemplate(
+            subject_template_name, email_template_name,
+            html_email_template_name, from_email
+        ).render(context, to_email).send()
 
 
 class ResetPasswordVerifyForm(forms.SetPasswordForm):
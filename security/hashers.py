@@ -0,0 +1,108 @@
+"""
+Password hashers whose cost is set per deployment.
+
+The cost of PBKDF2PasswordHasher is SECURITY_PBKDF2_ITERATIONS and the
+cost of ScryptPasswordHasher is SECURITY_SCRYPT_WORK_FACTOR, instead of a
+constant of the class, so that `manage.py tune_hashers` can pick them for
+the hardware. A hash made with another cost is upgraded on the next login
+(see security.hashing).
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    cost = None
+    cost_setting = 'SECURITY_PBKDF2_ITERATIONS'
+    linear_cost = True
+
+    @property
+    def iterations(self):
+        return self.cost or getattr(settings, self.cost_setting,
+                                    hashers.PBKDF2PasswordHasher.iterations)
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+
+class ScryptPasswordHasher(hashers.BasePasswordHasher):
+    """
+    Scrypt from hashlib, which needs Python built with OpenSSL 1.1 or later.
+    """
+    algorithm = 'scrypt'
+    block_size = 8
+    parallelism = 1
+    cost = None
+    cost_setting = 'SECURITY_SCRYPT_WORK_FACTOR'
+    linear_cost = False
+
+    @property
+    def work_factor(self):
+        return self.cost or getattr(settings, self.cost_setting, 2 ** 14)
+
+    @classmethod
+    def is_available(cls):
+        return hasattr(hashlib, 'scrypt')
+
+    def derive(self, password, salt, work_factor, block_size, parallelism):
+        # hashlib refuses to use more than 32 MiB by default, and scrypt
+        # needs 128 * work_factor * block_size bytes.
+        return hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=work_factor,
+            r=block_size, p=parallelism,
+            maxmem=256 * work_factor * block_size + 2 ** 20, dklen=64
+        )
+
+    def encode(self, password, salt, work_factor=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        work_factor = work_factor or self.work_factor
+        hash = base64.b64encode(self.derive(
+            password, salt, work_factor, self.block_size, self.parallelism
+        )).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, work_factor, salt,
+                                      self.block_size, self.parallelism, hash)
+
+    def decode(self, encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash = \
+            encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return int(work_factor), salt, int(block_size), int(parallelism), \
+            hash
+
+    def verify(self, password, encoded):
+        work_factor, salt, block_size, parallelism, hash = \
+            self.decode(encoded)
+        return constant_time_compare(hash, base64.b64encode(self.derive(
+            password, salt, work_factor, block_size, parallelism
+        )).decode('ascii').strip())
+
+    def safe_summary(self, encoded):
+        work_factor, salt, block_size, parallelism, hash = \
+            self.decode(encoded)
+        return {
+            _('algorithm'): self.algorithm,
+            _('work factor'): work_factor,
+            _('block size'): block_size,
+            _('parallelism'): parallelism,
+            _('salt'): hashers.mask_hash(salt),
+            _('hash'): hashers.mask_hash(hash),
+        }
+
+    def must_update(self, encoded):
+        work_factor, salt, block_size, parallelism, hash = \
+            self.decode(encoded)
+        return (work_factor, block_size, parallelism) != \
+            (self.work_factor, self.block_size, self.parallelism)
+
+    def harden_runtime(self, password, encoded):
+        # The runtime of scrypt grows with the work factor, which is a
+        # power of two, so hashing once more with the difference is not
+        # possible; nothing is done, like Django's Argon2 hasher.
+        pass
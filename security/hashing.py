@@ -0,0 +1,161 @@
+"""
+Password hashing policy.
+
+The policy is the first hasher of PASSWORD_HASHERS with its cost, from
+the settings of security.hashers. tune finds the cost at which a hasher
+takes a target time on this machine.
+
+When a user logs in with a password hashed under another policy, Django
+rehashes it before answering, which puts the full cost of the new hash on
+the login. Here User.check_password only asks for a rehash (see
+schedule); PasswordRehashMiddleware starts it on the executor once the
+response, and the session with it, is saved. The rehash then replaces the
+hash only if the user has not changed it since, and updates the session
+auth hash of the login so that the user stays logged in. A request of the
+same session served between the two writes would fail the session check,
+so the rehash first stores the new session auth hash in the shared cache,
+where security.middleware.AuthenticationMiddleware accepts it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import caches
+from django.db import connection
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ATTRIBUTE = '_password_rehash'
+SESSION_HASH_TIMEOUT = 600
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                getattr(settings, 'SECURITY_REHASH_THREADS', 1),
+                thread_name_prefix='rehash'
+            )
+        return _executor
+
+
+def measure(hasher, samples=3):
+    """
+    Return the shortest time in seconds `hasher` takes to hash a password.
+    """
+    password = get_random_string(16)
+    times = []
+
+    for _ in range(samples):
+        salt = hasher.salt()
+        started = time.perf_counter()
+        hasher.encode(password, salt)
+        times.append(time.perf_counter() - started)
+
+    return min(times)
+
+
+def tune(hasher_class, target, samples=3):
+    """
+    Return the cost at which `hasher_class` hashes a password in about
+    `target` seconds, and the time it takes.
+
+    A linear cost, like iterations, is measured once and scaled. Any
+    other cost is doubled until the next one would take longer than
+    `target`.
+    """
+    hasher = hasher_class()
+
+    if hasher.linear_cost:
+        hasher.cost = 10000
+        elapsed = measure(hasher, samples)
+        hasher.cost = max(1000, int(round(10000 * target / elapsed, -3)))
+        return hasher.cost, measure(hasher, samples)
+
+    hasher.cost = 2 ** 10
+    elapsed = measure(hasher, samples)
+    while elapsed * 2 <= target:
+        hasher.cost *= 2
+        elapsed = measure(hasher, samples)
+    return hasher.cost, elapsed
+
+
+def get_tunable_hashers():
+    return [
+        hasher_class
+        for hasher_class in map(import_string, settings.PASSWORD_HASHERS)
+        if hasattr(hasher_class, 'cost_setting')
+    ]
+
+
+def schedule(user, raw_password):
+    """
+    Ask for the password of `user` to be hashed again under the policy
+    if the user logs in.
+    """
+    user._password_rehash = (user.password, raw_password)
+
+
+@receiver(user_logged_in)
+def logged_in_rehash(sender, request, user, **kwargs):
+    pending = getattr(user, '_password_rehash', None)
+    if pending is not None and request is not None:
+        del user._password_rehash
+        setattr(request, REQUEST_ATTRIBUTE,
+                (user.pk,) + pending + (request.session.session_key,))
+
+
+def get_session_hash_key(session_key):
+    return 'security:rehash:%s' % session_key
+
+
+def rehash(user_id, old_password, raw_password, session_key=None):
+    """
+    Hash `raw_password` under the policy and store it if the user still
+    has `old_password`. Return whether it was stored. The comparison and
+    the write are one UPDATE, so a password changed meanwhile is kept.
+    """
+    UserModel = get_user_model()
+
+    try:
+        password = make_password(raw_password)
+        session_hash = UserModel(
+            pk=user_id, password=password
+        ).get_session_auth_hash()
+        if session_key is not None:
+            caches['shared'].set(get_session_hash_key(session_key),
+                                 session_hash, SESSION_HASH_TIMEOUT)
+
+        updated = UserModel._default_manager.filter(
+            pk=user_id, password=old_password
+        ).update(password=password)
+
+        if updated and session_key is not None:
+            session = import_string(
+                settings.SESSION_ENGINE + '.SessionStore'
+            )(session_key)
+            if HASH_SESSION_KEY in session:
+                session[HASH_SESSION_KEY] = session_hash
+                session.save()
+
+        return bool(updated)
+    except Exception:
+        logger.exception('Rehashing the password of user %s failed',
+                         user_id)
+        return False
+    finally:
+        connection.close()
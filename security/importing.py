@@ -0,0 +1,220 @@
+"""
+Bulk import of users.
+
+Rows are read from a CSV file with a header, or from a JSON Lines file,
+with the fields username, email and an optional password. They are
+processed in chunks so that memory stays bounded whatever the size of the
+file: passwords of a chunk are hashed in a process pool, users who do not
+exist yet are inserted with bulk_create, the users_imported signal is sent
+for them and, when asked, invitation emails are queued in one batch.
+Users without a password get an unusable one and are invited to set it.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from mailer import rendering
+
+from . import signals
+from .models import User
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ImportResult(namedtuple('ImportResult',
+                              ['rows', 'created', 'skipped', 'invalid',
+                               'invited', 'seconds'])):
+
+    @property
+    def rate(self):
+        if self.seconds == 0:
+            return 0
+        return self.rows / self.seconds
+
+
+def read_rows(f, format='csv'):
+    """
+    Yield the rows of an open file as dicts, or None for JSON lines that
+    do not parse.
+    """
+    if format == 'csv':
+        yield from csv.DictReader(f)
+    elif format == 'jsonl':
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+    else:
+        raise ValueError('Unknown format %r' % format)
+
+
+def clean_row(row):
+    """
+    Return the normalized username, email and password of a row, or None
+    when the row is invalid.
+    """
+    if not isinstance(row, dict):
+        return None
+
+    username = User.normalize_username((row.get('username') or '').strip())
+    email = User.objects.normalize_email((row.get('email') or '').strip())
+    password = row.get('password') or None
+
+    try:
+        User.username_validator(username)
+        validate_email(email)
+    except ValidationError:
+        return None
+    if not username:
+        return None
+
+    return username, email, password
+
+
+def hash_passwords(passwords, executor=None):
+    """
+    Return the hashes of `passwords`, an unusable one for None. Hashing is
+    done in `executor` when given.
+    """
+    usable = [password for password in passwords if password is not None]
+    if executor is not None and usable:
+        hashes = iter(executor.map(
+            make_password, usable,
+            chunksize=max(1, len(usable) // ((os.cpu_count() or 1) * 4))
+        ))
+    else:
+        hashes = map(make_password, usable)
+
+    return [next(hashes) if password is not None else make_password(None)
+            for password in passwords]
+
+
+def invite(users, domain, use_https=True,
+           token_generator=default_token_generator):
+    """
+    Queue an invitation email to set a password for each user.
+    """
+    template = rendering.MailTemplate(
+        'security/invitation_subject.txt',
+        'security/invitation_email.html'
+    )
+    return template.send_many(
+        ({'domain': domain,
+          'site_name': domain,
+          'uid': urlsafe_base64_encode(force_bytes(user.pk)).decode(),
+          'token': token_generator.make_token(user),
+          'protocol': 'https' if use_https else 'http'},
+         user.email)
+        for user in users
+    )
+
+
+def import_chunk(rows, executor=None, domain=None, use_https=True):
+    """
+    Import a list of rows. Return the number of users created, rows
+    skipped because the user exists, invalid rows and invitations sent.
+    """
+    cleaned = []
+    usernames = set()
+    emails = set()
+    invalid = 0
+
+    for row in rows:
+        values = clean_row(row)
+        if values is None:
+            invalid += 1
+        elif values[0] not in usernames and values[1] not in emails:
+            usernames.add(values[0])
+            emails.add(values[1])
+            cleaned.append(values)
+
+    existing_usernames = set(User.objects.filter(
+        username__in=usernames
+    ).values_list('username', flat=True))
+    existing_emails = set(User.objects.filter(
+        email__in=emails
+    ).values_list('email', flat=True))
+    cleaned = [
+        values for values in cleaned
+        if values[0] not in existing_usernames and
+        values[1] not in existing_emails
+    ]
+
+    hashes = hash_passwords([password for _, _, password in cleaned],
+                            executor)
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            User(username=username, email=email, password=password_hash)
+            for (username, email, _), password_hash in zip(cleaned, hashes)
+        )
+        users = list(User.objects.filter(
+            email__in=[email for _, email, _ in cleaned]
+        ))
+
+    if users:
+        signals.users_imported.send(sender=User,
+                                    user_ids=[user.id for user in users])
+
+    invited = 0
+    if domain is not None:
+        invited = invite(
+            [user for user in users if not user.has_usable_password()],
+            domain, use_https
+        )
+
+    return len(users), len(rows) - invalid - len(users), invalid, invited
+
+
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                 domain=None, use_https=True):
+    """
+    Import users from an iterable of rows. Passwords are hashed in a pool
+    of `workers` processes, or in this process when `workers` is 0.
+    Invitations are sent when a `domain` for their links is given.
+    """
+    started = time.perf_counter()
+    rows = iter(rows)
+    total = created = skipped = invalid = invited = 0
+    executor = (ProcessPoolExecutor(max_workers=workers)
+                if workers != 0 else None)
+
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            counts = import_chunk(chunk, executor, domain, use_https)
+            total += len(chunk)
+            created += counts[0]
+            skipped += counts[1]
+            invalid += counts[2]
+            invited += counts[3]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return ImportResult(
+        rows=total,
+        created=created,
+        skipped=skipped,
+        invalid=invalid,
+        invited=invited,
+        seconds=time.perf_counter() - started
+    )
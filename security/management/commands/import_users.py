@@ -0,0 +1,61 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import importing
+
+
+class Command(BaseCommand):
+    help = "Import users from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File with the fields username, email and password."
+        )
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help="Format of the file, by default from its extension."
+        )
+        parser.add_argument('--chunk-size', type=int,
+                            default=importing.DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--workers', type=int,
+            help="Processes hashing passwords, 0 to hash in this one."
+        )
+        parser.add_argument(
+            '--invite', metavar='DOMAIN',
+            help="Email users without a password a link on DOMAIN to set it."
+        )
+        parser.add_argument('--no-https', action='store_false',
+                            dest='use_https')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            file_format = 'jsonl' if os.path.splitext(path)[1] in (
+                '.jsonl', '.ndjson'
+            ) else 'csv'
+
+        try:
+            f = open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(e)
+
+        with f:
+            result = importing.import_users(
+                importing.read_rows(f, file_format),
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                domain=options['invite'],
+                use_https=options['use_https']
+            )
+
+        self.stdout.write(
+            "Imported %d rows: %d users created, %d existing, %d invalid, "
+            "%d invited in %.2fs (%.0f rows/s)" % (
+                result.rows, result.created, result.skipped, result.invalid,
+                result.invited, result.seconds, result.rate
+            )
+        )
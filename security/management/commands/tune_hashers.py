@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import hashing
+
+
+class Command(BaseCommand):
+    help = "Print the hasher costs that take a target time on this machine."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms', type=float, default=250,
+            help="Time a password should take to hash."
+        )
+        parser.add_argument('--samples', type=int, default=3)
+
+    def handle(self, *args, **options):
+        hasher_classes = hashing.get_tunable_hashers()
+        if not hasher_classes:
+            raise CommandError("No tunable hasher in PASSWORD_HASHERS.")
+
+        for hasher_class in hasher_classes:
+            if not hasher_class.is_available():
+                self.stderr.write(
+                    "Skipping %s: not supported by this Python." %
+                    hasher_class.__name__
+                )
+                continue
+
+            cost, elapsed = hashing.tune(
+                hasher_class, options['target_ms'] / 1000,
+                samples=options['samples']
+            )
+            self.stdout.write('%s = %d  # %.1f ms' % (
+                hasher_class.cost_setting, cost, elapsed * 1000
+            ))
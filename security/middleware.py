@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
+from django.contrib.auth.middleware import \
+    AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from . import hashing
+
+
+def get_user(request):
+    """
+    Return the user of the session like django.contrib.auth.get_user, also
+    accepting the session auth hash a rehash of the session's password
+    stored before replacing it (see security.hashing).
+    """
+    session = request.session
+    try:
+        user_id = get_user_model()._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    user = auth.load_backend(backend_path).get_user(user_id)
+    if user is None:
+        return AnonymousUser()
+
+    session_hash = session.get(HASH_SESSION_KEY)
+    user_hash = user.get_session_auth_hash()
+    if session_hash and constant_time_compare(session_hash, user_hash):
+        return user
+
+    rehashed = session.session_key and caches['shared'].get(
+        hashing.get_session_hash_key(session.session_key)
+    )
+    if rehashed and constant_time_compare(rehashed, user_hash):
+        session[HASH_SESSION_KEY] = user_hash
+        return user
+
+    session.flush()
+    return AnonymousUser()
+
+
+class AuthenticationMiddleware(BaseAuthenticationMiddleware):
+    """
+    Django's AuthenticationMiddleware with the session check of get_user.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(
+            lambda: self.get_cached_user(request)
+        )
+
+    def get_cached_user(self, request):
+        if not hasattr(request, '_cached_user'):
+            request._cached_user = get_user(request)
+        return request._cached_user
+
+
+class PasswordRehashMiddleware:
+    """
+    Start the rehash a login asked for once the response is ready. It
+    must come before SessionMiddleware, which saves the session the
+    rehash updates.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        pending = getattr(request, hashing.REQUEST_ATTRIBUTE, None)
+        if pending is not None:
+            hashing.get_executor().submit(hashing.rehash, *pending)
+
+        return response
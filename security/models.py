@@ -1,4 +1,5 @@
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import PermissionsMixin
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.mail import send_mail
@@ -6,6 +7,8 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from . import hashing
+
 
 class UserManager(BaseUserManager):
     use_in_migrations = True
@@ -91,6 +94,16 @@ class User(AbstractBaseUser, PermissionsMixin):
         super().clean()
         self.email = self.__class__.objects.normalize_email(self.email)
 
+    def check_password(self, raw_password):
+        """
+        Check the password, leaving an outdated hash to be upgraded after
+        the login instead of now (see security.hashing).
+        """
+        def setter(raw_password):
+            hashing.schedule(self, raw_password)
+
+        return check_password(raw_password, self.password, setter)
+
     def email_user(self, subject, message, from_email=None, **kwargs):
         """Send an email to this user."""
         send_mail(subject, message, from_email, [self.email], **kwargs)
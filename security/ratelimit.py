@@ -0,0 +1,171 @@
+"""
+Rate limiting of the views that hash passwords or send emails.
+
+Each scope of SECURITY_RATE_LIMITS lists limits as (identifier, capacity,
+period): a token bucket per value of the identifier that holds up to
+`capacity` requests and refills at `capacity` per `period` seconds. The
+identifiers are the client address ('ip') and the 'username' or 'email'
+field of the form. Buckets live in the shared cache so that all
+processes count together; reads and writes are not atomic, so concurrent
+requests may get a few more than their share.
+
+The client address is REMOTE_ADDR, which assumes that clients connect
+directly. Behind SECURITY_TRUSTED_PROXIES reverse proxies it is the
+address the outermost of them added to X-Forwarded-For.
+
+A bucket found empty is also remembered in the process until it refills,
+so a flood from one client is turned away without a cache round trip.
+Rejected requests get a 429 before the view runs, and are counted in the
+kenkyou_rate_limited_total metric.
+"""
+from functools import wraps
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.translation import gettext as _
+
+from kenkyou import metrics
+
+
+MAX_BLOCKED = 10000
+
+rate_limited = metrics.register(metrics.Counter(
+    'kenkyou_rate_limited_total',
+    "Requests rejected by a rate limit.",
+    label='limit'
+))
+
+
+class RateLimiter:
+
+    def __init__(self, cache_alias='shared'):
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._blocked = {}
+
+    def get_cache_key(self, key):
+        return 'security:rate:%s' % key
+
+    def blocked_for(self, key, now):
+        until = self._blocked.get(key)
+        if until is None:
+            return 0
+        if until <= now:
+            self._blocked.pop(key, None)
+            return 0
+        return until - now
+
+    def block(self, key, until):
+        with self._lock:
+            if len(self._blocked) >= MAX_BLOCKED:
+                now = time.time()
+                self._blocked = {key: blocked_until
+                                 for key, blocked_until
+                                 in self._blocked.items()
+                                 if blocked_until > now}
+            self._blocked[key] = until
+
+    def take(self, key, capacity, period):
+        """
+        Take a token from the bucket `key`. Return 0 if there was one, or
+        the seconds until there is.
+        """
+        now = time.time()
+        wait = self.blocked_for(key, now)
+        if wait:
+            return wait
+
+        cache = caches[self.cache_alias]
+        cache_key = self.get_cache_key(key)
+        rate = capacity / period
+
+        state = cache.get(cache_key)
+        if state is None:
+            tokens = capacity
+        else:
+            tokens, updated = state
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            wait = (1 - tokens) / rate
+            self.block(key, now + wait)
+            return wait
+
+        cache.set(cache_key, (tokens - 1, now), period)
+        return 0
+
+    def clear(self):
+        with self._lock:
+            self._blocked.clear()
+
+
+limiter = RateLimiter()
+
+
+def get_client_address(request):
+    """
+    Return the address of the client, skipping the trusted proxies in
+    front of the server. Addresses a client puts in X-Forwarded-For come
+    before those of the proxies and are ignored.
+    """
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    addresses = [address.strip() for address in forwarded_for.split(',')
+                 if address.strip()]
+    addresses.append(request.META.get('REMOTE_ADDR'))
+    proxies = getattr(settings, 'SECURITY_TRUSTED_PROXIES', 0)
+
+    return addresses[max(len(addresses) - 1 - proxies, 0)]
+
+
+def get_identifier(request, name):
+    if name == 'ip':
+        return get_client_address(request)
+    return request.POST.get(name, '').strip().lower() or None
+
+
+def check(request, scope):
+    """
+    Take a token for `request` from each bucket of `scope`. Return 0 if
+    the request may go on, or the seconds until it may.
+    """
+    limits = getattr(settings, 'SECURITY_RATE_LIMITS', {}).get(scope, ())
+
+    for name, capacity, period in limits:
+        identifier = get_identifier(request, name)
+        if identifier is None:
+            continue
+
+        digest = hashlib.sha1(identifier.encode()).hexdigest()
+        wait = limiter.take('%s:%s:%s' % (scope, name, digest),
+                            capacity, period)
+        if wait:
+            rate_limited.inc('%s:%s' % (scope, name))
+            return wait
+
+    return 0
+
+
+def rate_limit(scope, methods=('POST',)):
+    """
+    Reject the requests to the view beyond the limits of `scope`.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if request.method in methods:
+                wait = check(request, scope)
+                if wait:
+                    response = HttpResponse(
+                        _('Too many requests, try again later.'),
+                        content_type='text/plain', status=429
+                    )
+                    response['Retry-After'] = '%d' % (int(wait) + 1)
+                    return response
+
+            return view_func(request, *args, **kwargs)
+        return wrapped_view
+    return decorator
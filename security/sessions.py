@@ -0,0 +1,44 @@
+"""
+Session engine: the cached database engine with batched expiry.
+
+Django's clearsessions deletes every expired row in one statement, which
+locks the session table for as long as it takes. Here clear_expired
+deletes them SESSION_CLEAR_BATCH_SIZE rows at a time, each batch in a
+transaction of its own.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.utils import timezone
+
+
+class SessionStore(cached_db.SessionStore):
+
+    @classmethod
+    def clear_expired(cls, batch_size=None):
+        """
+        Delete expired sessions in batches and return how many were
+        deleted.
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, 'SESSION_CLEAR_BATCH_SIZE', 1000)
+
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list(
+                    'session_key', flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                break
+
+            model.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+
+            if len(keys) < batch_size:
+                break
+
+        return deleted
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+
+user_verified = Signal(providing_args=['user', 'request'])
+users_imported = Signal(providing_args=['user_ids'])
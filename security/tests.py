@@ -1,3 +1,579 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+import os
+import tempfile
+from types import SimpleNamespace
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from tutor.models import KanjiEntry, KanjiLearningRecord
+
+from . import hashers, hashing, importing, ratelimit, signals
+from .models import User
+from .sessions import SessionStore
+
+
+class ImportUsersTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def write(self, content, suffix):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_csv(self):
+        path = self.write(
+            'username,email,password\n'
+            'tester1,tester1@kenkyou.com,\n'
+            'student1,student1@kenkyou.com,Student-Password\n'
+            'student2,student2@kenkyou.com,\n'
+            'student2,student2@kenkyou.com,\n'
+            'student3,not-an-email,\n',
+            '.csv'
+        )
+
+        call_command('import_users', path, workers=0, chunk_size=2,
+                     invite='testserver', stdout=StringIO())
+
+        self.assertTrue(
+            User.objects.get(email='student1@kenkyou.com').check_password(
+                'Student-Password'
+            ),
+            msg="Password not set"
+        )
+        self.assertFalse(
+            User.objects.get(
+                email='student2@kenkyou.com'
+            ).has_usable_password(),
+            msg="Password set for user without one"
+        )
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [['student2@kenkyou.com']],
+            msg="Not only user without password invited"
+        )
+        self.assertEqual(
+            KanjiLearningRecord.objects.filter(
+                user__email='student1@kenkyou.com'
+            ).count(),
+            KanjiEntry.objects.count(),
+            msg="Imported user not enrolled"
+        )
+
+    def test_import_users(self):
+        path = self.write(
+            '{"username": "tester1", "email": "tester1@kenkyou.com"}\n'
+            '{"username": "student1", "email": "student1@kenkyou.com", '
+            '"password": "Student-Password"}\n'
+            '{"username": "student2", "email": "student2@kenkyou.com", '
+            '"password": "Student-Password"}\n'
+            '{"username": "student3"}\n',
+            '.jsonl'
+        )
+
+        with open(path) as f:
+            result = importing.import_users(
+                importing.read_rows(f, 'jsonl'), workers=2
+            )
+
+        self.assertEqual(
+            (result.rows, result.created, result.skipped, result.invalid,
+             result.invited),
+            (4, 2, 1, 1, 0),
+            msg="Import result not correct"
+        )
+        self.assertTrue(
+            User.objects.get(email='student2@kenkyou.com').check_password(
+                'Student-Password'
+            ),
+            msg="Password not hashed in the pool"
+        )
+
+    def test_import_invalid_json_lines(self):
+        path = self.write(
+            '{"username": "student1", "email": "student1@kenkyou.com"\n'
+            '["student2", "student2@kenkyou.com"]\n'
+            '{"username": "student3", "email": "student3@kenkyou.com"}\n',
+            '.jsonl'
+        )
+
+        with open(path) as f:
+            result = importing.import_users(
+                importing.read_rows(f, 'jsonl'), workers=0
+            )
+
+        self.assertEqual(
+            (result.rows, result.created, result.invalid), (3, 1, 2),
+            msg="Invalid lines not counted as invalid rows"
+        )
+
+
+class VerifyTokenTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'tester3', 'tester3@kenkyou.com', 'Tester-Password',
+            is_active=False
+        )
+        self.uid = urlsafe_base64_encode(force_bytes(self.user.pk)).decode()
+        self.token = default_token_generator.make_token(self.user)
+
+    def verify(self, name):
+        response = self.client.get(
+            reverse(name, args=[self.uid, self.token])
+        )
+        self.assertEqual(
+            Session.objects.count(), 0,
+            msg="Session written for the token"
+        )
+        return self.client.get(response.url)
+
+    def test_signup_verify(self):
+        for storage in ['security.tokens.CookieTokenStorage',
+                        'security.tokens.CacheTokenStorage']:
+            with self.subTest(storage=storage), \
+                    self.settings(SECURITY_TOKEN_STORAGE=storage):
+                User.objects.filter(pk=self.user.pk).update(is_active=False)
+                self.token = default_token_generator.make_token(self.user)
+
+                response = self.verify('signup_verify')
+
+                self.assertTrue(
+                    response.context['validlink'],
+                    msg="Stored token not accepted"
+                )
+                self.assertTrue(
+                    User.objects.get(pk=self.user.pk).is_active,
+                    msg="User not activated"
+                )
+                self.assertEqual(
+                    response.cookies['_signup_verify_token'].value, '',
+                    msg="Token not deleted"
+                )
+
+    def test_reset_password_verify(self):
+        self.user.is_active = True
+        self.user.save()
+        self.token = default_token_generator.make_token(self.user)
+
+        response = self.verify('reset_password_verify')
+        self.assertTrue(
+            response.context['validlink'],
+            msg="Stored token not accepted"
+        )
+
+        response = self.client.post(response.wsgi_request.path, {
+            'new_password1': 'New-Tester-Password',
+            'new_password2': 'New-Tester-Password',
+        })
+
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).check_password(
+                'New-Tester-Password'
+            ),
+            msg="Password not set"
+        )
+        self.assertEqual(
+            response.cookies['_reset_password_token'].value, '',
+            msg="Token not deleted"
+        )
+
+    def test_token_columns_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('reset_password_verify', args=[self.uid, self.token])
+            )
+
+        self.assertEqual(len(queries), 1, msg="User loaded more than once")
+        self.assertNotIn(
+            'email', queries[0]['sql'],
+            msg="Columns not needed by the token loaded"
+        )
+
+    def test_verified_link(self):
+        response = self.client.get(
+            reverse('reset_password_verify', args=[self.uid, self.token])
+        )
+
+        with self.assertNumQueries(0):
+            response = self.client.get(response.url)
+
+        self.assertTrue(
+            response.context['validlink'],
+            msg="Verified link not accepted"
+        )
+
+    def test_verified_for_other_user(self):
+        response = self.client.get(
+            reverse('signup_verify', args=[self.uid, self.token])
+        )
+        other_uid = urlsafe_base64_encode(force_bytes(1)).decode()
+
+        response = self.client.get(
+            response.url.replace(self.uid, other_uid)
+        )
+
+        self.assertFalse(
+            response.context['validlink'],
+            msg="Link verified for another user accepted"
+        )
+
+    def test_activate_once(self):
+        receiver = mock.Mock()
+        signals.user_verified.connect(receiver)
+        self.addCleanup(signals.user_verified.disconnect, receiver)
+
+        url = reverse('signup_verify', args=[self.uid, self.token])
+        response = self.client.get(url)
+        self.client.get(response.url)
+        response = self.client.get(url)
+        self.client.get(response.url)
+
+        self.assertEqual(
+            receiver.call_count, 1,
+            msg="User verified more than once"
+        )
+        self.assertEqual(
+            receiver.call_args[1]['user'], self.user,
+            msg="Other user verified"
+        )
+
+    def test_forged_token(self):
+        self.client.cookies['_signup_verify_token'] = self.token
+
+        response = self.client.get(
+            reverse('signup_verify', args=[self.uid, 'done'])
+        )
+
+        self.assertFalse(
+            response.context['validlink'],
+            msg="Unsigned token accepted"
+        )
+
+
+class ClearSessionsTestCase(TestCase):
+
+    def test_clear_expired(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key='expired%d' % i,
+                                   session_data='',
+                                   expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='current', session_data='',
+                               expire_date=now + timedelta(days=1))
+
+        with self.assertNumQueries(6):
+            deleted = SessionStore.clear_expired(batch_size=2)
+
+        self.assertEqual(deleted, 5, msg="Not all expired sessions deleted")
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['current'],
+            msg="Current session deleted"
+        )
+
+
+class HashersTestCase(SimpleTestCase):
+
+    @override_settings(SECURITY_SCRYPT_WORK_FACTOR=2 ** 10)
+    def test_scrypt(self):
+        hasher = hashers.ScryptPasswordHasher()
+        encoded = hasher.encode('Tester-Password', hasher.salt())
+
+        self.assertTrue(
+            hasher.verify('Tester-Password', encoded),
+            msg="Password not verified"
+        )
+        self.assertFalse(
+            hasher.verify('Other-Password', encoded),
+            msg="Wrong password verified"
+        )
+        self.assertFalse(hasher.must_update(encoded),
+                         msg="Hash with the policy cost updated")
+
+        with self.settings(SECURITY_SCRYPT_WORK_FACTOR=2 ** 11):
+            self.assertTrue(hasher.must_update(encoded),
+                            msg="Hash with another cost not updated")
+
+    def test_pbkdf2_cost(self):
+        hasher = hashers.PBKDF2PasswordHasher()
+
+        with self.settings(SECURITY_PBKDF2_ITERATIONS=1000):
+            encoded = hasher.encode('Tester-Password', hasher.salt())
+
+        with self.settings(SECURITY_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(hasher.must_update(encoded),
+                            msg="Hash with another cost not updated")
+            self.assertTrue(hasher.verify('Tester-Password', encoded),
+                            msg="Hash with another cost not verified")
+
+    def test_tune_without_scrypt(self):
+        stdout = StringIO()
+        stderr = StringIO()
+
+        with mock.patch.object(hashers, 'hashlib', SimpleNamespace()), \
+                mock.patch.object(hashing, 'tune', return_value=(1000, 0.1)):
+            call_command('tune_hashers', stdout=stdout, stderr=stderr)
+
+        self.assertIn('ScryptPasswordHasher', stderr.getvalue(),
+                      msg="Missing scrypt not reported")
+        self.assertEqual(
+            stdout.getvalue(),
+            'SECURITY_PBKDF2_ITERATIONS = 1000  # 100.0 ms\n',
+            msg="Other hashers not tuned"
+        )
+
+    def test_tune(self):
+        for hasher_class in [hashers.PBKDF2PasswordHasher,
+                             hashers.ScryptPasswordHasher]:
+            with self.subTest(hasher=hasher_class.__name__):
+                cost, elapsed = hashing.tune(hasher_class, 0.005, samples=1)
+
+                self.assertGreaterEqual(cost, 1000, msg="Cost too low")
+                self.assertLess(elapsed, 0.05,
+                                msg="Cost far above the target")
+
+
+@override_settings(SECURITY_PBKDF2_ITERATIONS=1000, SECURITY_RATE_LIMITS={})
+class PasswordRehashTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'tester3', 'tester3@kenkyou.com', 'Tester-Password'
+        )
+
+    def wait(self):
+        hashing.get_executor().submit(lambda: None).result()
+
+    def login(self):
+        return self.client.post(reverse('login'), {
+            'username': 'tester3@kenkyou.com',
+            'password': 'Tester-Password',
+        })
+
+    def test_rehash_after_login(self):
+        with self.settings(SECURITY_PBKDF2_ITERATIONS=2000):
+            with mock.patch.object(hashing, 'rehash') as rehash:
+                self.login()
+                self.wait()
+
+            self.assertEqual(
+                rehash.call_args[0][:3],
+                (self.user.pk, self.user.password, 'Tester-Password'),
+                msg="Rehash not started after the login"
+            )
+            self.assertEqual(
+                User.objects.get(pk=self.user.pk).password,
+                self.user.password,
+                msg="Password rehashed in the request"
+            )
+
+            hashing.rehash(*rehash.call_args[0])
+            password = User.objects.get(pk=self.user.pk).password
+
+            self.assertTrue(
+                password.startswith('pbkdf2_sha256$2000$'),
+                msg="Password not hashed with the new cost"
+            )
+            self.assertEqual(
+                self.client.get(reverse('change_password')).status_code, 200,
+                msg="User logged out by the rehash"
+            )
+
+    def test_request_during_rehash(self):
+        with self.settings(SECURITY_PBKDF2_ITERATIONS=2000):
+            with mock.patch.object(hashing, 'rehash') as rehash:
+                self.login()
+                self.wait()
+
+            # The session is not updated yet when the next request comes.
+            with mock.patch.object(hashing, 'HASH_SESSION_KEY', 'unused'):
+                hashing.rehash(*rehash.call_args[0])
+
+            self.assertEqual(
+                self.client.get(reverse('change_password')).status_code, 200,
+                msg="Request between the rehash writes logged out"
+            )
+
+            caches['shared'].clear()
+            self.assertEqual(
+                self.client.get(reverse('change_password')).status_code, 200,
+                msg="Session auth hash not updated by the request"
+            )
+
+    def test_rehash_in_background(self):
+        with self.settings(SECURITY_PBKDF2_ITERATIONS=2000):
+            self.login()
+            self.wait()
+
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).password.startswith(
+                'pbkdf2_sha256$2000$'
+            ),
+            msg="Password not rehashed"
+        )
+
+    def test_no_rehash(self):
+        with mock.patch.object(hashing, 'rehash') as rehash:
+            self.login()
+
+        self.assertFalse(rehash.called,
+                         msg="Password with the policy cost rehashed")
+
+    def test_rehash_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            hashing.rehash(self.user.pk, self.user.password,
+                           'Tester-Password')
+
+        statements = [query['sql'] for query in queries
+                      if query['sql'] != 'BEGIN']
+
+        self.assertEqual(len(statements), 1,
+                         msg="User read before the password is replaced")
+        self.assertTrue(
+            statements[0].startswith('UPDATE') and
+            '"password" =' in statements[0].split('WHERE')[1],
+            msg="Password not compared in the update"
+        )
+
+    def test_password_changed(self):
+        old_password = self.user.password
+        self.user.set_password('New-Tester-Password')
+        self.user.save()
+
+        self.assertFalse(
+            hashing.rehash(self.user.pk, old_password, 'Tester-Password'),
+            msg="Changed password overwritten"
+        )
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).check_password(
+                'New-Tester-Password'
+            ),
+            msg="Changed password lost"
+        )
+
+
+@override_settings(SECURITY_RATE_LIMITS={
+    'login': [('ip', 2, 60), ('username', 3, 60)],
+})
+class RateLimitTestCase(TestCase):
+
+    def setUp(self):
+        caches['shared'].clear()
+        ratelimit.limiter.clear()
+        ratelimit.rate_limited.clear()
+        self.addCleanup(ratelimit.limiter.clear)
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post(reverse('login'), {
+            'username': email,
+            'password': 'Wrong-Password',
+        }, REMOTE_ADDR=ip)
+
+    def test_ip(self):
+        for i in range(2):
+            self.assertEqual(
+                self.login('tester%d@kenkyou.com' % i).status_code, 200,
+                msg="Request under the limit rejected"
+            )
+
+        with mock.patch.object(User, 'check_password') as check_password:
+            response = self.login('tester3@kenkyou.com')
+
+        self.assertEqual(response.status_code, 429,
+                         msg="Request over the limit not rejected")
+        self.assertGreater(int(response['Retry-After']), 0,
+                           msg="Retry-After not set")
+        self.assertFalse(check_password.called,
+                         msg="Password checked when rejected")
+        self.assertEqual(
+            self.login('tester3@kenkyou.com', ip='10.0.0.2').status_code,
+            200,
+            msg="Other address rejected"
+        )
+        self.assertEqual(
+            ratelimit.rate_limited.snapshot(), {'login:ip': 1},
+            msg="Rejection not counted"
+        )
+
+    def test_forwarded_for(self):
+        address = ratelimit.get_client_address
+        factory = RequestFactory()
+        request = factory.get('/', REMOTE_ADDR='127.0.0.1',
+                              HTTP_X_FORWARDED_FOR='10.9.9.9, 10.0.0.1')
+
+        self.assertEqual(address(request), '127.0.0.1',
+                         msg="Forwarded address trusted without proxies")
+
+        with self.settings(SECURITY_TRUSTED_PROXIES=1):
+            self.assertEqual(
+                address(request), '10.0.0.1',
+                msg="Client address not taken from the trusted proxy"
+            )
+            self.assertEqual(
+                address(factory.get('/', REMOTE_ADDR='127.0.0.1')),
+                '127.0.0.1',
+                msg="Address not read without a forwarded header"
+            )
+
+        with self.settings(SECURITY_TRUSTED_PROXIES=2):
+            self.assertEqual(address(request), '10.9.9.9',
+                             msg="Second proxy not skipped")
+
+    def test_username(self):
+        for i in range(3):
+            self.login('Tester1@kenkyou.com', ip='10.0.0.%d' % i)
+
+        self.assertEqual(
+            self.login('tester1@kenkyou.com', ip='10.0.0.9').status_code,
+            429,
+            msg="Username over the limit not rejected"
+        )
+
+    def test_fast_path(self):
+        for i in range(2):
+            self.login('tester1@kenkyou.com')
+        self.login('tester1@kenkyou.com')
+
+        with mock.patch.object(caches['shared'], 'get') as get:
+            response = self.login('tester1@kenkyou.com')
+
+        self.assertEqual(response.status_code, 429,
+                         msg="Blocked client not rejected")
+        self.assertFalse(get.called,
+                         msg="Shared cache read for a blocked client")
+
+    def test_refill(self):
+        for i in range(2):
+            self.login('tester1@kenkyou.com')
+
+        with mock.patch('time.time', return_value=time.time() + 30):
+            self.assertEqual(
+                self.login('tester1@kenkyou.com').status_code, 200,
+                msg="Bucket not refilled"
+            )
+
+    def test_get_not_limited(self):
+        for i in range(3):
+            response = self.client.get(reverse('login'),
+                                       REMOTE_ADDR='10.0.0.1')
+
+        self.assertEqual(response.status_code, 200,
+                         msg="Form page rate limited")
@@ -0,0 +1,99 @@
+"""
+Short-lived storage for verification tokens.
+
+The signup and reset password links carry a token that the views move out
+of the URL: the first request stores it and redirects to a URL without
+it, the second reads it back. Keeping it in the session would write a
+session row for every anonymous visitor who opens a link, so it is kept
+in a cookie scoped to the redirect URL instead.
+
+CookieTokenStorage signs the token into the cookie itself and needs no
+server-side state. CacheTokenStorage only puts a random key in the cookie
+and keeps the token in the shared cache, which can be cleared to revoke
+pending links. SECURITY_TOKEN_STORAGE chooses one; both expire after
+SECURITY_TOKEN_AGE seconds.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import get_random_string
+from django.utils.module_loading import import_string
+
+
+class TokenStorage:
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'SECURITY_TOKEN_AGE', 600)
+
+    def set_cookie(self, request, response, name, value, path):
+        response.set_cookie(
+            name, value,
+            max_age=self.max_age,
+            path=path,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite='Lax'
+        )
+
+    def get(self, request, name):
+        raise NotImplementedError
+
+    def set(self, request, response, name, token, path):
+        """
+        Store `token` for the requests to `path`.
+        """
+        raise NotImplementedError
+
+    def delete(self, request, response, name):
+        response.delete_cookie(name, path=request.path)
+
+
+class CookieTokenStorage(TokenStorage):
+
+    def get(self, request, name):
+        return request.get_signed_cookie(name, None, salt=name,
+                                         max_age=self.max_age)
+
+    def set(self, request, response, name, token, path):
+        response.set_signed_cookie(
+            name, token,
+            salt=name,
+            max_age=self.max_age,
+            path=path,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite='Lax'
+        )
+
+
+class CacheTokenStorage(TokenStorage):
+    cache_alias = 'shared'
+
+    def get_cache_key(self, name, key):
+        return 'security:token:%s:%s' % (name, key)
+
+    def get(self, request, name):
+        key = request.COOKIES.get(name)
+        if not key:
+            return None
+        return caches[self.cache_alias].get(self.get_cache_key(name, key))
+
+    def set(self, request, response, name, token, path):
+        key = get_random_string(32)
+        caches[self.cache_alias].set(
+            self.get_cache_key(name, key), token, self.max_age
+        )
+        self.set_cookie(request, response, name, key, path)
+
+    def delete(self, request, response, name):
+        key = request.COOKIES.get(name)
+        if key:
+            caches[self.cache_alias].delete(self.get_cache_key(name, key))
+        super().delete(request, response, name)
+
+
+def get_storage():
+    return import_string(getattr(
+        settings, 'SECURITY_TOKEN_STORAGE',
+        'security.tokens.CookieTokenStorage'
+    ))()
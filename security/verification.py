@@ -0,0 +1,84 @@
+"""
+Verification of the links sent by email.
+
+A link carries the uid of a user and a token. The first request checks
+the token against the user, loading only the columns the token is made
+from, then stores the validated pair (see security.tokens) and redirects
+to the same URL with `url_flag` in place of the token. The second request
+only compares its uid with the stored one: the storage is signed or kept
+server-side, so the pair does not need to be checked again.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseRedirect
+from django.utils.http import urlsafe_base64_decode
+
+from . import tokens
+
+
+UserModel = get_user_model()
+
+# The columns PasswordResetTokenGenerator hashes, besides the primary key.
+TOKEN_FIELDS = ('password', 'last_login')
+
+
+class VerifyLinkMixin:
+    token_generator = default_token_generator
+    token_key = None
+    url_flag = None
+
+    @property
+    def token_storage(self):
+        return tokens.get_storage()
+
+    def get_uid(self, uidb64):
+        try:
+            return UserModel._meta.pk.to_python(
+                urlsafe_base64_decode(uidb64).decode()
+            )
+        except (TypeError, ValueError, OverflowError, ValidationError):
+            return None
+
+    def get_user(self, uidb64, fields=None):
+        uid = self.get_uid(uidb64)
+        if uid is None:
+            return None
+
+        query_set = UserModel._default_manager.all()
+        if fields is not None:
+            query_set = query_set.only(*fields)
+
+        try:
+            return query_set.get(pk=uid)
+        except UserModel.DoesNotExist:
+            return None
+
+    def check_link(self, uidb64, token):
+        user = self.get_user(uidb64, TOKEN_FIELDS)
+        return user is not None and \
+            self.token_generator.check_token(user, token)
+
+    def get_verified_token(self, uidb64):
+        """
+        Return the token stored for `uidb64` by the first request, or None.
+        """
+        value = self.token_storage.get(self.request, self.token_key)
+        if not value:
+            return None
+
+        stored_uidb64, _, token = value.partition(':')
+        return token if stored_uidb64 == uidb64 else None
+
+    def redirect_verified(self, uidb64, token):
+        redirect_url = self.request.path.replace(token, self.url_flag)
+        response = HttpResponseRedirect(redirect_url)
+        self.token_storage.set(
+            self.request, response, self.token_key,
+            '%s:%s' % (uidb64, token), redirect_url
+        )
+        return response
+
+    def forget_verified(self, response):
+        self.token_storage.delete(self.request, response, self.token_key)
+        return response
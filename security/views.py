@@ -1,23 +1,22 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth import views
-from django.core.exceptions import ValidationError
-from django.http import HttpResponseRedirect
 from django.views.decorators.cache import never_cache
 from django.views.decorators.debug import sensitive_post_parameters
 from django.views.generic import TemplateView
 from django.views.generic.edit import FormView
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
-from django.utils.http import urlsafe_base64_decode
 from django.utils.translation import gettext_lazy as _
 
-from . import forms
+from kenkyou.decorators import cache_per_session
+
+from . import forms, ratelimit, signals, verification
 
 
 UserModel = get_user_model()
 
 
+@method_decorator(ratelimit.rate_limit('signup'), name='dispatch')
 class SignupView(FormView):
     template_name = 'security/signup.html'
     extra_context = {'title': _('Signup')}
@@ -42,55 +41,56 @@ SIGNUP_VERIFY_URL_FLAG = 'done'
 SIGNUP_VERIFY_TOKEN_KEY = '_signup_verify_token'
 
 
-class SignupVerifyView(TemplateView):
+class SignupVerifyView(verification.VerifyLinkMixin, TemplateView):
     template_name = 'security/signup_verify.html'
     extra_context = {'title': _('Signup Verify')}
-    token_generator = default_token_generator
-
-    def get_user(self, uidb64):
-        try:
-            uid = urlsafe_base64_decode(uidb64).decode()
-            user = UserModel._default_manager.get(pk=uid)
-        except (TypeError, ValueError, OverflowError,
-                UserModel.DoesNotExist, ValidationError):
-            user = None
-        return user
+    token_key = SIGNUP_VERIFY_TOKEN_KEY
+    url_flag = SIGNUP_VERIFY_URL_FLAG
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['validlink'] = self.validlink
         return context
 
+    def activate(self, uidb64):
+        """
+        Activate the user, only once if the link is opened again.
+        """
+        uid = self.get_uid(uidb64)
+        activated = UserModel._default_manager.filter(
+            pk=uid, is_active=False
+        ).update(is_active=True)
+
+        if activated:
+            signals.user_verified.send(
+                sender=self.__class__,
+                user=self.get_user(uidb64, verification.TOKEN_FIELDS),
+                request=self.request
+            )
+
     @method_decorator(sensitive_post_parameters())
     @method_decorator(never_cache)
     def dispatch(self, *args, **kwargs):
         assert 'uidb64' in kwargs and 'token' in kwargs
 
         self.validlink = False
-        self.user = self.get_user(kwargs['uidb64'])
-
-        if self.user is not None:
-            token = kwargs['token']
-            if token == SIGNUP_VERIFY_URL_FLAG:
-                session_token = self.request.session.get(
-                    SIGNUP_VERIFY_TOKEN_KEY
+        uidb64 = kwargs['uidb64']
+        token = kwargs['token']
+
+        if token == self.url_flag:
+            if self.get_verified_token(uidb64) is not None:
+                self.validlink = True
+                self.activate(uidb64)
+                return self.forget_verified(
+                    super().dispatch(*args, **kwargs)
                 )
-                if self.token_generator.check_token(self.user, session_token):
-                    self.validlink = True
-                    self.user.is_active = True
-                    self.user.save()
-                    return super().dispatch(*args, **kwargs)
-            else:
-                if self.token_generator.check_token(self.user, token):
-                    self.request.session[SIGNUP_VERIFY_TOKEN_KEY] = token
-                    redirect_url = self.request.path.replace(
-                        token, SIGNUP_VERIFY_URL_FLAG
-                    )
-                    return HttpResponseRedirect(redirect_url)
+        elif self.check_link(uidb64, token):
+            return self.redirect_verified(uidb64, token)
 
         return self.render_to_response(self.get_context_data())
 
 
+@method_decorator(ratelimit.rate_limit('login'), name='dispatch')
 class LoginView(views.LoginView):
     template_name = 'security/login.html'
     extra_context = {'title': _('Login')}
@@ -108,11 +108,13 @@ class ChangePasswordView(views.PasswordChangeView):
     success_url = reverse_lazy('change_password_done')
 
 
+@method_decorator(cache_per_session, name='dispatch')
 class ChangePasswordDoneView(views.PasswordChangeDoneView):
     template_name = 'security/change_password_done.html'
     extra_context = {'title': _('Change Password Done')}
 
 
+@method_decorator(ratelimit.rate_limit('reset_password'), name='dispatch')
 class ResetPasswordView(views.PasswordResetView):
     template_name = 'security/reset_password.html'
     extra_context = {'title': _('Reset Password')}
@@ -131,21 +133,13 @@ RESET_PASSWORD_VERIFY_URL_FLAG = 'set_password'
 RESET_PASSWORD_VERIFY_TOKEN_KEY = '_reset_password_token'
 
 
-class ResetPasswordVerifyView(FormView):
+class ResetPasswordVerifyView(verification.VerifyLinkMixin, FormView):
     template_name = 'security/reset_password_verify.html'
     extra_context = {'title': _('Reset Password Verify')}
     form_class = forms.ResetPasswordVerifyForm
     success_url = reverse_lazy('reset_password_done')
-    token_generator = default_token_generator
-
-    def get_user(self, uidb64):
-        try:
-            uid = urlsafe_base64_decode(uidb64).decode()
-            user = UserModel._default_manager.get(pk=uid)
-        except (TypeError, ValueError, OverflowError, UserModel.DoesNotExist,
-                ValidationError):
-            user = None
-        return user
+    token_key = RESET_PASSWORD_VERIFY_TOKEN_KEY
+    url_flag = RESET_PASSWORD_VERIFY_URL_FLAG
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -159,8 +153,7 @@ class ResetPasswordVerifyView(FormView):
 
     def form_valid(self, form):
         form.save()
-        del self.request.session[RESET_PASSWORD_VERIFY_TOKEN_KEY]
-        return super().form_valid(form)
+        return self.forget_verified(super().form_valid(form))
 
     @method_decorator(sensitive_post_parameters())
     @method_decorator(never_cache)
@@ -168,31 +161,33 @@ class ResetPasswordVerifyView(FormView):
         assert 'uidb64' in kwargs and 'token' in kwargs
 
         self.validlink = False
-        self.user = self.get_user(kwargs['uidb64'])
-
-        if self.user is not None:
-            token = kwargs['token']
-            if token == RESET_PASSWORD_VERIFY_URL_FLAG:
-                session_token = self.request.session.get(
-                    RESET_PASSWORD_VERIFY_TOKEN_KEY
-                )
-                if self.token_generator.check_token(self.user, session_token):
+        self.user = None
+        uidb64 = kwargs['uidb64']
+        token = kwargs['token']
+
+        if token == self.url_flag:
+            stored_token = self.get_verified_token(uidb64)
+            if stored_token is not None:
+                # Showing the form needs no user. Setting the password
+                # loads all of it for the validators and checks the token
+                # again, as it may have been used since it was stored.
+                if self.request.method == 'POST':
+                    self.user = self.get_user(uidb64)
+                    self.validlink = self.user is not None and \
+                        self.token_generator.check_token(self.user,
+                                                         stored_token)
+                else:
                     self.validlink = True
+
+                if self.validlink:
                     return super().dispatch(*args, **kwargs)
-            else:
-                if self.token_generator.check_token(self.user, token):
-                    self.request.session[
-                        RESET_PASSWORD_VERIFY_TOKEN_KEY
-                    ] = token
-                    redirect_url = self.request.path.replace(
-                        token,
-                        RESET_PASSWORD_VERIFY_URL_FLAG
-                    )
-                    return HttpResponseRedirect(redirect_url)
+        elif self.check_link(uidb64, token):
+            return self.redirect_verified(uidb64, token)
 
         return self.render_to_response(self.get_context_data())
 
 
+@method_decorator(cache_per_session, name='dispatch')
 class ResetPasswordDoneView(views.PasswordResetCompleteView):
     template_name = 'security/reset_password_done.html'
     extra_context = {'title': _('Reset Password Done')}
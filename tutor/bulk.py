@@ -0,0 +1,40 @@
+"""
+Bulk update of model instances.
+
+Django 2.1 has no QuerySet.bulk_update, so this does the same thing: one
+UPDATE per batch that sets each field through a CASE on the primary key.
+Like bulk_update, it sends no signals.
+"""
+from django.db.models import Case, Value, When
+
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def bulk_update(objs, fields, batch_size=DEFAULT_BATCH_SIZE):
+    objs = list(objs)
+    if not objs:
+        return 0
+
+    model = type(objs[0])
+    updated = 0
+
+    for i in range(0, len(objs), batch_size):
+        batch = objs[i:i + batch_size]
+        values = {}
+
+        for name in fields:
+            field = model._meta.get_field(name)
+            values[field.attname] = Case(
+                *[When(pk=obj.pk,
+                       then=Value(getattr(obj, field.attname),
+                                  output_field=field))
+                  for obj in batch],
+                output_field=field
+            )
+
+        updated += model._default_manager.filter(
+            pk__in=[obj.pk for obj in batch]
+        ).update(**values)
+
+    return updated
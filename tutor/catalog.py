@@ -0,0 +1,179 @@
+"""
+Process-local cache of the kanji catalog.
+
+KanjiEntry is reference data that only changes through the admin or an
+import, so every process keeps all entries in memory, sorted by order,
+with an index by id and by writing. The tutor views resolve entries from
+here instead of querying them.
+
+Saving or deleting an entry drops the local copy and changes a version
+key in the default cache (see tutor.signals). Other processes compare their
+copy with that version at most every TUTOR_CATALOG_CHECK_INTERVAL seconds,
+so they stay coherent as long as the cache is shared between them.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import KanjiEntry
+
+
+VERSION_KEY = 'tutor:catalog:version'
+
+
+class CatalogEntry:
+    __slots__ = ('id', 'writing', 'on_reading', 'kun_reading', 'meaning',
+                 'order')
+
+    def __init__(self, id, writing, on_reading, kun_reading, meaning,
+                 order):
+        self.id = id
+        self.writing = writing
+        self.on_reading = on_reading
+        self.kun_reading = kun_reading
+        self.meaning = meaning
+        self.order = order
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __eq__(self, other):
+        if isinstance(other, (CatalogEntry, KanjiEntry)):
+            return self.id == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return '<CatalogEntry: %s %s>' % (self.id, self.writing)
+
+
+class Catalog:
+    __slots__ = ('version', 'entries', 'orders', '_index', '_by_writing')
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.entries = entries
+        self.orders = array('l', [entry.order for entry in entries])
+        self._index = {entry.id: i for i, entry in enumerate(entries)}
+        self._by_writing = {entry.writing: i
+                            for i, entry in enumerate(entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, entry_id):
+        i = self._index.get(int(entry_id))
+        return None if i is None else self.entries[i]
+
+    def index_of(self, entry_id):
+        return self._index.get(int(entry_id))
+
+    def index_of_writing(self, writing):
+        return self._by_writing.get(writing)
+
+    def order_range(self, low, high):
+        """
+        Return the index range of entries whose order is in [low, high].
+        """
+        return bisect_left(self.orders, low), bisect_right(self.orders, high)
+
+    def after(self, order):
+        """
+        Return the first entry with an order greater than `order`, or None.
+        """
+        i = bisect_right(self.orders, order)
+        return self.entries[i] if i < len(self.entries) else None
+
+
+class CatalogCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._checked = 0
+        self._loaded = float('-inf')
+
+    def load(self, version):
+        query_set = KanjiEntry.objects.order_by('order', 'id').values_list(
+            'id', 'writing', 'on_reading', 'kun_reading', 'meaning', 'order'
+        )
+        return Catalog(version,
+                       [CatalogEntry(*row) for row in query_set.iterator()])
+
+    def get(self):
+        catalog = self._catalog
+        now = time.monotonic()
+        interval = getattr(settings, 'TUTOR_CATALOG_CHECK_INTERVAL', 1)
+
+        if catalog is not None and now - self._checked < interval:
+            return catalog
+
+        version = cache.get(VERSION_KEY)
+        self._checked = now
+
+        if catalog is not None and catalog.version == version:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None or catalog.version != version:
+                catalog = self._catalog = self.load(version)
+                self._loaded = time.monotonic()
+
+        return catalog
+
+    def refresh(self):
+        """
+        Reload the catalog in this process only, unless it was loaded less
+        than TUTOR_CATALOG_CHECK_INTERVAL seconds ago.
+        """
+        interval = getattr(settings, 'TUTOR_CATALOG_CHECK_INTERVAL', 1)
+
+        with self._lock:
+            now = time.monotonic()
+            if self._catalog is None or now - self._loaded >= interval:
+                self._catalog = self.load(cache.get(VERSION_KEY))
+                self._loaded = self._checked = now
+
+        return self._catalog
+
+    def invalidate(self):
+        """
+        Drop the catalog in this process and in all others.
+        """
+        self._catalog = None
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+catalog_cache = CatalogCache()
+
+
+def get_catalog():
+    return catalog_cache.get()
+
+
+def get_entry(entry_id):
+    """
+    Return the catalog entry with `entry_id`, or None. An unknown id
+    reloads the catalog of this process, at most once per check interval,
+    in case the entry was added since; other processes are left alone so
+    that requests for made-up ids cannot make them all reload.
+    """
+    entry = catalog_cache.get().get(entry_id)
+
+    if entry is None:
+        entry = catalog_cache.refresh().get(entry_id)
+
+    return entry
+
+
+def invalidate():
+    catalog_cache.invalidate()
@@ -0,0 +1,50 @@
+"""
+Per-user learning cursor over KanjiEntry.order.
+
+The cursor holds the order of the last entry a user has learnt. In lazy
+learning mode (the TUTOR_LAZY_LEARNING setting) every entry after the
+cursor is implicitly not learnt yet, so users only have learning records
+for the kanji they have learnt, and the next entry to learn is a lookup
+of the cursor followed by a search of the catalog by order.
+
+Turning lazy mode on can be done at any time. Turning it off is not
+enough on its own: users who signed up in lazy mode have no records for
+the entries they have not learnt, which the default mode reads, so they
+must be enrolled with `manage.py enroll --all` when the mode changes.
+Entries they have learnt keep their records and are skipped.
+"""
+from django.conf import settings
+
+from .catalog import get_catalog
+from .models import KanjiLearningCursor
+
+
+def is_lazy():
+    return getattr(settings, 'TUTOR_LAZY_LEARNING', False)
+
+
+def next_entry(user_id):
+    """
+    Return the first catalog entry after the cursor of the user, or None.
+    """
+    order = KanjiLearningCursor.objects.filter(
+        user_id=user_id
+    ).values_list('order', flat=True).first()
+
+    return get_catalog().after(order or 0)
+
+
+def advance(user_id, order):
+    """
+    Move the cursor of the user forward to `order`.
+    """
+    updated = KanjiLearningCursor.objects.filter(
+        user_id=user_id,
+        order__lt=order
+    ).update(order=order)
+
+    if not updated:
+        KanjiLearningCursor.objects.get_or_create(
+            user_id=user_id,
+            defaults={'order': order}
+        )
@@ -0,0 +1,125 @@
+"""
+Distractor sampling for the multiple-choice kanji test.
+
+Distractors are picked from the in-process catalog (see tutor.catalog),
+so picking them needs no SQL.
+
+Which entries are picked is decided by a strategy, selected with the
+TUTOR_DISTRACTOR_STRATEGY setting. Strategies only see the catalog, so a
+smarter strategy cannot bring per-request queries back.
+"""
+import random
+
+from django.conf import settings
+
+from .catalog import catalog_cache, get_catalog
+
+
+def sample_excluding(start, stop, excluded, count):
+    """
+    Sample `count` distinct indexes from range(start, stop) without
+    `excluded`.
+    """
+    if not start <= excluded < stop:
+        return random.sample(range(start, stop), min(count, stop - start))
+
+    size = stop - start - 1
+
+    return [
+        i + 1 if i >= excluded else i
+        for i in random.sample(range(start, start + size), min(count, size))
+    ]
+
+
+class UniformStrategy:
+    """
+    Pick distractors uniformly from the whole catalog.
+    """
+
+    def sample(self, catalog, target, count):
+        return sample_excluding(0, len(catalog), target, count)
+
+
+class BandStrategy(UniformStrategy):
+    """
+    Pick distractors from the entries near the tested one in the
+    curriculum order, so they are of a similar level. The catalog is split
+    into bands of `band_size` orders.
+    """
+
+    def __init__(self, band_size=100):
+        self.band_size = band_size
+
+    def sample(self, catalog, target, count):
+        order = catalog.orders[target]
+        low = (order - 1) // self.band_size * self.band_size + 1
+        start, stop = catalog.order_range(low, low + self.band_size - 1)
+
+        if stop - start > count:
+            return sample_excluding(start, stop, target, count)
+
+        return super().sample(catalog, target, count)
+
+
+class SimilarStrategy(UniformStrategy):
+    """
+    Pick distractors from a table of look-alike kanji given as a mapping
+    of writing to a string of similar writings. Missing places are filled
+    uniformly.
+    """
+
+    def __init__(self, similar=None):
+        self.similar = similar or {}
+
+    def sample(self, catalog, target, count):
+        writing = catalog.entries[target].writing
+        indexes = []
+
+        for similar_writing in self.similar.get(writing, ''):
+            i = catalog.index_of_writing(similar_writing)
+            if i is not None and i != target and i not in indexes:
+                indexes.append(i)
+
+        random.shuffle(indexes)
+        indexes = indexes[:count]
+
+        while len(indexes) < min(count, len(catalog) - 1):
+            i = sample_excluding(0, len(catalog), target, 1)[0]
+            if i not in indexes:
+                indexes.append(i)
+
+        return indexes
+
+
+STRATEGIES = {
+    'uniform': UniformStrategy,
+    'band': BandStrategy,
+    'similar': SimilarStrategy,
+}
+
+
+def get_strategy():
+    name = getattr(settings, 'TUTOR_DISTRACTOR_STRATEGY', 'uniform')
+    options = getattr(settings, 'TUTOR_DISTRACTOR_OPTIONS', {})
+    return STRATEGIES[name](**options)
+
+
+def sample(entry_id, count, strategy=None):
+    """
+    Return up to `count` catalog entries other than the one with
+    `entry_id`, or none if there is no such entry.
+    """
+    if strategy is None:
+        strategy = get_strategy()
+
+    catalog = get_catalog()
+    target = catalog.index_of(entry_id)
+
+    if target is None:
+        catalog = catalog_cache.refresh()
+        target = catalog.index_of(entry_id)
+        if target is None:
+            return []
+
+    return [catalog.entries[i]
+            for i in strategy.sample(catalog, target, count)]
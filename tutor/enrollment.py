@@ -0,0 +1,80 @@
+"""
+Enrollment of users into the kanji curriculum.
+
+Enrolling gives a user an unlearnt KanjiLearningRecord for every entry of
+the curriculum, or of a range of it by order. Rows are inserted with
+batched bulk_create and rows that already exist are skipped.
+"""
+from collections import namedtuple
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import KanjiEntry, KanjiLearningRecord
+
+
+DEFAULT_BATCH_SIZE = 500
+USER_CHUNK_SIZE = 100
+
+
+class EnrollmentResult(namedtuple('EnrollmentResult',
+                                  ['users', 'created', 'skipped', 'seconds'])):
+
+    @property
+    def rate(self):
+        if self.seconds == 0:
+            return 0
+        return self.created / self.seconds
+
+
+def enroll(user_ids, min_order=None, max_order=None, batch_size=None):
+    """
+    Enroll the users with `user_ids` into the entries with order between
+    `min_order` and `max_order`, both inclusive and both optional.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'TUTOR_ENROLL_BATCH_SIZE',
+                             DEFAULT_BATCH_SIZE)
+
+    started = time.perf_counter()
+
+    entries = KanjiEntry.objects.all()
+    if min_order is not None:
+        entries = entries.filter(order__gte=min_order)
+    if max_order is not None:
+        entries = entries.filter(order__lte=max_order)
+
+    entry_ids = list(entries.order_by('order').values_list('id', flat=True))
+    user_ids = list(user_ids)
+    created = skipped = 0
+
+    for i in range(0, len(user_ids), USER_CHUNK_SIZE):
+        chunk = user_ids[i:i + USER_CHUNK_SIZE]
+
+        with transaction.atomic():
+            existing = set(
+                KanjiLearningRecord.objects.filter(
+                    user_id__in=chunk,
+                    kanji_entry__in=entries
+                ).values_list('user_id', 'kanji_entry_id')
+            )
+            records = [
+                KanjiLearningRecord(kanji_entry_id=entry_id, user_id=user_id)
+                for user_id in chunk
+                for entry_id in entry_ids
+                if (user_id, entry_id) not in existing
+            ]
+            KanjiLearningRecord.objects.bulk_create(
+                records, batch_size=batch_size
+            )
+
+        created += len(records)
+        skipped += len(existing)
+
+    return EnrollmentResult(
+        users=len(user_ids),
+        created=created,
+        skipped=skipped,
+        seconds=time.perf_counter() - started
+    )
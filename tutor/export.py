@@ -0,0 +1,101 @@
+"""
+Export of learning and testing history.
+
+Records are read with QuerySet.iterator(), so an export of any size runs
+in constant memory, and written one line at a time as CSV or NDJSON so a
+StreamingHttpResponse can send them as they are read.
+"""
+import csv
+import json
+
+from . import catalog
+from .models import KanjiLearningRecord, KanjiTestingRecord
+
+
+DEFAULT_CHUNK_SIZE = 2000
+COLUMNS = ['record', 'user_id', 'writing', 'is_learnt', 'test_date',
+           'correct_streak', 'interval', 'ease', 'difficulty']
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def rows(user_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield a dict per learning and testing record of the user with
+    `user_id`, or of all users. Records of an entry that is no longer in
+    the catalog, deleted while the export runs, are skipped.
+    """
+    learning_records = KanjiLearningRecord.objects.order_by(
+        'user_id', 'kanji_entry_id'
+    )
+    testing_records = KanjiTestingRecord.objects.order_by(
+        'user_id', 'kanji_entry_id'
+    )
+    if user_id is not None:
+        learning_records = learning_records.filter(user_id=user_id)
+        testing_records = testing_records.filter(user_id=user_id)
+
+    for user_id, entry_id, is_learnt in learning_records.values_list(
+        'user_id', 'kanji_entry_id', 'is_learnt'
+    ).iterator(chunk_size=chunk_size):
+        entry = catalog.get_entry(entry_id)
+        if entry is None:
+            continue
+
+        yield {
+            'record': 'learning',
+            'user_id': user_id,
+            'writing': entry.writing,
+            'is_learnt': is_learnt,
+        }
+
+    for (user_id, entry_id, test_date, correct_streak, interval, ease,
+         difficulty) in testing_records.values_list(
+        'user_id', 'kanji_entry_id', 'test_date', 'correct_streak',
+        'interval', 'ease', 'difficulty'
+    ).iterator(chunk_size=chunk_size):
+        entry = catalog.get_entry(entry_id)
+        if entry is None:
+            continue
+
+        yield {
+            'record': 'testing',
+            'user_id': user_id,
+            'writing': entry.writing,
+            'test_date': test_date.isoformat(),
+            'correct_streak': correct_streak,
+            'interval': interval,
+            'ease': ease,
+            'difficulty': difficulty,
+        }
+
+
+class Line:
+    """
+    A file that returns what is written to it, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(Line(), COLUMNS)
+    yield writer.writerow(dict(zip(COLUMNS, COLUMNS)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def lines(rows, format):
+    if format == 'csv':
+        return csv_lines(rows)
+    if format == 'ndjson':
+        return ndjson_lines(rows)
+    raise ValueError('Unknown format %r' % format)
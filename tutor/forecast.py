@@ -0,0 +1,103 @@
+"""
+Forecast of the reviews due for a user.
+
+The test dates and the scheduling state of all cards of a user are read
+as flat columns and bucketed by day with NumPy. Besides the reviews
+already scheduled, the projected load follows every card through the
+scheduler assuming it is always answered correctly on its due date, one
+vectorized review of all the cards still inside the horizon at a time.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+
+from . import schedulers
+from .models import KanjiTestingRecord
+
+
+DEFAULT_DAYS = 365
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+Forecast = namedtuple('Forecast', ['start', 'due', 'load'])
+
+
+def to_days(dates):
+    return (np.array(dates, dtype='datetime64[D]') - EPOCH).astype(np.int64)
+
+
+def get_deck(user_id):
+    rows = KanjiTestingRecord.objects.filter(user_id=user_id).values_list(
+        'correct_streak', 'interval', 'ease', 'test_date', 'difficulty'
+    )
+    columns = list(zip(*rows)) or [(), (), (), (), ()]
+    streaks, intervals, eases, test_dates, difficulties = columns
+
+    return schedulers.make_deck(streaks, intervals, eases,
+                                to_days(list(test_dates)), difficulties)
+
+
+def bucket(due, today, days):
+    """
+    Count the cards due on each of `days` days from `today`, the overdue
+    ones counted on today.
+    """
+    offsets = np.maximum(due - today, 0)
+    return np.bincount(offsets[offsets < days], minlength=days)[:days]
+
+
+def project(deck, today, days, scheduler):
+    """
+    Count the reviews of each day when every card is answered correctly
+    on its due date, the overdue ones today.
+    """
+    load = np.zeros(days, dtype=np.int64)
+    deck = deck._replace(due=np.maximum(deck.due, today))
+
+    for _ in range(days):
+        active = deck.due < today + days
+        if not active.any():
+            break
+
+        deck = schedulers.Deck(*(column[active] for column in deck))
+        load += np.bincount(deck.due - today, minlength=days)[:days]
+
+        reviewed = scheduler.review(
+            deck, np.ones(len(deck.due), dtype=bool), deck.due
+        )
+        # A card always moves forward, even with a zero interval.
+        deck = reviewed._replace(
+            due=np.maximum(reviewed.due, deck.due + 1)
+        )
+
+    return load
+
+
+def forecast(user_id, today, days=DEFAULT_DAYS, scheduler=None):
+    """
+    Return the reviews due and the projected load on each of the `days`
+    days from `today`.
+    """
+    if scheduler is None:
+        scheduler = schedulers.get_scheduler()
+
+    deck = get_deck(user_id)
+    start = int(to_days([today])[0])
+
+    return Forecast(
+        start=today,
+        due=bucket(deck.due, start, days),
+        load=project(deck, start, days, scheduler)
+    )
+
+
+def weeks(forecast):
+    """
+    Return (first day, due, load) of each week of a forecast.
+    """
+    return [
+        (forecast.start + timedelta(days=i),
+         int(forecast.due[i:i + 7].sum()),
+         int(forecast.load[i:i + 7].sum()))
+        for i in range(0, len(forecast.due), 7)
+    ]
@@ -0,0 +1,280 @@
+"""
+Import of kanji dictionaries into KanjiEntry.
+
+Entries are read incrementally from KANJIDIC2 XML, from a JSON array or
+from JSON Lines, so memory use does not grow with the file. They are
+upserted by writing in batches. In each batch only the entries that are
+new or differ from their row are written, so importing the same file
+again writes nothing. Entries whose meaning belongs to another kanji
+are skipped, because meanings are unique.
+"""
+from collections import namedtuple
+import json
+import time
+from xml.etree import ElementTree
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from . import bulk, catalog
+from .models import KanjiEntry, KanjiTestingQueueItem
+
+
+DEFAULT_BATCH_SIZE = 500
+FIELDS = ['writing', 'on_reading', 'kun_reading', 'meaning', 'order']
+READING_SEPARATOR = '、'
+MEANING_SEPARATOR = ', '
+# Entries without a frequency rank come after the 2500 ranked ones.
+UNRANKED_ORDER = 10000
+
+Entry = namedtuple('Entry', FIELDS)
+
+
+class ImportResult(namedtuple('ImportResult',
+                              ['read', 'created', 'updated', 'unchanged',
+                               'invalid', 'conflicts', 'seconds'])):
+
+    @property
+    def rate(self):
+        if self.seconds == 0:
+            return 0
+        return self.read / self.seconds
+
+
+def join(values, separator, max_length=100):
+    """
+    Join as many of `values` as fit in `max_length`.
+    """
+    joined = ''
+    for value in values:
+        candidate = joined + separator + value if joined else value
+        if len(candidate) > max_length:
+            break
+        joined = candidate
+    return joined
+
+
+def make_entry(writing, on_readings, kun_readings, meanings, order):
+    """
+    Return an Entry, or None when it can not be a KanjiEntry.
+    """
+    try:
+        meaning = join(meanings, MEANING_SEPARATOR)
+        if len(writing or '') != 1 or not meaning or order is None:
+            return None
+        return Entry(writing,
+                     join(on_readings, READING_SEPARATOR),
+                     join(kun_readings, READING_SEPARATOR),
+                     meaning,
+                     int(order))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_character(element, position, order_by):
+    readings = {'ja_on': [], 'ja_kun': []}
+    for reading in element.iterfind('reading_meaning/rmgroup/reading'):
+        if reading.get('r_type') in readings:
+            readings[reading.get('r_type')].append(reading.text)
+
+    meanings = [
+        meaning.text
+        for meaning in element.iterfind('reading_meaning/rmgroup/meaning')
+        if meaning.get('m_lang', 'en') == 'en'
+    ]
+
+    order = position
+    if order_by == 'freq':
+        freq = element.findtext('misc/freq')
+        order = int(freq) if freq else UNRANKED_ORDER + position
+
+    return make_entry(element.findtext('literal'), readings['ja_on'],
+                      readings['ja_kun'], meanings, order)
+
+
+def read_xml(f, order_by='position'):
+    """
+    Yield the entries of a KANJIDIC2 file, or None for invalid ones. The
+    order is the position in the file or, with `order_by` 'freq', the
+    frequency rank.
+    """
+    events = ElementTree.iterparse(f, events=('start', 'end'))
+    _, root = next(events)
+    position = 0
+
+    for event, element in events:
+        if event == 'end' and element.tag == 'character':
+            position += 1
+            yield parse_character(element, position, order_by)
+            root.clear()
+
+
+def iter_json_array(f, chunk_size=65536):
+    """
+    Yield the items of a JSON array in a file without loading it whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = eof = False
+
+    while True:
+        buffer = buffer.lstrip()
+        if not started and buffer:
+            if buffer[0] != '[':
+                raise ValueError('Not a JSON array')
+            buffer = buffer[1:].lstrip()
+            started = True
+        if started and buffer[:1] == ',':
+            buffer = buffer[1:].lstrip()
+        if started and buffer[:1] == ']':
+            return
+
+        if started and buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+
+        if eof:
+            raise ValueError('Unterminated JSON array')
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+def parse_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def read_json(f, lines=False):
+    """
+    Yield the entries of a JSON array or of JSON Lines, or None for
+    invalid ones. An item is a KanjiEntry as a dict, with the readings
+    and meanings either joined or as lists. Without an order, the
+    position in the file is used. A line that is not JSON is an invalid
+    entry, but an array that is not JSON can not be read further and
+    raises ValueError.
+    """
+    if lines:
+        items = (parse_line(line) for line in f if line.strip())
+    else:
+        items = iter_json_array(f)
+
+    for position, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            yield None
+            continue
+
+        values = {}
+        for name in ['on_reading', 'kun_reading', 'meaning']:
+            value = item.get(name) or []
+            values[name] = [value] if isinstance(value, str) else value
+
+        yield make_entry(item.get('writing'), values['on_reading'],
+                         values['kun_reading'], values['meaning'],
+                         item.get('order', position))
+
+
+def import_batch(entries):
+    """
+    Upsert a batch of entries. Return the numbers created, updated,
+    unchanged and skipped for a conflicting meaning.
+    """
+    by_writing = {}
+    for entry in entries:
+        by_writing[entry.writing] = entry
+
+    existing = {
+        row[1]: row
+        for row in KanjiEntry.objects.filter(
+            writing__in=by_writing
+        ).values_list('id', *FIELDS)
+    }
+    owners = dict(KanjiEntry.objects.filter(
+        meaning__in=[entry.meaning for entry in by_writing.values()]
+    ).values_list('meaning', 'writing'))
+
+    new = []
+    changed = []
+    changed_order_ids = []
+    unchanged = conflicts = 0
+    meanings = set()
+
+    for entry in by_writing.values():
+        owner = owners.get(entry.meaning, entry.writing)
+        if owner != entry.writing or entry.meaning in meanings:
+            conflicts += 1
+            continue
+        meanings.add(entry.meaning)
+
+        row = existing.get(entry.writing)
+        if row is None:
+            new.append(KanjiEntry(**entry._asdict()))
+        elif tuple(row[1:]) == tuple(entry):
+            unchanged += 1
+        else:
+            changed.append(KanjiEntry(id=row[0], **entry._asdict()))
+            if row[5] != entry.order:
+                changed_order_ids.append(row[0])
+
+    with transaction.atomic():
+        KanjiEntry.objects.bulk_create(new)
+        bulk.bulk_update(changed, FIELDS[1:])
+
+        if changed_order_ids:
+            KanjiTestingQueueItem.objects.filter(
+                kanji_entry_id__in=changed_order_ids
+            ).update(order=Subquery(
+                KanjiEntry.objects.filter(
+                    pk=OuterRef('kanji_entry_id')
+                ).values('order')[:1]
+            ))
+
+    return len(new), len(changed), unchanged, conflicts
+
+
+def import_entries(entries, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Upsert an iterable of entries, None for invalid ones, in batches.
+    """
+    started = time.perf_counter()
+    read = invalid = 0
+    counts = [0, 0, 0, 0]
+    batch = []
+
+    def flush():
+        for i, count in enumerate(import_batch(batch)):
+            counts[i] += count
+        batch.clear()
+
+    for entry in entries:
+        read += 1
+        if entry is None:
+            invalid += 1
+            continue
+        batch.append(entry)
+        if len(batch) == batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if counts[0] or counts[1]:
+        catalog.invalidate()
+
+    return ImportResult(
+        read=read,
+        created=counts[0],
+        updated=counts[1],
+        unchanged=counts[2],
+        invalid=invalid,
+        conflicts=counts[3],
+        seconds=time.perf_counter() - started
+    )
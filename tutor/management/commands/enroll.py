@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import enrollment
+
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Enroll users into the kanji curriculum."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'users', nargs='*',
+            help="Emails of the users to enroll."
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='all_users',
+            help="Enroll all active users."
+        )
+        parser.add_argument('--min-order', type=int)
+        parser.add_argument('--max-order', type=int)
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if options['all_users']:
+            query_set = UserModel._default_manager.filter(is_active=True)
+        elif options['users']:
+            query_set = UserModel._default_manager.filter(
+                email__in=options['users']
+            )
+        else:
+            raise CommandError("Give user emails or --all.")
+
+        users = dict(query_set.values_list('email', 'id'))
+        user_ids = list(users.values())
+
+        if not options['all_users']:
+            missing = set(options['users']) - users.keys()
+            if missing:
+                raise CommandError(
+                    "Users do not exist: %s" % ', '.join(sorted(missing))
+                )
+
+        result = enrollment.enroll(
+            user_ids,
+            min_order=options['min_order'],
+            max_order=options['max_order'],
+            batch_size=options['batch_size']
+        )
+
+        self.stdout.write(
+            "Enrolled %d users: %d records created, %d skipped "
+            "in %.2fs (%.0f records/s)" % (
+                result.users, result.created, result.skipped,
+                result.seconds, result.rate
+            )
+        )
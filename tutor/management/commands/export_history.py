@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import export
+
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Export learning and testing records as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help="Email of the user to export, all users by default."
+        )
+        parser.add_argument('--format', choices=sorted(export.FORMATS),
+                            default='csv')
+        parser.add_argument('--output', help="File to write, stdout by "
+                                             "default.")
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options['user']:
+            try:
+                user_id = UserModel._default_manager.get(
+                    email=options['user']
+                ).id
+            except UserModel.DoesNotExist:
+                raise CommandError("User does not exist.")
+
+        lines = export.lines(
+            export.rows(user_id, options['chunk_size']), options['format']
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import kanjidic
+
+
+class Command(BaseCommand):
+    help = "Import kanji entries from KANJIDIC2 XML, JSON or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=['xml', 'json', 'jsonl'],
+            help="Format of the file, by default from its extension."
+        )
+        parser.add_argument(
+            '--order-by', choices=['position', 'freq'], default='position',
+            help="Order of KANJIDIC2 entries: their position in the file "
+                 "or their frequency rank."
+        )
+        parser.add_argument('--batch-size', type=int,
+                            default=kanjidic.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            file_format = {
+                '.xml': 'xml', '.json': 'json', '.jsonl': 'jsonl',
+                '.ndjson': 'jsonl',
+            }.get(os.path.splitext(path)[1])
+            if file_format is None:
+                raise CommandError("Give the --format of the file.")
+
+        try:
+            if file_format == 'xml':
+                f = open(path, 'rb')
+            else:
+                f = open(path, encoding='utf-8')
+        except OSError as e:
+            raise CommandError(e)
+
+        with f:
+            if file_format == 'xml':
+                entries = kanjidic.read_xml(f, options['order_by'])
+            else:
+                entries = kanjidic.read_json(f, lines=file_format == 'jsonl')
+            result = kanjidic.import_entries(entries, options['batch_size'])
+
+        self.stdout.write(
+            "Read %d entries: %d created, %d updated, %d unchanged, "
+            "%d invalid, %d conflicting in %.2fs (%.0f entries/s)" % (
+                result.read, result.created, result.updated,
+                result.unchanged, result.invalid, result.conflicts,
+                result.seconds, result.rate
+            )
+        )
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from ... import progress
+
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute the progress counters of users from their records."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'users', nargs='*',
+            help="Emails of the users, all users with records by default."
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['users']:
+            user_ids = UserModel._default_manager.filter(
+                email__in=options['users']
+            ).values_list('id', flat=True)
+
+        count = progress.rebuild(user_ids)
+
+        self.stdout.write("Rebuilt the progress of %d users" % count)
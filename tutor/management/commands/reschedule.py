@@ -0,0 +1,54 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import progress, schedulers
+
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute the review schedule of users with a scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'users', nargs='*',
+            help="Emails of the users to reschedule."
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='all_users',
+            help="Reschedule all users."
+        )
+        parser.add_argument(
+            '--scheduler', choices=sorted(schedulers.SCHEDULERS),
+            help="Scheduler to use instead of TUTOR_SCHEDULER."
+        )
+        parser.add_argument(
+            '--options', type=json.loads, default=None,
+            help="Scheduler options as a JSON object."
+        )
+
+    def handle(self, *args, **options):
+        if options['all_users']:
+            query_set = UserModel._default_manager.all()
+        elif options['users']:
+            query_set = UserModel._default_manager.filter(
+                email__in=options['users']
+            )
+        else:
+            raise CommandError("Give user emails or --all.")
+
+        scheduler = schedulers.get_scheduler(
+            options['scheduler'], options['options']
+        ) if options['scheduler'] else schedulers.get_scheduler()
+
+        user_ids = list(query_set.values_list('id', flat=True))
+        changed = 0
+        for user_id in user_ids:
+            changed += schedulers.reschedule_user(user_id, scheduler)
+
+        progress.rebuild(user_ids)
+
+        self.stdout.write("Rescheduled %d cards" % changed)
@@ -0,0 +1,60 @@
+# Generated by Django 2.1.15 on 2026-10-18 08:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_queue(apps, schema_editor):
+    KanjiLearningRecord = apps.get_model('tutor', 'KanjiLearningRecord')
+    KanjiTestingRecord = apps.get_model('tutor', 'KanjiTestingRecord')
+    KanjiTestingQueueItem = apps.get_model('tutor', 'KanjiTestingQueueItem')
+
+    learnt = set(
+        KanjiLearningRecord.objects.filter(
+            is_learnt=True
+        ).values_list('user_id', 'kanji_entry_id')
+    )
+    records = KanjiTestingRecord.objects.values_list(
+        'user_id', 'kanji_entry_id', 'test_date', 'kanji_entry__order'
+    ).order_by('id')
+
+    items = {}
+    for user_id, entry_id, test_date, order in records.iterator():
+        if (user_id, entry_id) in learnt:
+            items[user_id, entry_id] = KanjiTestingQueueItem(
+                user_id=user_id, kanji_entry_id=entry_id,
+                test_date=test_date, order=order
+            )
+
+    KanjiTestingQueueItem.objects.bulk_create(items.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tutor', '0003_auto_20190210_0742'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KanjiTestingQueueItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_date', models.DateField()),
+                ('order', models.IntegerField()),
+                ('kanji_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tutor.KanjiEntry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='kanjitestingqueueitem',
+            index=models.Index(fields=['user', 'test_date', 'order'], name='tutor_queue_user_date_order'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='kanjitestingqueueitem',
+            unique_together={('kanji_entry', 'user')},
+        ),
+        migrations.RunPython(populate_queue, migrations.RunPython.noop),
+    ]
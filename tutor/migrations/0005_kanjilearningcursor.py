@@ -0,0 +1,60 @@
+# Generated by Django 2.1.15 on 2026-10-18 08:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, Min
+import django.db.models.deletion
+
+
+def populate_cursors(apps, schema_editor):
+    """
+    Point each cursor just before the first entry the user still has to
+    learn, or at the last learnt entry when nothing is left.
+    """
+    KanjiLearningRecord = apps.get_model('tutor', 'KanjiLearningRecord')
+    KanjiLearningCursor = apps.get_model('tutor', 'KanjiLearningCursor')
+
+    cursors = {}
+
+    learnt = KanjiLearningRecord.objects.filter(
+        is_learnt=True
+    ).values('user_id').annotate(order=Max('kanji_entry__order'))
+    for row in learnt.iterator():
+        cursors[row['user_id']] = row['order']
+
+    not_learnt = KanjiLearningRecord.objects.filter(
+        is_learnt=False
+    ).values('user_id').annotate(order=Min('kanji_entry__order'))
+    for row in not_learnt.iterator():
+        cursors[row['user_id']] = row['order'] - 1
+
+    KanjiLearningCursor.objects.bulk_create(
+        (KanjiLearningCursor(user_id=user_id, order=order)
+         for user_id, order in cursors.items()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tutor', '0004_kanjitestingqueueitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KanjiLearningCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='kanjientry',
+            name='order',
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.RunPython(populate_cursors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.1.15 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+def populate_intervals(apps, schema_editor):
+    """
+    Give tested cards the interval of the doubling schedule they were
+    scheduled with.
+    """
+    KanjiTestingRecord = apps.get_model('tutor', 'KanjiTestingRecord')
+
+    streaks = KanjiTestingRecord.objects.filter(
+        correct_streak__gt=0
+    ).values_list('correct_streak', flat=True).distinct()
+
+    for streak in list(streaks):
+        KanjiTestingRecord.objects.filter(
+            correct_streak=streak
+        ).update(interval=2.0 ** (streak - 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0005_kanjilearningcursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kanjitestingrecord',
+            name='ease',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='kanjitestingrecord',
+            name='interval',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(populate_intervals, migrations.RunPython.noop),
+    ]
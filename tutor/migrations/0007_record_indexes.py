@@ -0,0 +1,76 @@
+# Generated by Django 2.1.15 on 2026-10-18 08:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Keep one record per user and entry before they are made unique: the
+    learnt learning record and the first testing record.
+    """
+    for model_name, ordering in [('KanjiLearningRecord', ['-is_learnt', 'id']),
+                                 ('KanjiTestingRecord', ['id'])]:
+        model = apps.get_model('tutor', model_name)
+        duplicates = model.objects.values(
+            'user_id', 'kanji_entry_id'
+        ).annotate(count=Count('id')).filter(count__gt=1)
+
+        for duplicate in list(duplicates):
+            ids = list(
+                model.objects.filter(
+                    user_id=duplicate['user_id'],
+                    kanji_entry_id=duplicate['kanji_entry_id']
+                ).order_by(*ordering).values_list('id', flat=True)
+            )
+            model.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tutor', '0006_kanjitestingrecord_interval_ease'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='kanjilearningrecord',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='kanjitestingqueueitem',
+            name='kanji_entry',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='tutor.KanjiEntry'),
+        ),
+        migrations.AlterField(
+            model_name='kanjitestingqueueitem',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='kanjitestingrecord',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='kanjilearningrecord',
+            unique_together={('user', 'kanji_entry')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='kanjitestingrecord',
+            unique_together={('user', 'kanji_entry')},
+        ),
+        migrations.AddIndex(
+            model_name='kanjilearningrecord',
+            index=models.Index(fields=['user', 'is_learnt', 'kanji_entry'], name='tutor_learn_user_learnt_entry'),
+        ),
+        migrations.AddIndex(
+            model_name='kanjitestingrecord',
+            index=models.Index(fields=['user', 'test_date'], name='tutor_test_user_date'),
+        ),
+    ]
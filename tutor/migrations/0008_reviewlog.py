@@ -0,0 +1,33 @@
+# Generated by Django 2.1.15 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0007_record_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('kanji_entry_id', models.IntegerField()),
+                ('reviewed_at', models.IntegerField()),
+                ('is_correct', models.BooleanField()),
+                ('chosen_entry_id', models.IntegerField(null=True)),
+                ('response_ms', models.IntegerField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reviewlog',
+            index=models.Index(fields=['reviewed_at'], name='tutor_review_at'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewlog',
+            index=models.Index(fields=['user_id', 'reviewed_at'], name='tutor_review_user_at'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def populate_progress(apps, schema_editor):
+    """
+    Count the progress of the users who have records, like
+    tutor.progress.rebuild, since the views only add to the counters.
+    """
+    KanjiLearningRecord = apps.get_model('tutor', 'KanjiLearningRecord')
+    KanjiTestingQueueItem = apps.get_model('tutor', 'KanjiTestingQueueItem')
+    ReviewLog = apps.get_model('tutor', 'ReviewLog')
+    UserDueCount = apps.get_model('tutor', 'UserDueCount')
+    UserProgress = apps.get_model('tutor', 'UserProgress')
+
+    progress = {
+        user_id: [0, 0, 0]
+        for user_id in KanjiLearningRecord.objects.order_by(
+            'user_id'
+        ).values_list('user_id', flat=True).distinct()
+    }
+
+    learnt = KanjiLearningRecord.objects.filter(
+        is_learnt=True
+    ).values('user_id').annotate(count=Count('id')).order_by()
+    for row in learnt.iterator():
+        progress[row['user_id']][0] = row['count']
+
+    reviews = ReviewLog.objects.values('user_id').annotate(
+        reviews=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+    ).order_by()
+    for row in reviews.iterator():
+        counters = progress.setdefault(row['user_id'], [0, 0, 0])
+        counters[1:] = row['reviews'], row['correct']
+
+    UserProgress.objects.bulk_create(
+        (UserProgress(user_id=user_id, learnt_count=learnt_count,
+                      review_count=review_count, correct_count=correct_count)
+         for user_id, (learnt_count, review_count, correct_count)
+         in progress.items()),
+        batch_size=500
+    )
+
+    due = KanjiTestingQueueItem.objects.values(
+        'user_id', 'test_date'
+    ).annotate(count=Count('id')).order_by()
+    UserDueCount.objects.bulk_create(
+        (UserDueCount(user_id=row['user_id'], test_date=row['test_date'],
+                      count=row['count'])
+         for row in due.iterator()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0009_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_progress, migrations.RunPython.noop),
+    ]
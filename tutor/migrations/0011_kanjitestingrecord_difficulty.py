@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def move_difficulties(apps, schema_editor):
+    """
+    FSRS kept the difficulty in the ease column: move it to its own column
+    and give the cards the default SM-2 ease.
+    """
+    if getattr(settings, 'TUTOR_SCHEDULER', 'exponential') != 'fsrs':
+        return
+
+    KanjiTestingRecord = apps.get_model('tutor', 'KanjiTestingRecord')
+    KanjiTestingRecord.objects.update(difficulty=F('ease'), ease=2.5)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0010_populate_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kanjitestingrecord',
+            name='difficulty',
+            field=models.FloatField(default=5.0),
+        ),
+        migrations.RunPython(move_difficulties, migrations.RunPython.noop),
+    ]
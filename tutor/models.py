@@ -8,17 +8,92 @@ class KanjiEntry(models.Model):
     on_reading = models.CharField(max_length=100, blank=True)
     kun_reading = models.CharField(max_length=100, blank=True)
     meaning = models.CharField(max_length=100, unique=True)
-    order = models.IntegerField()
+    order = models.IntegerField(db_index=True)
 
 
 class KanjiLearningRecord(models.Model):
     kanji_entry = models.ForeignKey(KanjiEntry, on_delete=models.CASCADE)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     is_learnt = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_learnt', 'kanji_entry'],
+                         name='tutor_learn_user_learnt_entry'),
+        ]
+        unique_together = ('user', 'kanji_entry')
+
 
 class KanjiTestingRecord(models.Model):
     kanji_entry = models.ForeignKey(KanjiEntry, on_delete=models.CASCADE)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     test_date = models.DateField(auto_now_add=True)
     correct_streak = models.IntegerField(default=0)
+    interval = models.FloatField(default=0)
+    ease = models.FloatField(default=2.5)
+    difficulty = models.FloatField(default=5.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'test_date'],
+                         name='tutor_test_user_date'),
+        ]
+        unique_together = ('user', 'kanji_entry')
+
+
+class KanjiTestingQueueItem(models.Model):
+    kanji_entry = models.ForeignKey(KanjiEntry, on_delete=models.CASCADE,
+                                    db_index=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    test_date = models.DateField()
+    order = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'test_date', 'order'],
+                         name='tutor_queue_user_date_order'),
+        ]
+        unique_together = ('kanji_entry', 'user')
+
+
+class KanjiLearningCursor(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    order = models.IntegerField(default=0)
+
+
+class ReviewLog(models.Model):
+    """
+    One answer in a test, appended and never updated. Ids are plain
+    integers so that the log outlives the users and entries it refers to,
+    and the time is in seconds since the epoch. The response time is null
+    when it is not known, as for the answers of a batch test.
+    """
+    user_id = models.IntegerField()
+    kanji_entry_id = models.IntegerField()
+    reviewed_at = models.IntegerField()
+    is_correct = models.BooleanField()
+    chosen_entry_id = models.IntegerField(null=True)
+    response_ms = models.IntegerField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reviewed_at'], name='tutor_review_at'),
+            models.Index(fields=['user_id', 'reviewed_at'],
+                         name='tutor_review_user_at'),
+        ]
+
+
+class UserProgress(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    learnt_count = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    correct_count = models.IntegerField(default=0)
+
+
+class UserDueCount(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    test_date = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'test_date')
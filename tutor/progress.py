@@ -0,0 +1,160 @@
+"""
+Per-user progress counters.
+
+UserProgress counts the learnt cards, the answers and the correct answers
+of a user, and UserDueCount the cards in the testing queue of a user by
+test date. The views that learn and test cards update them in the same
+transaction as the records, so the progress page reads two small sets of
+rows instead of aggregating the records.
+
+The counters are authoritative: requests only add to them, creating them
+at zero on the first change of a user, and never recompute them. Migration
+0010 built them for the users who had records before. Bulk paths rebuild
+them instead of updating them (the reschedule command), and paths that
+change records without either (the admin, deleting records) make them
+drift until the rebuild_progress command recomputes them from the
+records, the queue and the review log. A rebuild counts the answers in
+the log, which the views write with the answers, so it agrees with the
+counters of the users who are not answering while it runs.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import (KanjiLearningRecord, KanjiTestingQueueItem, ReviewLog,
+                     UserDueCount, UserProgress)
+
+
+FORECAST_DAYS = 30
+USER_CHUNK_SIZE = 500
+
+
+def update(user_id, learnt=0, reviews=0, correct=0, due_changes=None):
+    """
+    Add to the counters of a user. `due_changes` maps test dates to the
+    change of the number of cards due on them.
+    """
+    counters = {
+        'learnt_count': F('learnt_count') + learnt,
+        'review_count': F('review_count') + reviews,
+        'correct_count': F('correct_count') + correct,
+    }
+
+    with transaction.atomic():
+        query_set = UserProgress.objects.filter(user_id=user_id)
+        if not query_set.update(**counters):
+            UserProgress.objects.get_or_create(user_id=user_id)
+            query_set.update(**counters)
+
+        for test_date, change in (due_changes or {}).items():
+            if not change:
+                continue
+
+            updated = UserDueCount.objects.filter(
+                user_id=user_id, test_date=test_date
+            ).update(count=F('count') + change)
+
+            if not updated:
+                UserDueCount.objects.create(
+                    user_id=user_id, test_date=test_date, count=change
+                )
+
+
+def moves(old_dates, new_dates):
+    """
+    Return the due changes of cards moved from `old_dates` to `new_dates`.
+    """
+    changes = Counter(new_dates)
+    changes.subtract(old_dates)
+    return changes
+
+
+def rebuild(user_ids=None):
+    """
+    Recompute the counters of the users with `user_ids`, or of all users
+    with records. Return the number of users.
+    """
+    if user_ids is None:
+        user_ids = KanjiLearningRecord.objects.order_by(
+            'user_id'
+        ).values_list('user_id', flat=True).distinct()
+    user_ids = list(user_ids)
+
+    for i in range(0, len(user_ids), USER_CHUNK_SIZE):
+        rebuild_chunk(user_ids[i:i + USER_CHUNK_SIZE])
+
+    return len(user_ids)
+
+
+def rebuild_chunk(user_ids):
+    with transaction.atomic():
+        learnt_counts = dict(
+            KanjiLearningRecord.objects.filter(
+                user_id__in=user_ids, is_learnt=True
+            ).values('user_id').annotate(
+                count=Count('id')
+            ).order_by().values_list('user_id', 'count')
+        )
+        review_counts = {
+            user_id: (reviews, correct)
+            for user_id, reviews, correct in ReviewLog.objects.filter(
+                user_id__in=user_ids
+            ).values('user_id').annotate(
+                reviews=Count('id'),
+                correct=Count('id', filter=Q(is_correct=True))
+            ).order_by().values_list('user_id', 'reviews', 'correct')
+        }
+        due_counts = KanjiTestingQueueItem.objects.filter(
+            user_id__in=user_ids
+        ).values('user_id', 'test_date').annotate(
+            count=Count('id')
+        ).order_by().values_list('user_id', 'test_date', 'count')
+
+        UserProgress.objects.filter(user_id__in=user_ids).delete()
+        UserDueCount.objects.filter(user_id__in=user_ids).delete()
+
+        UserProgress.objects.bulk_create([
+            UserProgress(
+                user_id=user_id,
+                learnt_count=learnt_counts.get(user_id, 0),
+                review_count=review_counts.get(user_id, (0, 0))[0],
+                correct_count=review_counts.get(user_id, (0, 0))[1]
+            )
+            for user_id in user_ids
+        ])
+        UserDueCount.objects.bulk_create(
+            [UserDueCount(user_id=user_id, test_date=test_date, count=count)
+             for user_id, test_date, count in due_counts.iterator()],
+            batch_size=500
+        )
+
+
+def get_progress(user_id, today, days=FORECAST_DAYS):
+    """
+    Return the counters of a user with the number of cards due on each of
+    the `days` days from `today`, the cards overdue counted on today.
+    """
+    progress = UserProgress.objects.filter(user_id=user_id).first()
+    if progress is None:
+        progress = UserProgress(user_id=user_id)
+
+    forecast = [0] * days
+    for test_date, count in UserDueCount.objects.filter(
+        user_id=user_id,
+        test_date__lt=today + timedelta(days=days),
+        count__gt=0
+    ).values_list('test_date', 'count'):
+        forecast[max((test_date - today).days, 0)] += count
+
+    return {
+        'learnt_count': progress.learnt_count,
+        'review_count': progress.review_count,
+        'correct_count': progress.correct_count,
+        'accuracy': (progress.correct_count / progress.review_count
+                     if progress.review_count else None),
+        'due_today': forecast[0],
+        'forecast': [(today + timedelta(days=i), count)
+                     for i, count in enumerate(forecast)],
+    }
@@ -0,0 +1,108 @@
+"""
+Due-card queue for kanji testing.
+
+A KanjiTestingQueueItem exists for every kanji a user has learnt and has a
+testing record for. It carries a copy of the test date and the entry order
+so that the next due card is a single lookup on the
+(user, test_date, order) index instead of a join over the learning and
+testing records. The items are kept up to date by the signal handlers in
+tutor.signals. Bulk writes send no signals, so code that updates testing
+records in bulk must update the queue itself.
+"""
+from django.db.models import Case, DateField, Value, When
+
+from .catalog import get_entry
+from .models import (KanjiLearningRecord, KanjiTestingQueueItem,
+                     KanjiTestingRecord)
+
+
+def due(user_id, test_date, count):
+    """
+    Return up to `count` due catalog entries with the lowest orders.
+    """
+    entry_ids = KanjiTestingQueueItem.objects.filter(
+        user_id=user_id,
+        test_date__lte=test_date
+    ).order_by('order').values_list('kanji_entry_id', flat=True)[:count]
+
+    return [get_entry(entry_id) for entry_id in entry_ids]
+
+
+def next_due(user_id, test_date):
+    """
+    Return the due catalog entry with the lowest order, or None.
+    """
+    entries = due(user_id, test_date, 1)
+
+    if not entries:
+        return None
+
+    return entries[0]
+
+
+def update_test_date(user_id, kanji_entry_id, test_date):
+    """
+    Move a queued card to a new test date. Cards that are not queued are
+    left alone.
+    """
+    return KanjiTestingQueueItem.objects.filter(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id
+    ).update(test_date=test_date)
+
+
+def update_test_dates(user_id, test_dates, batch_size=100):
+    """
+    Move queued cards to new test dates with one UPDATE per batch.
+    `test_dates` maps entry ids to dates.
+    """
+    test_dates = list(test_dates.items())
+    updated = 0
+
+    for i in range(0, len(test_dates), batch_size):
+        batch = test_dates[i:i + batch_size]
+        updated += KanjiTestingQueueItem.objects.filter(
+            user_id=user_id,
+            kanji_entry_id__in=[entry_id for entry_id, _ in batch]
+        ).update(test_date=Case(
+            *[When(kanji_entry_id=entry_id, then=Value(test_date))
+              for entry_id, test_date in batch],
+            output_field=DateField()
+        ))
+
+    return updated
+
+
+def sync(user_id, kanji_entry_id):
+    """
+    Rebuild the queue item of one card from its learning and testing
+    records.
+    """
+    testing_record = KanjiTestingRecord.objects.filter(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id
+    ).values_list('test_date', 'kanji_entry__order').first()
+
+    is_learnt = KanjiLearningRecord.objects.filter(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id,
+        is_learnt=True
+    ).exists()
+
+    if testing_record is None or not is_learnt:
+        remove(user_id, kanji_entry_id)
+        return
+
+    test_date, order = testing_record
+    KanjiTestingQueueItem.objects.update_or_create(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id,
+        defaults={'test_date': test_date, 'order': order}
+    )
+
+
+def remove(user_id, kanji_entry_id):
+    KanjiTestingQueueItem.objects.filter(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id
+    ).delete()
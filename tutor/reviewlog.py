@@ -0,0 +1,97 @@
+"""
+Append-only log of test answers.
+
+Answers are inserted in the transaction that applies them to the testing
+records, so the log holds every committed answer and nothing else; a
+batch of answers is one bulk_create. response_ms is null when the client
+did not send when the card was shown, and always for the batch test,
+whose cards are answered as one page.
+
+Reports read the log, never the testing records the scheduler updates.
+"""
+import time
+
+from django.db.models import Count, F, IntegerField, Q
+from django.db.models.expressions import ExpressionWrapper
+
+from .models import ReviewLog
+
+
+SECONDS_PER_DAY = 86400
+MAX_RESPONSE_MS = 3600 * 1000
+
+
+def get_response_ms(shown_at):
+    """
+    Return the milliseconds since `shown_at`, a timestamp in milliseconds
+    sent back by the client, or None when it is missing or implausible.
+    """
+    try:
+        response_ms = int(time.time() * 1000) - int(shown_at)
+    except (TypeError, ValueError):
+        return None
+    return response_ms if 0 <= response_ms <= MAX_RESPONSE_MS else None
+
+
+def make(user_id, kanji_entry_id, is_correct, chosen_entry_id=None,
+         response_ms=None, reviewed_at=None):
+    return ReviewLog(
+        user_id=user_id,
+        kanji_entry_id=kanji_entry_id,
+        reviewed_at=int(time.time() if reviewed_at is None
+                        else reviewed_at),
+        is_correct=is_correct,
+        chosen_entry_id=chosen_entry_id,
+        response_ms=response_ms
+    )
+
+
+def record(*args, **kwargs):
+    """
+    Log an answer. Arguments are those of make.
+    """
+    make(*args, **kwargs).save()
+
+
+def record_many(logs):
+    """
+    Log the answers made with make in one query.
+    """
+    ReviewLog.objects.bulk_create(logs)
+
+
+def daily_counts(user_id=None, since=None):
+    """
+    Return (day, reviews, correct answers) of each day with answers, the
+    day as days since the epoch.
+    """
+    logs = ReviewLog.objects.all()
+    if user_id is not None:
+        logs = logs.filter(user_id=user_id)
+    if since is not None:
+        logs = logs.filter(reviewed_at__gte=since)
+
+    return list(
+        logs.annotate(day=ExpressionWrapper(
+            F('reviewed_at') / SECONDS_PER_DAY, output_field=IntegerField()
+        )).values('day').annotate(
+            reviews=Count('id'),
+            correct=Count('id', filter=Q(is_correct=True))
+        ).order_by('day').values_list('day', 'reviews', 'correct')
+    )
+
+
+def confusions(user_id, limit=10):
+    """
+    Return (entry id, chosen entry id, count) of the wrong answers of a
+    user, the most frequent first.
+    """
+    return list(
+        ReviewLog.objects.filter(
+            user_id=user_id, is_correct=False, chosen_entry_id__isnull=False
+        ).values('kanji_entry_id', 'chosen_entry_id').annotate(
+            count=Count('id')
+        ).order_by('-count', 'kanji_entry_id').values_list(
+            'kanji_entry_id', 'chosen_entry_id', 'count'
+        )[:limit]
+    )
@@ -0,0 +1,336 @@
+"""
+Review schedulers.
+
+A scheduler works on a Deck: parallel NumPy arrays of the correct streak,
+the last interval in days, the ease, the due date (as a date ordinal) and
+the difficulty of each card. Grading one answer and rescheduling a whole
+deck after the algorithm or its parameters change are the same vectorized
+operations, on one card or on all of them.
+
+The SM-2 ease and the FSRS difficulty are on different scales, so each
+has a column of its own and a scheduler passes on the one it does not
+use. A deck switched to another algorithm starts from the last value that
+algorithm left, or its default.
+
+The scheduler in use is selected with the TUTOR_SCHEDULER and
+TUTOR_SCHEDULER_OPTIONS settings.
+"""
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+import numpy as np
+
+from . import bulk, queue
+from .models import KanjiTestingRecord
+
+
+DEFAULT_BASE_INTERVAL = 1
+DEFAULT_INTERVAL_RATE = 2
+DEFAULT_DIFFICULTY = 5.0
+
+
+Deck = namedtuple('Deck',
+                  ['streaks', 'intervals', 'eases', 'due', 'difficulties'])
+
+
+def make_deck(streaks, intervals, eases, due, difficulties=None):
+    if difficulties is None:
+        difficulties = [DEFAULT_DIFFICULTY] * len(due)
+
+    return Deck(
+        np.asarray(streaks, dtype=np.int64),
+        np.asarray(intervals, dtype=np.float64),
+        np.asarray(eases, dtype=np.float64),
+        np.asarray(due, dtype=np.int64),
+        np.asarray(difficulties, dtype=np.float64)
+    )
+
+
+class Scheduler:
+
+    def review(self, deck, correct, today):
+        """
+        Return the deck after answering every card on `today`, an ordinal.
+        `correct` is a boolean array of the answers.
+        """
+        raise NotImplementedError
+
+    def intervals(self, deck):
+        """
+        Return the interval each card would have been given by this
+        scheduler for its current streak and ease.
+        """
+        raise NotImplementedError
+
+    def reschedule(self, deck):
+        """
+        Return the deck with intervals and due dates recomputed by this
+        scheduler, keeping the date of the last review of each card.
+        """
+        last_review = deck.due - np.rint(deck.intervals).astype(np.int64)
+        intervals = self.intervals(deck)
+
+        return Deck(
+            deck.streaks,
+            intervals,
+            deck.eases,
+            last_review + np.rint(intervals).astype(np.int64),
+            deck.difficulties
+        )
+
+
+class ExponentialScheduler(Scheduler):
+    """
+    Double the interval on every correct answer, starting from the due
+    date. A wrong answer makes the card due today, unless its streak is
+    already 0, in which case the card is left as it is.
+    """
+
+    def __init__(self, base_interval=DEFAULT_BASE_INTERVAL,
+                 interval_rate=DEFAULT_INTERVAL_RATE):
+        self.base_interval = base_interval
+        self.interval_rate = interval_rate
+
+    def review(self, deck, correct, today):
+        correct = np.asarray(correct, dtype=bool)
+        intervals = self.base_interval * np.power(
+            float(self.interval_rate), deck.streaks
+        )
+
+        reset = ~correct & (deck.streaks != 0)
+
+        return Deck(
+            np.where(correct, deck.streaks + 1, 0),
+            np.select([correct, reset], [intervals, 0.0], deck.intervals),
+            deck.eases,
+            np.select(
+                [correct, reset],
+                [deck.due + np.rint(intervals).astype(np.int64), today],
+                deck.due
+            ),
+            deck.difficulties
+        )
+
+    def intervals(self, deck):
+        return np.where(
+            deck.streaks > 0,
+            self.base_interval * np.power(float(self.interval_rate),
+                                          deck.streaks - 1),
+            0.0
+        )
+
+
+class SM2Scheduler(Scheduler):
+    """
+    SuperMemo 2 with the answers graded `correct_quality` and
+    `incorrect_quality`. A wrong answer makes the card due today.
+    """
+
+    def __init__(self, correct_quality=4, incorrect_quality=1,
+                 min_ease=1.3, first_interval=1, second_interval=6):
+        self.correct_quality = correct_quality
+        self.incorrect_quality = incorrect_quality
+        self.min_ease = min_ease
+        self.first_interval = first_interval
+        self.second_interval = second_interval
+
+    def review(self, deck, correct, today):
+        correct = np.asarray(correct, dtype=bool)
+        quality = np.where(correct, self.correct_quality,
+                           self.incorrect_quality)
+        eases = np.maximum(
+            deck.eases +
+            (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
+            self.min_ease
+        )
+        intervals = np.select(
+            [deck.streaks == 0, deck.streaks == 1],
+            [self.first_interval, self.second_interval],
+            deck.intervals * eases
+        )
+        intervals = np.where(correct, intervals, 0.0)
+
+        return Deck(
+            np.where(correct, deck.streaks + 1, 0),
+            intervals,
+            eases,
+            today + np.rint(intervals).astype(np.int64),
+            deck.difficulties
+        )
+
+    def intervals(self, deck):
+        return np.select(
+            [deck.streaks == 0, deck.streaks == 1],
+            [0.0, self.first_interval],
+            self.second_interval * np.power(deck.eases, deck.streaks - 2)
+        )
+
+
+class FSRSScheduler(Scheduler):
+    """
+    A simplified FSRS. The difficulty goes from 1 to 10, and the memory
+    stability is derived from the last interval, which is
+    chosen so that the recall probability at the due date is
+    `retention`. Rescheduling into FSRS keeps the intervals of the cards.
+    """
+
+    def __init__(self, retention=0.9, initial_stability=3.0,
+                 relearn_stability=0.4, weights=(1.5, 0.15, 1.0, 0.2,
+                                                 2.0, 0.2, 0.3, 1.5, 1.0)):
+        self.retention = retention
+        self.initial_stability = initial_stability
+        self.relearn_stability = relearn_stability
+        self.weights = weights
+
+    def interval_factor(self):
+        return 9 * (1 / self.retention - 1)
+
+    def review(self, deck, correct, today):
+        w = self.weights
+        correct = np.asarray(correct, dtype=bool)
+        difficulty = np.clip(deck.difficulties, 1, 10)
+        stability = deck.intervals / self.interval_factor()
+        new = stability <= 0
+        stability = np.where(new, 1.0, stability)
+
+        elapsed = np.maximum(
+            today - (deck.due - np.rint(deck.intervals)), 0
+        )
+        recall = 1 / (1 + elapsed / (9 * stability))
+
+        recalled = stability * (
+            1 + np.exp(w[0]) * (11 - difficulty) *
+            np.power(stability, -w[1]) *
+            (np.exp(w[2] * (1 - recall)) - 1)
+        )
+        forgotten = (
+            w[4] * np.power(difficulty, -w[5]) *
+            (np.power(stability + 1, w[6]) - 1) *
+            np.exp(w[7] * (1 - recall))
+        )
+
+        stability = np.where(
+            new,
+            np.where(correct, self.initial_stability,
+                     self.relearn_stability),
+            np.where(correct, recalled, np.minimum(forgotten, stability))
+        )
+        intervals = np.where(correct, stability * self.interval_factor(),
+                             0.0)
+
+        return Deck(
+            np.where(correct, deck.streaks + 1, 0),
+            intervals,
+            deck.eases,
+            today + np.rint(intervals).astype(np.int64),
+            np.clip(np.where(correct, difficulty - w[3], difficulty + w[8]),
+                    1, 10)
+        )
+
+    def intervals(self, deck):
+        return np.where(deck.streaks > 0, deck.intervals, 0.0)
+
+
+SCHEDULERS = {
+    'exponential': ExponentialScheduler,
+    'sm2': SM2Scheduler,
+    'fsrs': FSRSScheduler,
+}
+
+
+def get_scheduler(name=None, options=None):
+    if name is None:
+        name = getattr(settings, 'TUTOR_SCHEDULER', 'exponential')
+        options = getattr(settings, 'TUTOR_SCHEDULER_OPTIONS', {})
+
+    return SCHEDULERS[name](**(options or {}))
+
+
+def get_deck(records):
+    return make_deck(
+        [record.correct_streak for record in records],
+        [record.interval for record in records],
+        [record.ease for record in records],
+        [record.test_date.toordinal() for record in records],
+        [record.difficulty for record in records]
+    )
+
+
+def review(records, answers, scheduler=None, today=None):
+    """
+    Apply `answers` to KanjiTestingRecords in place. Return the records
+    that are changed.
+    """
+    if scheduler is None:
+        scheduler = get_scheduler()
+    if today is None:
+        today = date.today()
+
+    deck = scheduler.review(get_deck(records), answers, today.toordinal())
+    changed_records = []
+
+    for i, record in enumerate(records):
+        values = (
+            int(deck.streaks[i]),
+            float(deck.intervals[i]),
+            float(deck.eases[i]),
+            date.fromordinal(int(deck.due[i])),
+            float(deck.difficulties[i])
+        )
+        if values != (record.correct_streak, record.interval, record.ease,
+                      record.test_date, record.difficulty):
+            (record.correct_streak, record.interval, record.ease,
+             record.test_date, record.difficulty) = values
+            changed_records.append(record)
+
+    return changed_records
+
+
+def reschedule_user(user_id, scheduler=None):
+    """
+    Recompute the schedule of every card of a user in one vectorized pass
+    and write the changed cards back in bulk. Return their number.
+    """
+    if scheduler is None:
+        scheduler = get_scheduler()
+
+    rows = list(
+        KanjiTestingRecord.objects.filter(user_id=user_id).values_list(
+            'id', 'kanji_entry_id', 'correct_streak', 'interval', 'ease',
+            'test_date', 'difficulty'
+        )
+    )
+    if not rows:
+        return 0
+
+    ids, entry_ids, streaks, intervals, eases, test_dates, difficulties = \
+        zip(*rows)
+    deck = make_deck(streaks, intervals, eases,
+                     [test_date.toordinal() for test_date in test_dates],
+                     difficulties)
+    rescheduled = scheduler.reschedule(deck)
+
+    changed = np.flatnonzero(
+        (rescheduled.due != deck.due) |
+        (rescheduled.intervals != deck.intervals)
+    )
+    records = [
+        KanjiTestingRecord(
+            id=ids[i],
+            kanji_entry_id=entry_ids[i],
+            interval=float(rescheduled.intervals[i]),
+            test_date=date.fromordinal(int(rescheduled.due[i]))
+        )
+        for i in changed
+    ]
+
+    with transaction.atomic():
+        bulk.bulk_update(records, ['interval', 'test_date'])
+        queue.update_test_dates(
+            user_id,
+            {record.kanji_entry_id: record.test_date for record in records}
+        )
+
+    return len(records)
@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete, post_save
+from django.conf import settings
+from django.dispatch import receiver
+
+from security.signals import user_verified, users_imported
+
+from . import catalog, cursor, enrollment, queue
+from .models import (KanjiEntry, KanjiLearningRecord, KanjiTestingQueueItem,
+                     KanjiTestingRecord)
+
+
+@receiver(post_save, sender=KanjiTestingRecord)
+def testing_record_saved(sender, instance, created, **kwargs):
+    if created:
+        queue.sync(instance.user_id, instance.kanji_entry_id)
+    else:
+        queue.update_test_date(
+            instance.user_id, instance.kanji_entry_id, instance.test_date
+        )
+
+
+@receiver(post_save, sender=KanjiLearningRecord)
+def learning_record_saved(sender, instance, **kwargs):
+    queue.sync(instance.user_id, instance.kanji_entry_id)
+
+
+@receiver(post_delete, sender=KanjiTestingRecord)
+@receiver(post_delete, sender=KanjiLearningRecord)
+def record_deleted(sender, instance, **kwargs):
+    queue.remove(instance.user_id, instance.kanji_entry_id)
+
+
+@receiver(post_save, sender=KanjiEntry)
+def entry_saved(sender, instance, created, **kwargs):
+    catalog.invalidate()
+
+    if not created:
+        KanjiTestingQueueItem.objects.filter(
+            kanji_entry_id=instance.id
+        ).update(order=instance.order)
+
+
+@receiver(post_delete, sender=KanjiEntry)
+def entry_deleted(sender, instance, **kwargs):
+    catalog.invalidate()
+
+
+@receiver(user_verified)
+def user_verified_enroll(sender, user, **kwargs):
+    if getattr(settings, 'TUTOR_ENROLL_ON_SIGNUP', True) and \
+            not cursor.is_lazy():
+        enrollment.enroll([user.id])
+
+
+@receiver(users_imported)
+def users_imported_enroll(sender, user_ids, **kwargs):
+    if getattr(settings, 'TUTOR_ENROLL_ON_SIGNUP', True) and \
+            not cursor.is_lazy():
+        enrollment.enroll(user_ids)
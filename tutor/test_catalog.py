@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import catalog
+from .models import KanjiEntry
+
+
+class CatalogTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        catalog.invalidate()
+
+    def test_get_entry(self):
+        catalog.get_catalog()
+
+        with self.assertNumQueries(0):
+            entry = catalog.get_entry(2)
+
+        self.assertEqual(
+            entry, KanjiEntry.objects.get(pk=2),
+            msg="Entry not equal to its model"
+        )
+        self.assertIsNone(
+            catalog.get_entry(100),
+            msg="Unknown entry is found"
+        )
+
+    def test_unknown_entry(self):
+        catalog.get_catalog()
+        version = cache.get(catalog.VERSION_KEY)
+
+        with self.settings(TUTOR_CATALOG_CHECK_INTERVAL=60), \
+                self.assertNumQueries(0):
+            self.assertIsNone(catalog.get_entry(987654))
+            self.assertIsNone(catalog.get_entry(987655))
+
+        self.assertEqual(
+            cache.get(catalog.VERSION_KEY), version,
+            msg="Unknown entry invalidates the catalog of all processes"
+        )
+
+    def test_unknown_entry_reload(self):
+        catalog.get_catalog()
+        KanjiEntry.objects.bulk_create([
+            KanjiEntry(id=100, writing='新', on_reading='しん',
+                       kun_reading='あたら', meaning='new', order=100)
+        ])
+        catalog.catalog_cache._loaded -= 60
+
+        with self.settings(TUTOR_CATALOG_CHECK_INTERVAL=60), \
+                self.assertNumQueries(1):
+            entry = catalog.get_entry(100)
+
+        self.assertEqual(entry.writing, '新',
+                         msg="Catalog not reloaded for an unknown entry")
+
+    def test_after(self):
+        orders = [entry.order for entry in catalog.get_catalog().entries]
+
+        self.assertEqual(
+            orders, sorted(orders),
+            msg="Entries not sorted by order"
+        )
+        self.assertEqual(
+            catalog.get_catalog().after(orders[0]).order, orders[1],
+            msg="Not return the entry after the order"
+        )
+        self.assertIsNone(
+            catalog.get_catalog().after(orders[-1]),
+            msg="Entry after the last one is found"
+        )
+
+    def test_invalidate_on_save(self):
+        entry = KanjiEntry.objects.get(pk=1)
+        entry.meaning = 'changed'
+        entry.save()
+
+        self.assertEqual(
+            catalog.get_entry(1).meaning, 'changed',
+            msg="Catalog not reloaded after an entry is saved"
+        )
+
+    def test_version_change(self):
+        old_catalog = catalog.get_catalog()
+        cache.set(catalog.VERSION_KEY, 'other', None)
+        catalog.catalog_cache._checked = 0
+
+        self.assertIsNot(
+            catalog.get_catalog(), old_catalog,
+            msg="Catalog not reloaded after the version changes"
+        )
@@ -0,0 +1,103 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from . import catalog
+from .models import (KanjiLearningCursor, KanjiLearningRecord,
+                     KanjiTestingRecord)
+
+
+@override_settings(TUTOR_LAZY_LEARNING=True)
+class LazyLearnKanjiViewTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+    def test_get(self):
+        KanjiLearningCursor.objects.create(user_id=1, order=2)
+        catalog.get_catalog()
+
+        with self.assertNumQueries(2):
+            entry = self.client.get('/learn-kanji/').context.get('entry')
+
+        self.assertEqual(
+            entry.id, 4,
+            msg="Not select the entry after the cursor"
+        )
+
+    def test_get_no_cursor(self):
+        entry = self.client.get('/learn-kanji/').context.get('entry')
+
+        self.assertEqual(
+            entry.id, 1,
+            msg="Not select the first entry without a cursor"
+        )
+
+    def test_get_no_entry(self):
+        KanjiLearningCursor.objects.create(user_id=1, order=4)
+
+        response = self.client.get('/learn-kanji/')
+
+        self.assertRedirects(
+            response, '/learn-kanji/done/',
+            msg_prefix="Not redirect when cursor is at the end"
+        )
+
+    def test_post(self):
+        response = self.client.post('/learn-kanji/', data={'entry_id': 4})
+
+        self.assertTrue(
+            KanjiLearningRecord.objects.get(kanji_entry_id=4,
+                                            user_id=1).is_learnt,
+            msg="Learnt entry is not recorded"
+        )
+        self.assertTrue(
+            KanjiTestingRecord.objects.filter(kanji_entry_id=4,
+                                              user_id=1).exists(),
+            msg="Testing record is not created"
+        )
+        self.assertEqual(
+            KanjiLearningCursor.objects.get(user_id=1).order, 3,
+            msg="Cursor is not advanced"
+        )
+        self.assertRedirects(
+            response, '/learn-kanji/', target_status_code=200,
+            msg_prefix="Not redirect to learn another entry"
+        )
+
+    def test_post_before_cursor(self):
+        KanjiLearningCursor.objects.create(user_id=1, order=3)
+
+        self.client.post('/learn-kanji/', data={'entry_id': 1})
+
+        self.assertEqual(
+            KanjiLearningCursor.objects.get(user_id=1).order, 3,
+            msg="Cursor is moved backward"
+        )
+
+
+class LearningModeSwitchTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def test_lazy_to_eager(self):
+        self.client.login(username='tester2@kenkyou.com', password='user')
+        KanjiLearningRecord.objects.filter(user_id=2).delete()
+
+        with self.settings(TUTOR_LAZY_LEARNING=True):
+            self.client.post('/learn-kanji/', data={'entry_id': 1})
+
+        call_command('enroll', all_users=True, stdout=StringIO())
+        entry = self.client.get('/learn-kanji/').context.get('entry')
+
+        self.assertEqual(
+            entry.id, 2,
+            msg="Not continue after the entries learnt in lazy mode"
+        )
+        self.assertTrue(
+            KanjiLearningRecord.objects.get(kanji_entry_id=1,
+                                            user_id=2).is_learnt,
+            msg="Entry learnt in lazy mode enrolled again"
+        )
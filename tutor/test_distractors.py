@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import catalog, distractors
+from .models import KanjiEntry
+
+
+class DistractorsTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def setUp(self):
+        catalog.invalidate()
+
+    def test_sample(self):
+        distractors.sample(1, 3)
+
+        with self.assertNumQueries(0):
+            choices = distractors.sample(1, 3)
+
+        self.assertEqual(
+            len(set(choices)), 3,
+            msg="Number of distractors not correct"
+        )
+        self.assertNotIn(
+            1, [choice.id for choice in choices],
+            msg="Tested entry is chosen as distractor"
+        )
+
+    def test_sample_few_entries(self):
+        KanjiEntry.objects.filter(pk__gt=2).delete()
+
+        self.assertEqual(
+            [(choice.id, choice.writing)
+             for choice in distractors.sample(1, 3)],
+            [(2, '月')],
+            msg="Catalog is not reloaded after entries change"
+        )
+
+    def test_sample_unknown_entry(self):
+        version = cache.get(catalog.VERSION_KEY)
+
+        self.assertEqual(
+            distractors.sample(987654, 3), [],
+            msg="Distractors sampled for an unknown entry"
+        )
+        self.assertEqual(
+            cache.get(catalog.VERSION_KEY), version,
+            msg="Unknown entry invalidates the catalog of all processes"
+        )
+
+    def test_band_strategy(self):
+        strategy = distractors.BandStrategy(band_size=3)
+
+        for _ in range(10):
+            choices = distractors.sample(1, 2, strategy=strategy)
+
+            self.assertEqual(
+                {choice.id for choice in choices}, {2, 3},
+                msg="Distractor is chosen outside of the band"
+            )
+
+    def test_similar_strategy(self):
+        strategy = distractors.SimilarStrategy(similar={'日': '月'})
+        choices = distractors.sample(1, 3, strategy=strategy)
+
+        self.assertIn(
+            2, [choice.id for choice in choices],
+            msg="Similar entry is not chosen as distractor"
+        )
+        self.assertEqual(
+            len(set(choices)), 3,
+            msg="Number of distractors not correct"
+        )
@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from security.models import User
+
+from . import enrollment
+from .models import KanjiLearningRecord
+
+
+class EnrollmentTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def test_enroll(self):
+        result = enrollment.enroll([1, 2], batch_size=2)
+
+        self.assertEqual(
+            KanjiLearningRecord.objects.count(), 8,
+            msg="Not all entries are enrolled"
+        )
+        self.assertEqual(
+            (result.users, result.created, result.skipped), (2, 6, 2),
+            msg="Existing records are not skipped"
+        )
+        self.assertTrue(
+            KanjiLearningRecord.objects.get(kanji_entry_id=2,
+                                            user_id=1).is_learnt,
+            msg="Existing record is changed"
+        )
+
+    def test_enroll_order_range(self):
+        enrollment.enroll([1], min_order=2, max_order=3)
+
+        self.assertEqual(
+            set(KanjiLearningRecord.objects.filter(
+                user_id=1
+            ).values_list('kanji_entry_id', flat=True)),
+            {2, 4},
+            msg="Entries outside of the order range are enrolled"
+        )
+
+    def test_command(self):
+        out = StringIO()
+        call_command('enroll', 'tester1@kenkyou.com', stdout=out)
+
+        self.assertEqual(
+            KanjiLearningRecord.objects.filter(user_id=1).count(), 4,
+            msg="Command does not enroll the user"
+        )
+        self.assertIn(
+            "3 records created, 1 skipped", out.getvalue(),
+            msg="Command does not report the enrollment"
+        )
+
+    def test_command_users(self):
+        call_command('enroll', 'tester1@kenkyou.com', 'tester1@kenkyou.com',
+                     stdout=StringIO())
+
+        self.assertEqual(
+            KanjiLearningRecord.objects.filter(user_id=1).count(), 4,
+            msg="Command does not enroll a user given twice"
+        )
+
+        with self.assertRaisesMessage(CommandError,
+                                      'missing@kenkyou.com'):
+            call_command('enroll', 'tester1@kenkyou.com',
+                         'missing@kenkyou.com', stdout=StringIO())
+
+    def test_signup_verify(self):
+        user = User.objects.create_user('tester3', 'tester3@kenkyou.com',
+                                        is_active=False)
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk)).decode()
+        token = default_token_generator.make_token(user)
+
+        self.client.get(
+            '/signup/verify/%s/%s/' % (uidb64, token), follow=True
+        )
+
+        self.assertEqual(
+            KanjiLearningRecord.objects.filter(user=user).count(), 4,
+            msg="Verified user is not enrolled"
+        )
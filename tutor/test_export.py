@@ -0,0 +1,85 @@
+from io import StringIO
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from . import catalog
+from .models import KanjiEntry, KanjiLearningRecord, KanjiTestingRecord
+
+
+class ExportTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+    def test_export_csv(self):
+        response = self.client.get('/export/')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(
+            lines[0],
+            'record,user_id,writing,is_learnt,test_date,correct_streak,'
+            'interval,ease,difficulty',
+            msg="Header not correct"
+        )
+        self.assertEqual(
+            len(lines) - 1,
+            KanjiLearningRecord.objects.filter(user_id=1).count() +
+            KanjiTestingRecord.objects.filter(user_id=1).count(),
+            msg="Not every record of the user exported"
+        )
+
+    def test_export_ndjson(self):
+        response = self.client.get('/export/?format=ndjson')
+        rows = [json.loads(line) for line in response.streaming_content]
+
+        self.assertEqual(
+            {row['user_id'] for row in rows}, {1},
+            msg="Records of other users exported"
+        )
+        self.assertIn(
+            {'record': 'learning', 'user_id': 1, 'writing': '火',
+             'is_learnt': True},
+            rows,
+            msg="Learning record not exported"
+        )
+
+    def test_entry_added_after_load(self):
+        catalog.get_catalog()
+        KanjiEntry.objects.bulk_create([
+            KanjiEntry(id=100, writing='新', on_reading='しん',
+                       kun_reading='あたら', meaning='new', order=100)
+        ])
+        KanjiLearningRecord.objects.create(user_id=1, kanji_entry_id=100)
+        catalog.catalog_cache._loaded -= 60
+
+        response = self.client.get('/export/?format=ndjson')
+        rows = [json.loads(line) for line in response.streaming_content]
+
+        self.assertIn(
+            {'record': 'learning', 'user_id': 1, 'writing': '新',
+             'is_learnt': False},
+            rows,
+            msg="Record of an entry added after the catalog loaded not "
+                "exported"
+        )
+
+    def test_export_unknown_format(self):
+        self.assertEqual(
+            self.client.get('/export/?format=xml').status_code, 404,
+            msg="Unknown format exported"
+        )
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('export_history', format='ndjson', stdout=stdout)
+
+        self.assertEqual(
+            len(stdout.getvalue().splitlines()),
+            KanjiLearningRecord.objects.count() +
+            KanjiTestingRecord.objects.count(),
+            msg="Not every record exported"
+        )
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.test import TestCase
+
+from . import forecast, schedulers
+from .models import KanjiTestingRecord
+
+
+class ForecastTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def test_bucket(self):
+        self.assertEqual(
+            forecast.bucket(np.array([8, 10, 10, 12, 30]), 10, 5).tolist(),
+            [3, 0, 1, 0, 0],
+            msg="Cards not bucketed by day"
+        )
+
+    def test_project(self):
+        deck = schedulers.make_deck([0, 2], [0, 2], [2.5, 2.5], [10, 9])
+
+        load = forecast.project(deck, 10, 8,
+                                schedulers.ExponentialScheduler())
+
+        self.assertEqual(
+            np.flatnonzero(load).tolist(), [0, 1, 3, 4, 7],
+            msg="Reviews not projected on the doubling schedule"
+        )
+        self.assertEqual(
+            load[0], 2,
+            msg="Overdue card not projected today"
+        )
+
+    def test_forecast(self):
+        today = date.today()
+        KanjiTestingRecord.objects.filter(user_id=1).update(
+            test_date=today + timedelta(days=2)
+        )
+
+        with self.assertNumQueries(1):
+            user_forecast = forecast.forecast(1, today)
+
+        self.assertEqual(
+            (len(user_forecast.due), user_forecast.due[2]),
+            (forecast.DEFAULT_DAYS,
+             KanjiTestingRecord.objects.filter(user_id=1).count()),
+            msg="Forecast not correct"
+        )
+        self.assertGreaterEqual(
+            user_forecast.load.sum(), user_forecast.due.sum(),
+            msg="Projected load less than the reviews due"
+        )
+
+    def test_index(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+        response = self.client.get('/')
+
+        self.assertEqual(
+            len(response.context['weeks']), 53,
+            msg="Forecast not shown by week"
+        )
@@ -0,0 +1,113 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import forecast, queue
+from .models import (KanjiLearningCursor, KanjiLearningRecord,
+                     KanjiTestingRecord)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Query plans are SQLite's")
+class QueryPlanTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+    def capture(self, run, table):
+        """
+        Return the SELECTs from `table` that calling `run` executes.
+        """
+        with CaptureQueriesContext(connection) as context:
+            run()
+
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and
+            ' "%s"' % table in query['sql']
+        ]
+
+        self.assertTrue(queries, msg="%s is not queried" % table)
+        return queries
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, run, table, index):
+        for sql in self.capture(run, table):
+            plan = self.query_plan(sql)
+            steps = [step for step in plan if ' %s ' % table in step + ' ']
+
+            self.assertTrue(
+                steps and all(index in step for step in steps),
+                msg="%s is not searched with %s: %s" % (table, index, plan)
+            )
+
+    def unique_index(self, model, columns):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+
+        for name, constraint in constraints.items():
+            if constraint['unique'] and constraint['index'] and \
+                    constraint['columns'] == columns:
+                return name
+
+        self.fail("%s has no unique %s index" % (
+            model.__name__, ', '.join(columns)
+        ))
+
+    @override_settings(TUTOR_LAZY_LEARNING=False)
+    def test_learn_kanji(self):
+        self.assertUsesIndex(
+            lambda: self.client.get('/learn-kanji/'),
+            'tutor_kanjilearningrecord', 'tutor_learn_user_learnt_entry'
+        )
+
+    @override_settings(TUTOR_LAZY_LEARNING=False)
+    def test_learning_record(self):
+        KanjiLearningRecord.objects.create(kanji_entry_id=1, user_id=1)
+
+        self.assertUsesIndex(
+            lambda: self.client.post('/learn-kanji/', {'entry_id': 1}),
+            'tutor_kanjilearningrecord',
+            self.unique_index(KanjiLearningRecord,
+                              ['user_id', 'kanji_entry_id'])
+        )
+
+    def test_testing_record(self):
+        KanjiTestingRecord.objects.create(kanji_entry_id=2, user_id=1)
+
+        self.assertUsesIndex(
+            lambda: self.client.post('/test-kanji/',
+                                     {'tested_entry_id': 2,
+                                      'chosen_entry_id': 2}),
+            'tutor_kanjitestingrecord',
+            self.unique_index(KanjiTestingRecord,
+                              ['user_id', 'kanji_entry_id'])
+        )
+
+    def test_testing_records_of_user(self):
+        self.assertUsesIndex(lambda: forecast.get_deck(1),
+                             'tutor_kanjitestingrecord',
+                             'tutor_test_user_date')
+
+    def test_queue(self):
+        self.assertUsesIndex(lambda: queue.due(1, date.today(), 10),
+                             'tutor_kanjitestingqueueitem',
+                             'tutor_queue_user_date_order')
+
+    @override_settings(TUTOR_LAZY_LEARNING=True)
+    def test_next_entry(self):
+        self.assertUsesIndex(
+            lambda: self.client.get('/learn-kanji/'),
+            'tutor_kanjilearningcursor',
+            self.unique_index(KanjiLearningCursor, ['user_id'])
+        )
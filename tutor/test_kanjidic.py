@@ -0,0 +1,152 @@
+from io import BytesIO, StringIO
+
+from django.test import TestCase
+
+from . import catalog, kanjidic
+from .models import KanjiEntry, KanjiTestingQueueItem
+
+
+KANJIDIC = '''<?xml version="1.0" encoding="UTF-8"?>
+<kanjidic2>
+<header><file_version>4</file_version></header>
+<character>
+<literal>日</literal>
+<misc><freq>1</freq></misc>
+<reading_meaning><rmgroup>
+<reading r_type="pinyin">ri4</reading>
+<reading r_type="ja_on">ニチ</reading>
+<reading r_type="ja_on">ジツ</reading>
+<reading r_type="ja_kun">ひ</reading>
+<meaning>day</meaning>
+<meaning>sun</meaning>
+<meaning m_lang="fr">jour</meaning>
+</rmgroup></reading_meaning>
+</character>
+<character>
+<literal>山</literal>
+<misc></misc>
+<reading_meaning><rmgroup>
+<reading r_type="ja_on">サン</reading>
+<reading r_type="ja_kun">やま</reading>
+<meaning>mountain</meaning>
+</rmgroup></reading_meaning>
+</character>
+<character>
+<literal>川</literal>
+<misc><freq>181</freq></misc>
+</character>
+</kanjidic2>
+'''
+
+
+class KanjidicTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def test_read_xml(self):
+        entries = list(kanjidic.read_xml(
+            BytesIO(KANJIDIC.encode()), order_by='freq'
+        ))
+
+        self.assertEqual(
+            entries,
+            [kanjidic.Entry('日', 'ニチ、ジツ', 'ひ', 'day, sun', 1),
+             kanjidic.Entry('山', 'サン', 'やま', 'mountain',
+                            kanjidic.UNRANKED_ORDER + 2),
+             None],
+            msg="Entries not parsed"
+        )
+
+    def test_read_json(self):
+        f = StringIO(
+            '[{"writing": "山", "meaning": ["mountain"], "order": 5},'
+            ' {"writing": "川", "on_reading": "セン",'
+            ' "meaning": "river"}]'
+        )
+
+        self.assertEqual(
+            list(kanjidic.iter_json_array(f, chunk_size=7)),
+            [{'writing': '山', 'meaning': ['mountain'], 'order': 5},
+             {'writing': '川', 'on_reading': 'セン', 'meaning': 'river'}],
+            msg="Array not read in chunks"
+        )
+
+        f.seek(0)
+        self.assertEqual(
+            list(kanjidic.read_json(f)),
+            [kanjidic.Entry('山', '', '', 'mountain', 5),
+             kanjidic.Entry('川', 'セン', '', 'river', 2)],
+            msg="Entries not parsed"
+        )
+
+    def test_read_json_lines_invalid(self):
+        f = StringIO(
+            '{"writing": "山", "meaning": "mountain"\n'
+            '7\n'
+            '{"writing": "川", "meaning": "river", "order": "first"}\n'
+            '{"writing": "水", "meaning": "water"}\n'
+        )
+
+        self.assertEqual(
+            list(kanjidic.read_json(f, lines=True)),
+            [None, None, None, kanjidic.Entry('水', '', '', 'water', 4)],
+            msg="Invalid lines not read as invalid entries"
+        )
+
+    def test_import_invalid_json_lines(self):
+        f = StringIO(
+            '{"writing": "山", "meaning": "mountain"\n'
+            '[1]\n'
+            '{"writing": "川", "meaning": "river", "order": "first"}\n'
+            '{"writing": "森", "meaning": "forest"}\n'
+        )
+
+        result = kanjidic.import_entries(kanjidic.read_json(f, lines=True),
+                                         batch_size=1)
+
+        self.assertEqual(
+            (result.read, result.created, result.invalid), (4, 1, 3),
+            msg="Invalid lines not counted"
+        )
+
+    def test_import_entries(self):
+        catalog.get_catalog()
+        entries = [
+            kanjidic.Entry('日', 'にち、じつ', 'ひ、び、か', 'day, sun, japan',
+                           1),
+            kanjidic.Entry('水', 'すい', 'みず', 'water', 7),
+            kanjidic.Entry('山', 'さん', 'やま', 'mountain', 8),
+            kanjidic.Entry('川', 'せん', 'かわ', 'water', 9),
+            None,
+        ]
+
+        result = kanjidic.import_entries(entries, batch_size=2)
+
+        self.assertEqual(
+            (result.read, result.created, result.updated, result.unchanged,
+             result.invalid, result.conflicts),
+            (5, 1, 1, 1, 1, 1),
+            msg="Import result not correct"
+        )
+        self.assertEqual(
+            set(KanjiTestingQueueItem.objects.filter(
+                kanji_entry_id=4
+            ).values_list('order', flat=True)),
+            {7},
+            msg="Queue order not updated"
+        )
+        self.assertEqual(
+            catalog.get_entry(
+                KanjiEntry.objects.get(writing='山').id
+            ).meaning,
+            'mountain',
+            msg="Catalog not invalidated"
+        )
+
+        with self.assertNumQueries(4):
+            result = kanjidic.import_entries(entries[:3])
+
+        self.assertEqual(
+            (result.created, result.updated, result.unchanged),
+            (0, 0, 3),
+            msg="Unchanged entries written again"
+        )
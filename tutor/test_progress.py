@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from . import progress
+from .models import (KanjiLearningRecord, KanjiTestingRecord, UserDueCount,
+                     UserProgress)
+
+
+class ProgressTestCase(TestCase):
+    fixtures = ['tutor/learn_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+    def assertCountersRebuilt(self):
+        counters = progress.get_progress(1, date.today())
+        progress.rebuild([1])
+
+        self.assertEqual(
+            counters, progress.get_progress(1, date.today()),
+            msg="Counters drift from the records"
+        )
+
+    def test_learn(self):
+        KanjiLearningRecord.objects.create(kanji_entry_id=1, user_id=1)
+        progress.rebuild([1])
+
+        self.client.post('/learn-kanji/', {'entry_id': 1})
+
+        counters = progress.get_progress(1, date.today())
+        self.assertEqual(
+            (counters['learnt_count'], counters['due_today']),
+            (2, 1),
+            msg="Counters not updated after learning"
+        )
+        self.assertCountersRebuilt()
+
+    def test_test(self):
+        KanjiTestingRecord.objects.create(kanji_entry_id=2, user_id=1)
+        progress.rebuild([1])
+
+        self.client.post('/test-kanji/', {'tested_entry_id': 2,
+                                          'chosen_entry_id': 2})
+
+        counters = progress.get_progress(1, date.today())
+        self.assertEqual(
+            (counters['review_count'], counters['correct_count'],
+             counters['due_today'], counters['forecast'][1][1]),
+            (1, 1, 0, 1),
+            msg="Counters not updated after testing"
+        )
+
+    def test_update_without_counters(self):
+        progress.update(2, learnt=1, reviews=2, correct=1,
+                        due_changes={date.today(): 1})
+
+        counters = progress.get_progress(2, date.today())
+        self.assertEqual(
+            (counters['learnt_count'], counters['review_count'],
+             counters['correct_count'], counters['due_today']),
+            (1, 2, 1, 1),
+            msg="Counters not created from zero"
+        )
+
+    def test_get_without_counters(self):
+        counters = progress.get_progress(2, date.today())
+
+        self.assertEqual(
+            (counters['learnt_count'], counters['review_count'],
+             counters['accuracy']),
+            (0, 0, None),
+            msg="Missing counters not read as zero"
+        )
+        self.assertFalse(UserProgress.objects.filter(user_id=2).exists(),
+                         msg="Counters written when read")
+
+    def test_get(self):
+        UserProgress.objects.create(user_id=1, learnt_count=3,
+                                    review_count=4, correct_count=3)
+        UserDueCount.objects.bulk_create([
+            UserDueCount(user_id=1, count=2,
+                         test_date=date.today() - timedelta(days=3)),
+            UserDueCount(user_id=1, count=1, test_date=date.today()),
+            UserDueCount(user_id=1, count=5,
+                         test_date=date.today() + timedelta(days=2)),
+            UserDueCount(user_id=1, count=7,
+                         test_date=date.today() + timedelta(days=30)),
+        ])
+
+        with self.assertNumQueries(3):
+            response = self.client.get('/progress/')
+
+        counters = response.context['progress']
+        self.assertEqual(
+            (counters['due_today'], counters['accuracy']), (3, 0.75),
+            msg="Counters not correct"
+        )
+        self.assertEqual(
+            [count for _, count in counters['forecast'][:3]], [3, 0, 5],
+            msg="Forecast not correct"
+        )
+        self.assertEqual(
+            len(counters['forecast']), progress.FORECAST_DAYS,
+            msg="Forecast not of 30 days"
+        )
@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from . import catalog, queue
+from .models import (KanjiEntry, KanjiLearningRecord, KanjiTestingQueueItem,
+                     KanjiTestingRecord)
+
+
+class QueueTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def test_fixture_queued(self):
+        self.assertEqual(
+            set(KanjiTestingQueueItem.objects.values_list(
+                'user_id', 'kanji_entry_id'
+            )),
+            {(1, 4)},
+            msg="Queue does not match learnt and tested entries"
+        )
+
+    def test_testing_record_created(self):
+        KanjiTestingRecord.objects.create(kanji_entry_id=6, user_id=1)
+
+        item = KanjiTestingQueueItem.objects.get(kanji_entry_id=6, user_id=1)
+
+        self.assertEqual(
+            (item.test_date, item.order), (date.today(), 5),
+            msg="Queue item is not created from testing record"
+        )
+
+    def test_testing_record_not_learnt(self):
+        KanjiLearningRecord.objects.filter(pk=2).update(is_learnt=False)
+        KanjiTestingRecord.objects.filter(pk=2).delete()
+        KanjiTestingRecord.objects.create(kanji_entry_id=2, user_id=1)
+
+        self.assertFalse(
+            KanjiTestingQueueItem.objects.filter(kanji_entry_id=2).exists(),
+            msg="Queued the entry that is not learnt yet"
+        )
+
+    def test_testing_record_updated(self):
+        record = KanjiTestingRecord.objects.get(pk=4)
+        record.test_date = date.today() + timedelta(days=3)
+        record.save()
+
+        self.assertEqual(
+            KanjiTestingQueueItem.objects.get(kanji_entry_id=4).test_date,
+            record.test_date,
+            msg="Queue item test date is not updated"
+        )
+
+    def test_learning_record_unlearnt(self):
+        record = KanjiLearningRecord.objects.get(pk=4)
+        record.is_learnt = False
+        record.save()
+
+        self.assertIsNone(
+            queue.next_due(1, date.today()),
+            msg="Unlearnt entry is still queued"
+        )
+
+    def test_entry_reordered(self):
+        entry = KanjiEntry.objects.get(pk=4)
+        entry.order = 10
+        entry.save()
+
+        self.assertEqual(
+            KanjiTestingQueueItem.objects.get(kanji_entry_id=4).order, 10,
+            msg="Queue item order is not updated"
+        )
+
+    def test_next_due(self):
+        record = KanjiTestingRecord.objects.get(pk=4)
+        record.test_date = date.today() + timedelta(days=1)
+        record.save()
+
+        for i in [5, 6]:
+            KanjiTestingRecord.objects.create(kanji_entry_id=i, user_id=1)
+
+        catalog.get_catalog()
+
+        with self.assertNumQueries(1):
+            entry = queue.next_due(1, date.today())
+
+        self.assertEqual(
+            entry.id, 6,
+            msg="Not select the due entry with the lowest order"
+        )
@@ -0,0 +1,98 @@
+import time
+
+from django.test import TestCase
+
+from . import reviewlog
+from .models import KanjiTestingRecord, ReviewLog
+
+
+class ReviewLogTestCase(TestCase):
+
+    def test_record_many(self):
+        with self.assertNumQueries(1):
+            reviewlog.record_many([
+                reviewlog.make(1, 1, True, reviewed_at=0),
+                reviewlog.make(1, 2, False, chosen_entry_id=3),
+            ])
+
+        self.assertEqual(
+            ReviewLog.objects.count(), 2,
+            msg="Logs not written in one batch"
+        )
+
+    def test_daily_counts(self):
+        ReviewLog.objects.bulk_create([
+            ReviewLog(user_id=1, kanji_entry_id=1, reviewed_at=10,
+                      is_correct=True),
+            ReviewLog(user_id=1, kanji_entry_id=2, reviewed_at=20,
+                      is_correct=False, chosen_entry_id=3),
+            ReviewLog(user_id=1, kanji_entry_id=2, reviewed_at=86400,
+                      is_correct=False, chosen_entry_id=3),
+            ReviewLog(user_id=2, kanji_entry_id=1, reviewed_at=30,
+                      is_correct=True),
+        ])
+
+        self.assertEqual(
+            reviewlog.daily_counts(1), [(0, 2, 1), (1, 1, 0)],
+            msg="Daily counts not correct"
+        )
+        self.assertEqual(
+            reviewlog.confusions(1), [(2, 3, 2)],
+            msg="Confusions not correct"
+        )
+
+    def test_get_response_ms(self):
+        shown_at = int(time.time() * 1000) - 1500
+
+        self.assertGreaterEqual(
+            reviewlog.get_response_ms(str(shown_at)), 1500,
+            msg="Response time not correct"
+        )
+        self.assertIsNone(
+            reviewlog.get_response_ms('later'),
+            msg="Invalid time accepted"
+        )
+
+
+class TestKanjiViewReviewLogTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+    def test_post(self):
+        KanjiTestingRecord.objects.create(kanji_entry_id=3, user_id=1)
+
+        self.client.post('/test-kanji/', data={
+            'tested_entry_id': 3,
+            'chosen_entry_id': 5,
+            'shown_at': int(time.time() * 1000) - 2000,
+        })
+
+        log = ReviewLog.objects.get()
+        self.assertEqual(
+            (log.user_id, log.kanji_entry_id, log.is_correct,
+             log.chosen_entry_id),
+            (1, 3, False, 5),
+            msg="Answer not logged"
+        )
+        self.assertGreaterEqual(
+            log.response_ms, 2000,
+            msg="Response time not logged"
+        )
+
+    def test_batch_post(self):
+        self.client.post('/test-kanji/batch/', data={
+            'tested_entry_id': [1, 4],
+            'chosen_entry_id_1': 1,
+            'chosen_entry_id_4': 5,
+        })
+
+        self.assertEqual(
+            list(ReviewLog.objects.order_by('kanji_entry_id').values_list(
+                'kanji_entry_id', 'is_correct', 'response_ms'
+            )),
+            [(1, True, None), (4, False, None)],
+            msg="Batch answers not logged"
+        )
@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+import math
+
+from django.test import TestCase
+
+from . import schedulers
+from .models import KanjiTestingQueueItem, KanjiTestingRecord
+
+
+TODAY = date(2019, 3, 10).toordinal()
+
+
+class SchedulersTestCase(TestCase):
+
+    def test_exponential(self):
+        scheduler = schedulers.ExponentialScheduler()
+        deck = schedulers.make_deck([0, 1, 3, 2], [0, 1, 4, 2],
+                                    [2.5] * 4, [TODAY] * 4)
+
+        deck = scheduler.review(deck, [True, True, True, False], TODAY)
+
+        self.assertEqual(
+            deck.streaks.tolist(), [1, 2, 4, 0],
+            msg="Correct streaks are not updated correctly"
+        )
+        self.assertEqual(
+            (deck.due - TODAY).tolist(), [1, 2, 8, 0],
+            msg="Intervals do not double"
+        )
+
+    def test_exponential_scalar(self):
+        def review(streak, due, correct):
+            # The scheduling of the views before schedulers.
+            if correct:
+                due += timedelta(days=math.pow(2, streak))
+                streak += 1
+            elif streak != 0:
+                streak = 0
+                due = date.fromordinal(TODAY)
+            return streak, due
+
+        cards = [(streak, date.fromordinal(TODAY + offset), correct)
+                 for streak in range(4)
+                 for offset in (-3, 0, 2)
+                 for correct in (True, False)]
+        scheduler = schedulers.ExponentialScheduler()
+        deck = schedulers.make_deck(
+            [streak for streak, _, _ in cards], [0] * len(cards),
+            [2.5] * len(cards), [due.toordinal() for _, due, _ in cards]
+        )
+
+        deck = scheduler.review(
+            deck, [correct for _, _, correct in cards], TODAY
+        )
+
+        self.assertEqual(
+            list(zip(deck.streaks.tolist(),
+                     map(date.fromordinal, deck.due.tolist()))),
+            [review(*card) for card in cards],
+            msg="Vectorized review differs from the scalar one"
+        )
+
+    def test_sm2(self):
+        scheduler = schedulers.SM2Scheduler()
+        deck = schedulers.make_deck([0, 1, 2, 2], [0, 1, 6, 6],
+                                    [2.5] * 4, [TODAY] * 4)
+
+        deck = scheduler.review(deck, [True, True, True, False], TODAY)
+
+        self.assertEqual(
+            (deck.due - TODAY).tolist(), [1, 6, 15, 0],
+            msg="Intervals are not scheduled by SM-2"
+        )
+        self.assertLess(
+            deck.eases[3], 2.5,
+            msg="Ease is not lowered after a wrong answer"
+        )
+
+    def test_fsrs(self):
+        scheduler = schedulers.FSRSScheduler()
+        deck = schedulers.make_deck([0, 1], [0, 3], [2.5, 2.5],
+                                    [TODAY, TODAY], [5, 5])
+
+        reviewed = scheduler.review(deck, [True, True], TODAY)
+
+        self.assertAlmostEqual(
+            reviewed.intervals[0], scheduler.initial_stability,
+            msg="New card is not given the initial stability"
+        )
+        self.assertGreater(
+            reviewed.intervals[1], deck.intervals[1],
+            msg="Interval does not grow after a correct answer"
+        )
+
+        reviewed = scheduler.review(deck, [False, False], TODAY)
+
+        self.assertEqual(
+            reviewed.due.tolist(), [TODAY, TODAY],
+            msg="Cards are not due today after a wrong answer"
+        )
+
+
+    def test_switch_algorithm(self):
+        sm2 = schedulers.SM2Scheduler()
+        fsrs = schedulers.FSRSScheduler()
+        deck = schedulers.make_deck([3, 3], [15, 15], [2.5, 2.5],
+                                    [TODAY, TODAY])
+
+        for _ in range(3):
+            deck = fsrs.review(deck, [True, False], deck.due)
+        difficulties = deck.difficulties.tolist()
+
+        self.assertNotEqual(
+            difficulties, [schedulers.DEFAULT_DIFFICULTY] * 2,
+            msg="FSRS does not change the difficulty"
+        )
+
+        rescheduled = sm2.reschedule(deck)
+
+        self.assertEqual(
+            rescheduled.intervals.tolist(),
+            [sm2.second_interval * 2.5 ** 4, 0.0],
+            msg="SM-2 does not reschedule with its own ease"
+        )
+
+        deck = sm2.review(rescheduled, [True, False], TODAY)
+        rescheduled = fsrs.reschedule(deck)
+
+        self.assertEqual(
+            rescheduled.difficulties.tolist(), difficulties,
+            msg="FSRS does not keep its difficulty across SM-2"
+        )
+
+
+class RescheduleTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def test_reschedule_user(self):
+        record = KanjiTestingRecord.objects.get(pk=4)
+        record.correct_streak = 3
+        record.interval = 4
+        record.test_date = date.today()
+        record.save()
+
+        with self.assertNumQueries(5):
+            changed = schedulers.reschedule_user(
+                1, schedulers.SM2Scheduler()
+            )
+
+        record.refresh_from_db()
+
+        self.assertEqual(
+            changed, 3,
+            msg="Number of changed cards not correct"
+        )
+        self.assertEqual(
+            (record.interval, record.test_date),
+            (15.0, date.today() + timedelta(days=11)),
+            msg="Card is not rescheduled from its last review"
+        )
+        self.assertEqual(
+            KanjiTestingQueueItem.objects.get(kanji_entry_id=4).test_date,
+            record.test_date,
+            msg="Queue is not updated"
+        )
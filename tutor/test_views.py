@@ -3,8 +3,9 @@ import math
 
 from django.test import TestCase
 
-from .models import KanjiLearningRecord, KanjiTestingRecord, KanjiEntry
-from .views import DEFAULT_BASE_INTERVAL, DEFAULT_INTERVAL_RATE
+from .models import (KanjiLearningRecord, KanjiTestingQueueItem,
+                     KanjiTestingRecord, KanjiEntry, ReviewLog)
+from .schedulers import DEFAULT_BASE_INTERVAL, DEFAULT_INTERVAL_RATE
 
 
 class LearnKanjiViewTestCase(TestCase):
@@ -244,3 +245,144 @@ class TestKanjiRevealViewTestCase(TestCase):
             answer_correct, False,
             msg="Shown wrong result of answer as incorrect"
         )
+
+
+class TestKanjiBatchViewTestCase(TestCase):
+    fixtures = ['tutor/test_kanji_view.json']
+
+    def setUp(self):
+        self.client.login(username='tester1@kenkyou.com',
+                          password='user')
+
+        for i in [5, 6]:
+            KanjiTestingRecord.objects.create(kanji_entry_id=i, user_id=1)
+
+    def test_get(self):
+        cards = self.client.get('/test-kanji/batch/').context.get('cards')
+
+        self.assertEqual(
+            [card['tested_entry'].id for card in cards], [4, 6, 5],
+            msg="Not select the due entries in order"
+        )
+        self.assertEqual(
+            [len(card['choices']) for card in cards], [4, 4, 4],
+            msg="Number of choices not correct"
+        )
+
+    def test_get_no_entry(self):
+        KanjiTestingRecord.objects.filter(user_id=1).update(
+            test_date=date.today() + timedelta(days=1)
+        )
+        KanjiTestingQueueItem.objects.update(
+            test_date=date.today() + timedelta(days=1)
+        )
+
+        response = self.client.get('/test-kanji/batch/')
+
+        self.assertRedirects(
+            response, '/test-kanji/done/',
+            msg_prefix="Not redirect when there is no entry to test"
+        )
+
+    def test_post(self):
+        KanjiTestingRecord.objects.filter(kanji_entry_id=4).update(
+            correct_streak=2
+        )
+
+        response = self.client.post(
+            '/test-kanji/batch/',
+            data={'tested_entry_id': [4, 5, 6],
+                  'chosen_entry_id_4': 1,
+                  'chosen_entry_id_5': 5,
+                  'chosen_entry_id_6': 6}
+        )
+
+        records = KanjiTestingRecord.objects.filter(
+            user_id=1,
+            kanji_entry_id__in=[4, 5, 6]
+        ).order_by('kanji_entry_id')
+        interval = DEFAULT_BASE_INTERVAL * math.pow(DEFAULT_INTERVAL_RATE, 0)
+
+        self.assertEqual(
+            [(record.correct_streak, record.test_date)
+             for record in records],
+            [(0, date.today()),
+             (1, date.today() + timedelta(days=interval)),
+             (1, date.today() + timedelta(days=interval))],
+            msg="Records are not updated correctly"
+        )
+        self.assertEqual(
+            KanjiTestingQueueItem.objects.get(kanji_entry_id=6).test_date,
+            date.today() + timedelta(days=interval),
+            msg="Queue is not updated"
+        )
+        self.assertRedirects(
+            response, '/test-kanji/batch/result/',
+            msg_prefix="Not redirect to the results"
+        )
+
+        response = self.client.get('/test-kanji/batch/result/')
+
+        self.assertEqual(
+            [(result['entry'].id, result['answer_correct'])
+             for result in response.context.get('results')],
+            [(4, False), (6, True), (5, True)],
+            msg="Results are not shown correctly"
+        )
+
+    def test_result_reload(self):
+        self.client.post('/test-kanji/batch/',
+                         data={'tested_entry_id': [5],
+                               'chosen_entry_id_5': 5})
+
+        for _ in range(2):
+            response = self.client.get('/test-kanji/batch/result/')
+
+        self.assertEqual(
+            (KanjiTestingRecord.objects.get(kanji_entry_id=5,
+                                            user_id=1).correct_streak,
+             ReviewLog.objects.filter(kanji_entry_id=5).count(),
+             len(response.context.get('results'))),
+            (1, 1, 1),
+            msg="Answers graded again on reload"
+        )
+
+    def test_result_without_post(self):
+        response = self.client.get('/test-kanji/batch/result/')
+
+        self.assertRedirects(
+            response, '/test-kanji/batch/',
+            msg_prefix="Not redirect when there are no results"
+        )
+
+    def test_post_invalid_ids(self):
+        response = self.client.post('/test-kanji/batch/',
+                                    data={'tested_entry_id': ['abc', 5],
+                                          'chosen_entry_id_5': 5})
+
+        self.assertRedirects(
+            response, '/test-kanji/batch/result/',
+            msg_prefix="Invalid entry ids not dropped"
+        )
+        self.assertEqual(
+            KanjiTestingRecord.objects.get(kanji_entry_id=5,
+                                           user_id=1).correct_streak,
+            1,
+            msg="Valid entry not graded"
+        )
+
+    def test_post_not_due(self):
+        tomorrow = date.today() + timedelta(days=1)
+        KanjiTestingRecord.objects.filter(kanji_entry_id=5).update(
+            test_date=tomorrow
+        )
+
+        self.client.post('/test-kanji/batch/',
+                         data={'tested_entry_id': [5],
+                               'chosen_entry_id_5': 5})
+
+        record = KanjiTestingRecord.objects.get(kanji_entry_id=5, user_id=1)
+        self.assertEqual(
+            (record.correct_streak, record.test_date), (0, tomorrow),
+            msg="Card graded before it is due"
+        )
@@ -12,6 +12,14 @@ urlpatterns = [
     path('test-kanji/reveal/<int:entry_id>/',
          views.TestKanjiRevealView.as_view(),
          name='test_kanji_reveal'),
+    path('test-kanji/batch/', views.TestKanjiBatchView.as_view(),
+         name='test_kanji_batch'),
+    path('test-kanji/batch/result/',
+         views.TestKanjiBatchResultView.as_view(),
+         name='test_kanji_batch_result'),
     path('test-kanji/done/', views.TestKanjiDoneView.as_view(),
-         name='test_kanji_done')
+         name='test_kanji_done'),
+
+    path('progress/', views.ProgressView.as_view(), name='progress'),
+    path('export/', views.ExportView.as_view(), name='export')
 ]
@@ -1,18 +1,21 @@
 import random
-import math
-from datetime import date, timedelta
+import time
+from datetime import date
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponseRedirect
-from django.views.generic.base import TemplateView
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.views.generic.base import TemplateView, View
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 
-from .models import KanjiEntry, KanjiLearningRecord, KanjiTestingRecord
+from kenkyou.decorators import cache_per_session
 
-
-DEFAULT_BASE_INTERVAL = 1
-DEFAULT_INTERVAL_RATE = 2
+from . import (bulk, catalog, cursor, distractors, export, progress, queue,
+               reviewlog, schedulers)
+from .models import KanjiLearningRecord, KanjiTestingRecord
 
 
 def query_string(**kwargs):
@@ -29,6 +32,28 @@ def query_string(**kwargs):
     return ''
 
 
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_choices(tested_entry, count=3):
+    """
+    Return the tested entry mixed with `count` distractors.
+    """
+    choices = [tested_entry]
+
+    for choice in distractors.sample(tested_entry.id, count):
+        if bool(random.getrandbits(1)):
+            choices.append(choice)
+        else:
+            choices.insert(0, choice)
+
+    return choices
+
+
 class LearnKanjiView(LoginRequiredMixin, TemplateView):
     template_name = 'tutor/learn_kanji.html'
     extra_context = {'title': _('Learn Kanji')}
@@ -36,38 +61,68 @@ class LearnKanjiView(LoginRequiredMixin, TemplateView):
     def get(self, request, *args, **kwargs):
         user_id = request.user.id
 
-        query_set = KanjiEntry.objects.filter(
-            kanjilearningrecord__user__id=user_id,
-            kanjilearningrecord__is_learnt=False
-        ).order_by('order')
-
-        if query_set.count() > 0:
-            entry = query_set[0]
+        if cursor.is_lazy():
+            entry = cursor.next_entry(user_id)
         else:
+            entry_id = KanjiLearningRecord.objects.filter(
+                user_id=user_id,
+                is_learnt=False
+            ).order_by('kanji_entry__order').values_list(
+                'kanji_entry_id', flat=True
+            ).first()
+            entry = None if entry_id is None else catalog.get_entry(entry_id)
+
+        if entry is None:
             return HttpResponseRedirect(reverse_lazy('learn_kanji_done'))
 
         return self.render_to_response(self.get_context_data(entry=entry))
 
     def post(self, request, *args, **kwargs):
-        entry_id = request.POST['entry_id']
+        entry = catalog.get_entry(request.POST['entry_id'])
+
+        if entry is None:
+            raise Http404
+
+        with transaction.atomic():
+            if cursor.is_lazy():
+                KanjiLearningRecord.objects.update_or_create(
+                    user=request.user,
+                    kanji_entry_id=entry.id,
+                    defaults={'is_learnt': True}
+                )
+                testing_record, created = \
+                    KanjiTestingRecord.objects.get_or_create(
+                        kanji_entry_id=entry.id,
+                        user=request.user
+                    )
+            else:
+                query_set = KanjiLearningRecord.objects.filter(
+                    user_id=request.user.id,
+                    kanji_entry__id=entry.id
+                )
 
-        query_set = KanjiLearningRecord.objects.filter(
-            user_id=request.user.id,
-            kanji_entry__id=entry_id
-        )
+                learning_record = query_set.get()
+                learning_record.is_learnt = True
+                learning_record.save()
 
-        learning_record = query_set.get()
-        learning_record.is_learnt = True
-        learning_record.save()
+                testing_record = KanjiTestingRecord.objects.create(
+                    kanji_entry_id=entry.id,
+                    user=request.user
+                )
+                created = True
 
-        KanjiTestingRecord.objects.create(
-            kanji_entry=KanjiEntry.objects.get(pk=entry_id),
-            user=request.user
-        )
+            if created:
+                progress.update(
+                    request.user.id, learnt=1,
+                    due_changes={testing_record.test_date: 1}
+                )
+
+            cursor.advance(request.user.id, entry.order)
 
         return HttpResponseRedirect(reverse_lazy('learn_kanji'))
 
 
+@method_decorator(cache_per_session, name='dispatch')
 class LearnKanjiDoneView(TemplateView):
     template_name = 'tutor/learn_kanji_done.html'
     extra_context = {'title': _('Learn Kanji Done')}
@@ -78,63 +133,45 @@ class TestKanjiView(LoginRequiredMixin, TemplateView):
     extra_context = {'title': _('Test Kanji')}
 
     def get(self, request, *args, **kwargs):
-        user_id = request.user.id
+        tested_entry = queue.next_due(request.user.id, date.today())
 
-        query_set = KanjiEntry.objects.filter(
-            kanjilearningrecord__user__id=user_id,
-            kanjilearningrecord__is_learnt=True,
-            kanjitestingrecord__user__id=user_id,
-            kanjitestingrecord__test_date__lte=date.today()
-        ).order_by('order')
-
-        if query_set.count() > 0:
-            tested_entry = query_set[0]
-        else:
+        if tested_entry is None:
             return HttpResponseRedirect(reverse_lazy('test_kanji_done'))
 
-        choices = [tested_entry]
-        query_set = KanjiEntry.objects.exclude(id=tested_entry.id)
-        other_entry_count = query_set.count()
-
-        if other_entry_count > 2:
-            other_choice_count = 3
-        else:
-            other_choice_count = other_entry_count
-
-        for i in random.sample(range(other_entry_count),
-                               other_choice_count):
-            if bool(random.getrandbits(1)):
-                choices.append(query_set[i])
-            else:
-                choices.insert(0, query_set[i])
+        choices = get_choices(tested_entry)
 
         return self.render_to_response(
-            self.get_context_data(choices=choices, tested_entry=tested_entry)
+            self.get_context_data(choices=choices, tested_entry=tested_entry,
+                                  shown_at=int(time.time() * 1000))
         )
 
     def post(self, request, *args, **kwargs):
         entry_id = request.POST['tested_entry_id']
-        answer_correct = entry_id == request.POST.get('chosen_entry_id')
+        chosen_entry_id = request.POST.get('chosen_entry_id')
+        answer_correct = entry_id == chosen_entry_id
 
-        record = KanjiTestingRecord.objects.get(
-            kanji_entry_id=entry_id,
-            user_id=request.user.id
-        )
-
-        if answer_correct:
-            interval = (
-                DEFAULT_BASE_INTERVAL *
-                math.pow(DEFAULT_INTERVAL_RATE, record.correct_streak)
+        with transaction.atomic():
+            record = KanjiTestingRecord.objects.get(
+                kanji_entry_id=entry_id,
+                user_id=request.user.id
             )
+            old_test_date = record.test_date
 
-            record.correct_streak += 1
-            record.test_date += timedelta(days=interval)
-            record.save()
+            if schedulers.review([record], [answer_correct]):
+                record.save()
 
-        elif record.correct_streak != 0:
-            record.correct_streak = 0
-            record.test_date = date.today()
-            record.save()
+            progress.update(
+                request.user.id, reviews=1, correct=int(answer_correct),
+                due_changes=progress.moves([old_test_date],
+                                           [record.test_date])
+            )
+            reviewlog.record(
+                request.user.id, record.kanji_entry_id, answer_correct,
+                chosen_entry_id=to_int(chosen_entry_id),
+                response_ms=reviewlog.get_response_ms(
+                    request.POST.get('shown_at')
+                )
+            )
 
         return HttpResponseRedirect(
             reverse_lazy(
@@ -154,7 +191,11 @@ class TestKanjiRevealView(TemplateView):
     }
 
     def get(self, request, *args, **kwargs):
-        entry = KanjiEntry.objects.get(pk=kwargs.get('entry_id'))
+        entry = catalog.get_entry(kwargs.get('entry_id'))
+
+        if entry is None:
+            raise Http404
+
         answer_correct = bool(request.GET.get('answer_correct'))
 
         return self.render_to_response(
@@ -162,6 +203,159 @@ class TestKanjiRevealView(TemplateView):
         )
 
 
+@method_decorator(cache_per_session, name='dispatch')
 class TestKanjiDoneView(TemplateView):
     template_name = 'tutor/test_kanji_done.html'
     extra_context = {'title': _('Test Kanji Done')}
+
+
+BATCH_RESULTS_SESSION_KEY = '_tutor_batch_results'
+
+
+class TestKanjiBatchView(LoginRequiredMixin, TemplateView):
+    """
+    Serve a block of due cards in one page and grade all answers in one
+    POST, instead of a GET, a POST and a reveal page per card. The results
+    are kept in the session for the result page the POST redirects to, so
+    reloading that page does not grade the answers again.
+    """
+    template_name = 'tutor/test_kanji_batch.html'
+    extra_context = {'title': _('Test Kanji Batch')}
+
+    def get_batch_size(self):
+        return getattr(settings, 'TUTOR_TEST_BATCH_SIZE', 10)
+
+    def get(self, request, *args, **kwargs):
+        tested_entries = queue.due(
+            request.user.id, date.today(), self.get_batch_size()
+        )
+
+        if not tested_entries:
+            return HttpResponseRedirect(reverse_lazy('test_kanji_done'))
+
+        cards = [
+            {'tested_entry': entry, 'choices': get_choices(entry)}
+            for entry in tested_entries
+        ]
+
+        return self.render_to_response(self.get_context_data(cards=cards))
+
+    def post(self, request, *args, **kwargs):
+        entry_ids = [
+            entry_id for entry_id in map(
+                to_int, request.POST.getlist('tested_entry_id')
+            )
+            if entry_id is not None
+        ][:self.get_batch_size()]
+
+        with transaction.atomic():
+            records = list(
+                KanjiTestingRecord.objects.filter(
+                    kanji_entry_id__in=entry_ids,
+                    user_id=request.user.id,
+                    test_date__lte=date.today()
+                )
+            )
+            records.sort(
+                key=lambda record: catalog.get_entry(
+                    record.kanji_entry_id
+                ).order
+            )
+
+            answers = [
+                str(record.kanji_entry_id) == request.POST.get(
+                    'chosen_entry_id_%d' % record.kanji_entry_id
+                )
+                for record in records
+            ]
+            old_test_dates = [record.test_date for record in records]
+            changed_records = schedulers.review(records, answers)
+
+            bulk.bulk_update(
+                changed_records,
+                ['correct_streak', 'interval', 'ease', 'test_date',
+                 'difficulty']
+            )
+            queue.update_test_dates(
+                request.user.id,
+                {record.kanji_entry_id: record.test_date
+                 for record in changed_records}
+            )
+            progress.update(
+                request.user.id, reviews=len(records), correct=sum(answers),
+                due_changes=progress.moves(
+                    old_test_dates, [record.test_date for record in records]
+                )
+            )
+
+            reviewlog.record_many([
+                reviewlog.make(
+                    request.user.id, record.kanji_entry_id, answer,
+                    chosen_entry_id=to_int(request.POST.get(
+                        'chosen_entry_id_%d' % record.kanji_entry_id
+                    ))
+                )
+                for record, answer in zip(records, answers)
+            ])
+
+        request.session[BATCH_RESULTS_SESSION_KEY] = [
+            (record.kanji_entry_id, answer)
+            for record, answer in zip(records, answers)
+        ]
+
+        return HttpResponseRedirect(reverse_lazy('test_kanji_batch_result'))
+
+
+class TestKanjiBatchResultView(LoginRequiredMixin, TemplateView):
+    template_name = 'tutor/test_kanji_batch_result.html'
+    extra_context = {
+        'title': _('Test Kanji Batch'),
+        'next_link': reverse_lazy('test_kanji_batch')
+    }
+
+    def get(self, request, *args, **kwargs):
+        answers = request.session.get(BATCH_RESULTS_SESSION_KEY)
+
+        if answers is None:
+            return HttpResponseRedirect(reverse_lazy('test_kanji_batch'))
+
+        results = [
+            {'entry': entry, 'answer_correct': answer_correct}
+            for entry, answer_correct in (
+                (catalog.get_entry(entry_id), answer_correct)
+                for entry_id, answer_correct in answers
+            )
+            if entry is not None
+        ]
+
+        return self.render_to_response(
+            self.get_context_data(results=results)
+        )
+
+
+class ProgressView(LoginRequiredMixin, TemplateView):
+    template_name = 'tutor/progress.html'
+    extra_context = {'title': _('Progress')}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['progress'] = progress.get_progress(self.request.user.id,
+                                                    date.today())
+        return context
+
+
+class ExportView(LoginRequiredMixin, View):
+
+    def get(self, request):
+        format = request.GET.get('format', 'csv')
+        if format not in export.FORMATS:
+            raise Http404
+
+        response = StreamingHttpResponse(
+            export.lines(export.rows(request.user.id), format),
+            content_type=export.FORMATS[format]
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="kenkyou-history.%s"' % format
+        )
+        return response